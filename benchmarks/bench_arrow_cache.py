@@ -0,0 +1,108 @@
+"""
+Cleaned-table read benchmark: parsing Scrapped_reviews_cleaned.csv (what the
+chart and schema processes did before) vs read_table() on the memory-mapped
+Arrow cache, in fresh processes, for growing review counts.
+
+    python -m benchmarks.bench_arrow_cache --rows 20000 80000 320000
+
+Each read runs in its own spawned process and reports, above the interpreter
+baseline, its peak RSS and its private (anonymous) memory once the table is in
+use. Mapped pages count towards RSS but are shared page cache: the private
+figure is what every additional reader process costs. Linux only (/proc).
+Operations that hash free text (e.g. drop_duplicates on review text) still
+build Python strings and are not what this measures.
+"""
+import argparse
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from etl import storage  # noqa: E402
+
+WORDS = ['room', 'staff', 'pool', 'breakfast', 'clean', 'view', 'beach', 'friendly', 'noisy', 'great', 'service', 'food']
+
+
+def synthetic_reviews(rows, seed=42):
+    rng = np.random.default_rng(seed)
+    texts = [' '.join(rng.choice(WORDS, 80)) for _ in range(1000)]
+    # Every review text is distinct, as in real exports (repeated strings would be shared by the CSV parser)
+    suffixes = pd.Series(np.arange(rows)).astype(str)
+    return pd.DataFrame({
+        'id': np.arange(1_000_000_000, 1_000_000_000 + rows).astype(str),
+        'reviewer_name': [f'user {i}' for i in range(rows)],
+        'platform': rng.choice(['Tripadvisor', 'Booking', 'Google'], rows),
+        'review_text': rng.choice(texts, rows) + ' #' + suffixes,
+        'translated_review_text': rng.choice(texts, rows) + ' #' + suffixes,
+        'normalized_rating': rng.integers(1, 6, rows),
+        'date': (pd.Timestamp('2019-01-01') + pd.to_timedelta(rng.integers(0, 6 * 365, rows), unit='D')).strftime('%Y-%m-%d'),
+        'country': rng.choice(['Tunisia', 'France', 'Germany', 'Italy'], rows),
+        'sentiment': rng.choice(['Positive', 'Neutral', 'Negative'], rows),
+        'stay_type': rng.choice(['Couple', 'Family', 'Solo', 'Business'], rows),
+        'sentiment_polarity': rng.random(rows).round(3),
+    })
+
+
+def read_csv(path):
+    return pd.read_csv(path)
+
+
+def read_mapped(path):
+    return storage.read_table(path)
+
+
+def memory_mb():
+    # Peak RSS (VmHWM) and current private memory (RssAnon) of this process
+    fields = {}
+    with open('/proc/self/status') as f:
+        for line in f:
+            name, _, value = line.partition(':')
+            fields[name] = int(value.split()[0]) / 1024 if value.strip().endswith('kB') else None
+    return fields['VmHWM'], fields['RssAnon']
+
+
+def measure(reader, path):
+    # Runs in a fresh process, so the baseline is the interpreter with its imports
+    base_peak, base_private = memory_mb()
+    start = time.perf_counter()
+    df = reader(path)
+    # Scan all the review text and group as the chart specs do, so a lazy read cannot look cheaper than it is
+    chars = int(df['review_text'].str.len().sum() + df['translated_review_text'].str.len().sum())
+    df.groupby(['platform', 'sentiment'], observed=True)['normalized_rating'].mean()
+    elapsed = time.perf_counter() - start
+    peak, private = memory_mb()
+    return elapsed, peak - base_peak, private - base_private, chars
+
+
+def run(label, reader, path, rows):
+    with multiprocessing.get_context('spawn').Pool(1) as pool:
+        elapsed, peak_mb, private_mb, chars = pool.apply(measure, (reader, path))
+    print(f"{label:<8} {rows:>9,} rows  {elapsed:>8.3f}s  peak RSS +{peak_mb:>8.1f} MB  "
+          f"private +{private_mb:>8.1f} MB  ({chars / 1e6:,.0f}M text chars scanned)")
+    return private_mb
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, nargs='+', default=[20_000, 80_000, 320_000])
+    args = parser.parse_args()
+
+    for rows in args.rows:
+        with tempfile.TemporaryDirectory() as out_dir:
+            path = os.path.join(out_dir, 'Scrapped_reviews_cleaned.csv')
+            storage.write_table(synthetic_reviews(rows), path, encoding='utf-8', csv=True)
+            print(f"{rows:,} rows: CSV {os.path.getsize(path) / 1e6:.1f} MB, "
+                  f"Arrow cache {os.path.getsize(storage.arrow_path(path)) / 1e6:.1f} MB")
+            csv_private = run('csv', read_csv, path, rows)
+            mapped_private = run('mmap', read_mapped, path, rows)
+            print(f"  private memory per reader: {csv_private / max(mapped_private, 0.1):.1f}x lower with the mapped cache\n")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,81 @@
+"""
+Facebook audience allocation benchmark: the former iterrows loop (one dict per
+day x gender x age x country) vs etl_facebook_audience.allocate (one outer
+product of the daily follows and the weight tensor, categorical columns).
+
+    python -m benchmarks.bench_facebook_audience --years 10 30
+
+Both run with the default weights, for which the outputs must be identical;
+the weights derived from data/raw/facebook/Audience.csv are timed as well.
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from etl import etl_facebook_audience as audience  # noqa: E402
+
+AUDIENCE_CSV = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data', 'raw', 'facebook', 'Audience.csv')
+
+
+def legacy_allocate(follows_df):
+    # Row loop of the previous etl_facebook_audience.process
+    total_weight = sum(audience.AGE_GENDER_WEIGHTS.values()) * len(audience.COUNTRIES)
+    audience_rows = []
+    for _, row in follows_df.iterrows():
+        date = row['Date'].strftime('%m/%d/%Y')
+        total_follows = int(row['Follows']) if row['Follows'] > 0 else 1
+        for gender in audience.GENDERS:
+            for age_range in audience.AGE_RANGES:
+                for country in audience.COUNTRIES:
+                    weight = audience.AGE_GENDER_WEIGHTS[(gender, age_range)]
+                    followers = max(1, round(total_follows * weight / total_weight))
+                    audience_rows.append({
+                        'date': date, 'gender': gender, 'age_range': age_range,
+                        'country': country, 'followers': followers,
+                    })
+    return pd.DataFrame(audience_rows)
+
+
+def vectorized_allocate(follows_df, weights):
+    follows = follows_df['Follows'].to_numpy(dtype=float)
+    follows = np.where(follows > 0, np.trunc(follows), 1)
+    return audience.allocate(follows_df['Date'].dt.strftime('%m/%d/%Y'), follows, *weights)
+
+
+def synthetic_follows(years, seed=42):
+    rng = np.random.default_rng(seed)
+    days = pd.date_range(end='2025-06-30', periods=int(years * 365), freq='D')
+    return pd.DataFrame({'Date': days, 'Follows': rng.poisson(45, len(days))})
+
+
+def run(label, func, *args):
+    start = time.perf_counter()
+    df = func(*args)
+    elapsed = time.perf_counter() - start
+    print(f"{label:<18} {len(df):>11,} rows  {elapsed:>8.3f}s  {len(df) / elapsed:>14,.0f} rows/s")
+    return elapsed, df
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--years', type=float, nargs='+', default=[10, 30])
+    args = parser.parse_args()
+
+    for years in args.years:
+        follows_df = synthetic_follows(years)
+        print(f"{len(follows_df):,} days")
+        legacy, expected = run('legacy', legacy_allocate, follows_df)
+        vectorized, df = run('vectorized', vectorized_allocate, follows_df, audience.default_weights())
+        run('Audience.csv', vectorized_allocate, follows_df, audience.audience_weights(AUDIENCE_CSV))
+        identical = expected.equals(df.astype({col: str for col in ['date', 'gender', 'age_range', 'country']}))
+        print(f"  {legacy / vectorized:.0f}x faster, identical to legacy: {identical}\n")
+
+
+if __name__ == '__main__':
+    main()
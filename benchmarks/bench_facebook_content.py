@@ -0,0 +1,90 @@
+"""
+Facebook content-type table benchmark: the former iterrows loop (one dict per
+day x content type) vs etl_facebook_content.build_content_table (dates and
+types repeated/tiled as categorical codes, metrics from the format mix of
+data/raw/facebook/Top content formats.csv).
+
+    python -m benchmarks.bench_facebook_content --years 10 --pages 1 50
+
+--pages stacks that many pages' daily follows, as a multi-page export would.
+The default (no formats file) mix must reproduce the legacy table exactly.
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from etl import etl_facebook_content as content  # noqa: E402
+
+FORMATS_CSV = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data', 'raw', 'facebook', 'Top content formats.csv')
+
+
+def legacy_build(follows_df):
+    # Row loop of the previous etl_facebook_content.process
+    reach_values = content.DEFAULT_DAILY['reach']
+    daily_rows = []
+    for idx, row in follows_df.iterrows():
+        date = row['Date'].strftime('%m/%d/%Y')
+        for i, ctype in enumerate(content.CONTENT_TYPES):
+            daily_rows.append({
+                'date': date, 'content_type': ctype, 'published': 1, 'interactions': 1,
+                'reach': reach_values[i % len(reach_values)],
+            })
+    return pd.DataFrame(daily_rows)
+
+
+def default_build(follows_df):
+    shape = (len(follows_df), len(content.CONTENT_TYPES))
+    values = {metric: np.broadcast_to(content.DEFAULT_DAILY[metric], shape) for metric in content.METRICS}
+    return content.build_content_table(follows_df['Date'], content.CONTENT_TYPES, values)
+
+
+def mix_build(follows_df):
+    content_types, totals = content.content_mix(FORMATS_CSV)
+    day_weights = np.maximum(follows_df['Follows'].to_numpy(dtype=float), 1)
+    values = {metric: content.daily_values(day_weights, totals[metric]) for metric in content.METRICS}
+    return content.build_content_table(follows_df['Date'], content_types, values)
+
+
+def synthetic_follows(years, pages, seed=42):
+    rng = np.random.default_rng(seed)
+    days = pd.date_range(end='2025-06-30', periods=int(years * 365), freq='D')
+    dates = np.tile(days, pages)
+    return pd.DataFrame({'Date': dates, 'Follows': rng.poisson(45, len(dates))})
+
+
+def run(label, func, follows_df):
+    start = time.perf_counter()
+    df = func(follows_df)
+    elapsed = time.perf_counter() - start
+    print(f"{label:<10} {len(df):>11,} rows  {elapsed:>8.3f}s  {len(df) / elapsed:>14,.0f} rows/s  "
+          f"{df.memory_usage(deep=True).sum() / 1e6:>8.1f} MB in memory")
+    return elapsed, df
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--years', type=float, default=10)
+    parser.add_argument('--pages', type=int, nargs='+', default=[1, 50])
+    parser.add_argument('--legacy-max-days', type=int, default=50_000, help='skip the legacy loop above this many page-days')
+    args = parser.parse_args()
+
+    for pages in args.pages:
+        follows_df = synthetic_follows(args.years, pages)
+        print(f"{pages} page(s) x {args.years:g} years: {len(follows_df):,} page-days")
+        run('mix', mix_build, follows_df)
+        vectorized, df = run('default', default_build, follows_df)
+        if len(follows_df) <= args.legacy_max_days:
+            legacy, expected = run('legacy', legacy_build, follows_df)
+            identical = expected.equals(df.astype({'date': str, 'content_type': str, 'published': int, 'interactions': int, 'reach': int}))
+            print(f"  {legacy / vectorized:.0f}x faster, identical to legacy: {identical}")
+        print()
+
+
+if __name__ == '__main__':
+    main()
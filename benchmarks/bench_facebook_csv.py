@@ -0,0 +1,120 @@
+"""
+Facebook export parsing benchmark: the former clean_csv_file (readlines, regex
+passes over the joined text, python engine) followed by a per-value
+parse_fb_date, vs the streaming clean_csv_file(parse_dates=True) (per-line
+sanitizer feeding the C parser, one detected date format per file).
+
+    python -m benchmarks.bench_facebook_csv --years 10 --files 40
+
+Files are synthetic multi-year daily exports with the noise the sanitizer
+handles (sep= and title lines, BOM, tab separators, U+202C marks), cycling
+through the date formats parse_fb_date knows. Day-first files are where the two
+paths differ: per value, parse_fb_date reads every date with a day <= 12 as
+month-first; the detected format reads the whole file day-first.
+"""
+import argparse
+import os
+import re
+import sys
+import tempfile
+import time
+from io import StringIO
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from etl.utils import clean_csv_file, parse_fb_date  # noqa: E402
+
+METRICS = ['reach', 'interactions', 'link clicks', 'views', 'visits', 'follows']
+EXPORT_FORMATS = ['%Y-%m-%dT%H:%M:%S', '%Y-%m-%d', '%m/%d/%Y', '%d/%m/%Y']
+
+
+def legacy_clean_csv_file(file_path):
+    # Previous utils.clean_csv_file
+    try:
+        with open(file_path, 'r', encoding='utf-8-sig', errors='ignore') as f:
+            lines = f.readlines()
+
+        clean_lines = [
+            re.sub(r'[“”]', '"', line)
+            for line in lines
+            if not line.lower().startswith(('sep=', '��sep=', 'facebook')) and line.strip()
+        ]
+
+        cleaned = ''.join(clean_lines).replace('\u202c', '').replace('\ufeff', '')
+        cleaned = re.sub(r'"+\s*,\s*"+', ',', cleaned)
+        cleaned = re.sub(r'\t+', ',', cleaned)
+
+        if not cleaned.strip():
+            return pd.DataFrame()
+
+        df = pd.read_csv(StringIO(cleaned), engine='python', on_bad_lines='skip')
+
+        df.columns = [col.strip().lower().replace(' ', '_').replace('"', '') for col in df.columns]
+        for possible_date in ['date', 'datetime', 'review_date', 'publishedatdate']:
+            if possible_date in df.columns:
+                df.rename(columns={possible_date: 'date'}, inplace=True)
+                break
+        return df
+    except Exception as e:
+        print(f"Error cleaning CSV file {file_path}: {e}")
+        return pd.DataFrame()
+
+
+def legacy_read(file_path):
+    df = legacy_clean_csv_file(file_path)
+    df['date'] = df['date'].apply(parse_fb_date)
+    return df
+
+
+def streamed_read(file_path):
+    return clean_csv_file(file_path, parse_dates=True)
+
+
+def write_export(path, metric, years, date_format, rng):
+    days = pd.date_range(end='2025-06-30', periods=int(years * 365), freq='D')
+    values = rng.poisson(300, len(days)).astype(str)
+    marks = np.where(rng.random(len(days)) < 0.1, '\u202c', '')
+    with open(path, 'w', encoding='utf-8-sig') as f:
+        f.write(f'sep=,\nFacebook {metric}\nDate\t{metric.capitalize()}\n')
+        f.writelines(f'{d}\t{v}{m}\n' for d, v, m in zip(days.strftime(date_format), values, marks))
+
+
+def run(label, reader, paths):
+    start = time.perf_counter()
+    frames = [reader(path) for path in paths]
+    elapsed = time.perf_counter() - start
+    rows = sum(len(df) for df in frames)
+    print(f"{label:<10} {len(paths):>4} files  {rows:>10,} rows  {elapsed:>8.3f}s  {rows / elapsed:>12,.0f} rows/s")
+    return elapsed, frames
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--years', type=float, default=10)
+    parser.add_argument('--files', type=int, default=40)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(42)
+    with tempfile.TemporaryDirectory() as raw_dir:
+        paths, formats = [], []
+        for i in range(args.files):
+            formats.append(EXPORT_FORMATS[i % len(EXPORT_FORMATS)])
+            paths.append(os.path.join(raw_dir, f'export_{i}.csv'))
+            write_export(paths[-1], METRICS[i % len(METRICS)], args.years, formats[-1], rng)
+
+        legacy_time, legacy_frames = run('legacy', legacy_read, paths)
+        streamed_time, streamed_frames = run('streamed', streamed_read, paths)
+        print(f"  {legacy_time / streamed_time:.1f}x faster")
+
+        for date_format in EXPORT_FORMATS:
+            pairs = [(a, b) for a, b, fmt in zip(legacy_frames, streamed_frames, formats) if fmt == date_format]
+            values = all(a.drop(columns='date').equals(b.drop(columns='date')) for a, b in pairs)
+            dates = sum(int((pd.to_datetime(a['date']) != b['date']).sum()) for a, b in pairs)
+            print(f"  {date_format:<18} values identical: {values}  dates differing: {dates:,}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,126 @@
+"""
+Facebook metrics assembly benchmark: the former row-stacking process (one row
+block per export, missing KPIs filled with 1) vs etl_facebook_metrics.process
+(KPI exports outer-joined on the date, one row per day), on synthetic
+multi-year daily exports split across many files.
+
+    python -m benchmarks.bench_facebook_metrics --years 12 --files-per-kpi 6 --extra-kpis 12
+
+Each shipped KPI is exported as --files-per-kpi consecutive periods, and
+--extra-kpis additional metrics are added, to be discovered as columns.
+The date window is opened to the whole generated range for both paths.
+Reading dominates both paths and costs about the same per file; the join is
+what turns the output into one complete row per day. The legacy path also
+parsed the month-first dates day-first, dropping every day after the 12th.
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from etl import etl_facebook_metrics  # noqa: E402
+
+# KPI -> export column header, as in data/raw/facebook
+KPI_HEADERS = {
+    'follows': 'Follows', 'interactions': 'interactions', 'link_clicks': 'link clicks',
+    'reach': 'reach', 'views': 'Views', 'visits': 'visits',
+}
+
+
+def legacy_process(raw_dir, output_path, start, end):
+    # Previous etl_facebook_metrics.process, up to the table it saved
+    metrics = []
+    for file in os.listdir(raw_dir):
+        if file.endswith('.csv'):
+            df = pd.read_csv(os.path.join(raw_dir, file), encoding='utf-8-sig')
+            df.columns = df.columns.str.strip().str.replace('\ufeff', '')
+            df = df.rename(columns=lambda x: x.strip())
+            if 'Date' in df.columns:
+                df['Date'] = pd.to_datetime(df['Date'], dayfirst=True, errors='coerce')
+                df = df[df['Date'].between(start, end)]
+            else:
+                continue
+            for col in df.columns:
+                if df[col].dtype in ['int64', 'float64']:
+                    df[col] = df[col].replace(0, 1)
+            metrics.append(df)
+
+    final_df = pd.concat(metrics, ignore_index=True)
+    col_rename_map = {
+        'Total Reach': 'reach', 'Reach': 'reach', 'Interactions': 'interactions', 'Page Views': 'views',
+        'Views': 'views', 'Visits': 'visits', 'Page Likes': 'likes', 'Followers': 'follows',
+        'Link Clicks': 'link_clicks', 'link_clicks': 'link_clicks',
+    }
+    for col in col_rename_map:
+        if col in final_df.columns:
+            final_df = final_df.rename(columns={col: col_rename_map[col]})
+    expected = ['date', 'interactions', 'link_clicks', 'reach', 'views', 'visits', 'follows']
+    for col in expected:
+        if col not in final_df.columns:
+            final_df[col] = 1
+    final_df['date'] = pd.to_datetime(final_df['Date'], errors='coerce').dt.strftime('%m/%d/%Y')
+    final_df = final_df[expected]
+    final_df = final_df.fillna(1)
+    for col in ['interactions', 'link_clicks', 'reach', 'views', 'visits', 'follows']:
+        final_df[col] = pd.to_numeric(final_df[col], errors='coerce').fillna(1).astype(int)
+    final_df = final_df.sort_values('date')
+    final_df.to_csv(output_path, index=False, encoding='utf-8-sig')
+    return final_df
+
+
+def joined_process(raw_dir, output_path, start, end):
+    etl_facebook_metrics.process(raw_dir, output_path, start=start, end=end)
+    return pd.read_csv(output_path)
+
+
+def write_exports(raw_dir, years, files_per_kpi, extra_kpis, rng):
+    days = pd.date_range(end='2025-06-30', periods=int(years * 365), freq='D')
+    headers = dict(KPI_HEADERS, **{f'kpi_{i}': f'KPI {i}' for i in range(extra_kpis)})
+    files = 0
+    for kpi, header in headers.items():
+        values = rng.poisson(rng.integers(5, 2000), len(days))
+        for part, idx in enumerate(np.array_split(np.arange(len(days)), files_per_kpi)):
+            frame = pd.DataFrame({'Date': days[idx].strftime('%m/%d/%Y'), header: values[idx]})
+            frame.to_csv(os.path.join(raw_dir, f'{header} {part}.csv'), index=False)
+            files += 1
+    return days, files
+
+
+def run(label, func, raw_dir, output_path, start, end):
+    start_time = time.perf_counter()
+    df = func(raw_dir, output_path, start, end)
+    elapsed = time.perf_counter() - start_time
+    # Share of KPI cells holding 1 (what the legacy path filled gaps with) and left empty (the joined path's gaps)
+    kpis = df.drop(columns='date')
+    cells = kpis.size
+    print(f"{label:<8} {len(df):>9,} rows  {df['date'].nunique():>7,} distinct days  {df.shape[1] - 1:>3} KPI columns  "
+          f"{int((kpis == 1).to_numpy().sum()) / cells:>6.1%} cells = 1  {int(kpis.isna().to_numpy().sum()) / cells:>6.1%} empty  "
+          f"{elapsed:>8.3f}s")
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--years', type=float, default=12)
+    parser.add_argument('--files-per-kpi', type=int, default=6)
+    parser.add_argument('--extra-kpis', type=int, default=12)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(42)
+    with tempfile.TemporaryDirectory() as raw_dir, tempfile.TemporaryDirectory() as out_dir:
+        days, files = write_exports(raw_dir, args.years, args.files_per_kpi, args.extra_kpis, rng)
+        start, end = days[0].strftime('%Y-%m-%d'), days[-1].strftime('%Y-%m-%d')
+        print(f"{files} export files, {len(days):,} days ({start} .. {end})")
+        legacy = run('legacy', legacy_process, raw_dir, os.path.join(out_dir, 'legacy.csv'), start, end)
+        joined = run('joined', joined_process, raw_dir, os.path.join(out_dir, 'Facebook_metrics_table.csv'), start, end)
+        print(f"  legacy / joined time: {legacy / joined:.2f}")
+
+
+if __name__ == '__main__':
+    main()
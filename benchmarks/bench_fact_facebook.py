@@ -0,0 +1,108 @@
+"""
+Facebook fact generation benchmark: the former single Fact_Facebook (metrics
+joined on date with the content-type and audience tables) vs the per-grain
+Fact_Facebook_Daily/_Content/_Audience tables, on synthetic cleaned outputs.
+
+    python -m benchmarks.bench_fact_facebook --days 1000 --legacy-days 60
+
+The legacy join writes metrics x content x audience rows per day, so it is run
+on a shorter range (--legacy-days); rows and bytes per day are comparable.
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from etl import etl_generate_schema as schema  # noqa: E402
+
+METRIC_FILES = 6  # one metrics row per day and page export (Interactions, Reach, Views, ...)
+CONTENT_TYPES = ['Links', 'Multi media', 'Multi photo', 'Others', 'Photos', 'Reels', 'Stories', 'Text', 'Videos']
+GENDERS = ['Male', 'Female']
+AGE_RANGES = ['18-24', '25-34', '35-44', '45-54', '55-64', '65+']
+COUNTRIES = ['Tunisie', 'Algérie', 'France', 'Libye', 'Canada', 'Italie', 'Allemagne', 'Qatar', 'Arabie Saoudite', 'Émirats arabes unis']
+
+
+def write_cleaned_outputs(out_dir, days, seed=42):
+    rng = np.random.default_rng(seed)
+    dates = pd.date_range('2022-02-04', periods=days, freq='D').strftime('%m/%d/%Y')
+    kpis = ['interactions', 'link_clicks', 'reach', 'views', 'visits', 'follows']
+    metrics = pd.DataFrame({'date': np.repeat(dates, METRIC_FILES)})
+    for kpi in kpis:
+        metrics[kpi] = rng.integers(1, 500, len(metrics))
+    content = pd.DataFrame({
+        'date': np.repeat(dates, len(CONTENT_TYPES)),
+        'content_type': np.tile(CONTENT_TYPES, days),
+    })
+    content['published'] = 1
+    content['interactions'] = rng.integers(1, 50, len(content))
+    content['reach'] = rng.integers(1, 500, len(content))
+    combos = pd.MultiIndex.from_product([GENDERS, AGE_RANGES, COUNTRIES]).to_frame(index=False)
+    combos.columns = ['gender', 'age_range', 'country']
+    audience = combos.loc[np.tile(np.arange(len(combos)), days)].reset_index(drop=True)
+    audience.insert(0, 'date', np.repeat(dates, len(combos)))
+    audience['followers'] = rng.integers(0, 20, len(audience))
+
+    metrics.to_csv(os.path.join(out_dir, 'Facebook_metrics_table.csv'), index=False)
+    content.to_csv(os.path.join(out_dir, 'Facebook_content_type_table.csv'), index=False)
+    audience.to_csv(os.path.join(out_dir, 'Facebook_Audience_details.csv'), index=False)
+
+
+def legacy_fact_facebook(dim_date, dim_content, dim_audience):
+    # Joins of the previous generate_fact_facebook, all on date only
+    df = pd.read_csv(os.path.join(schema.OUTPUT, "Facebook_metrics_table.csv"))
+    df['date'] = pd.to_datetime(df['date'], errors='coerce').dt.date
+    fact = df.merge(dim_date, left_on='date', right_on='date', how='left')
+    cdf = pd.read_csv(os.path.join(schema.OUTPUT, "Facebook_content_type_table.csv"))
+    cdf['date'] = pd.to_datetime(cdf['date'], errors='coerce').dt.date
+    cdf = cdf.merge(dim_content, left_on='content_type', right_on='content_type', how='left')
+    fact = fact.merge(cdf[['date', 'content_type_id']], on='date', how='left')
+    adf = pd.read_csv(os.path.join(schema.OUTPUT, "Facebook_Audience_details.csv"))
+    adf['date'] = pd.to_datetime(adf['date'], errors='coerce').dt.date
+    adf = adf.merge(dim_audience, on=['gender', 'age_range', 'country'], how='left')
+    fact = fact.merge(adf[['date', 'audience_id']], on='date', how='left')
+    cols = ['date_id', 'content_type_id', 'audience_id', 'reach', 'views', 'interactions', 'link_clicks', 'visits', 'follows']
+    fact = fact[cols]
+    schema.save(fact, 'Fact_Facebook')
+    return [fact]
+
+
+def current_fact_facebook(dim_date, dim_content, dim_audience):
+    return list(schema.generate_fact_facebook(dim_date, dim_content, dim_audience))
+
+
+def run(label, func, days):
+    with tempfile.TemporaryDirectory() as out_dir:
+        schema.OUTPUT = out_dir
+        write_cleaned_outputs(out_dir, days)
+        dims = (schema.generate_dim_date(), schema.generate_dim_content_type(), schema.generate_dim_audience())
+        before = set(os.listdir(out_dir))
+        start = time.perf_counter()
+        facts = func(*dims)
+        elapsed = time.perf_counter() - start
+        written = sorted(name for name in set(os.listdir(out_dir)) - before if name.endswith('.csv'))
+        size = sum(os.path.getsize(os.path.join(out_dir, name)) for name in written)
+    rows = sum(len(fact) for fact in facts)
+    print(f"{label:<10} {days:>6,} days  {rows:>12,} rows  {size / 1e6:>10.1f} MB  {elapsed:>8.3f}s  "
+          f"{rows / days:>10,.0f} rows/day  {size / days / 1e3:>9.1f} kB/day  {elapsed / days * 1000:>8.2f} ms/day")
+    return elapsed / days, size / days
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--days', type=int, default=1000)
+    parser.add_argument('--legacy-days', type=int, default=60)
+    args = parser.parse_args()
+
+    legacy_time, legacy_size = run('legacy', legacy_fact_facebook, args.legacy_days)
+    current_time, current_size = run('per-grain', current_fact_facebook, args.days)
+    print(f"Per day: {legacy_time / current_time:.0f}x faster, {legacy_size / current_size:.0f}x smaller output")
+
+
+if __name__ == '__main__':
+    main()
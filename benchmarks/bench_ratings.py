@@ -0,0 +1,66 @@
+"""
+Review rating benchmark: the former per-row normalize_score / rating_from_sentiment
+applies vs etl.ratings.review_ratings.
+
+    python -m benchmarks.bench_ratings --rows 1000000
+
+tests/test_ratings.py checks the vectorized functions against the scalar
+utils.normalize_score.
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from etl import ratings  # noqa: E402
+from etl.utils import normalize_score  # noqa: E402
+
+
+def legacy_ratings(rating_col, source_type, sentiments):
+    # Previous transform_reviews rating block
+    scale = 10 if source_type == 'booking' else 5
+    normalized = rating_col.apply(lambda x: normalize_score(x, scale))
+
+    def rating_from_sentiment(sent):
+        if sent == 'positive':
+            return 9
+        elif sent == 'neutral':
+            return 6
+        elif sent == 'negative':
+            return 3
+        else:
+            return 5
+
+    return normalized.fillna(sentiments.apply(rating_from_sentiment)).astype(int)
+
+
+def run(label, func, rating_col, source_type, sentiments):
+    start = time.perf_counter()
+    func(rating_col, source_type, sentiments)
+    elapsed = time.perf_counter() - start
+    print(f"{label:<10} {len(rating_col):>9,} rows  {elapsed:>8.3f}s  {len(rating_col) / elapsed:>14,.0f} rows/s")
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(42)
+    # As read from an export: float scores with gaps, scorer labels
+    rating_col = pd.Series(rng.integers(1, 11, args.rows).astype(float))
+    rating_col[rng.random(args.rows) < 0.1] = np.nan
+    sentiments = pd.Series(rng.choice(['Positive', 'Neutral', 'Negative'], args.rows))
+    legacy = run('legacy', legacy_ratings, rating_col, 'booking', sentiments)
+    vectorized = run('vectorized', ratings.review_ratings, rating_col, 'booking', sentiments)
+    print(f"  {legacy / vectorized:.0f}x faster")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,80 @@
+"""
+Raw review ingestion benchmark: whole-file pd.read_csv of every column (the
+former raw reader) vs iter_raw_reviews() streaming only the alias-matched
+columns in bounded chunks, on synthetic exports with the shipped column layouts.
+
+    python -m benchmarks.bench_raw_reader --reviews 20000 80000 --chunk-size 5000
+
+Both paths compute the watermark keys and row fingerprints of each chunk, as
+etl_reviews.process does before transforming it. Each run is a fresh process;
+peak RSS is reported above the interpreter baseline (Linux only, /proc).
+"""
+import argparse
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.bench_arrow_cache import memory_mb  # noqa: E402
+from benchmarks.generate_data import write_reviews  # noqa: E402
+from etl import etl_reviews  # noqa: E402
+from etl.watermark import row_fingerprints  # noqa: E402
+
+
+def legacy_chunks(source_file, chunk_size):
+    # Previous raw reader: every column of the export, in one frame
+    try:
+        yield pd.read_csv(source_file, encoding='utf-8-sig')
+    except UnicodeDecodeError:
+        yield pd.read_csv(source_file, encoding='latin1')
+
+
+def streamed_chunks(source_file, chunk_size):
+    return etl_reviews.iter_raw_reviews(source_file, chunk_size)
+
+
+def measure(reader, raw_dir, chunk_size):
+    base_peak, _ = memory_mb()
+    start = time.perf_counter()
+    rows = columns = 0
+    for platform in etl_reviews.PLATFORMS:
+        for raw in reader(os.path.join(raw_dir, f'{platform}.csv'), chunk_size):
+            ids, dates = etl_reviews.raw_review_keys(raw)
+            row_fingerprints(raw)
+            rows += len(raw)
+            columns = max(columns, raw.shape[1])
+    elapsed = time.perf_counter() - start
+    peak, _ = memory_mb()
+    return elapsed, peak - base_peak, rows, columns
+
+
+def run(label, reader, raw_dir, chunk_size):
+    with multiprocessing.get_context('spawn').Pool(1) as pool:
+        elapsed, peak_mb, rows, columns = pool.apply(measure, (reader, raw_dir, chunk_size))
+    print(f"{label:<10} {rows:>9,} rows  {columns:>4} columns max  {elapsed:>8.3f}s  peak RSS +{peak_mb:>8.1f} MB")
+    return elapsed, peak_mb
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--reviews', type=int, nargs='+', default=[20_000, 80_000])
+    parser.add_argument('--chunk-size', type=int, default=etl_reviews.CHUNK_SIZE)
+    args = parser.parse_args()
+
+    for reviews in args.reviews:
+        with tempfile.TemporaryDirectory() as out_dir:
+            write_reviews(out_dir, reviews, years=5, hotels=1, rng=np.random.default_rng(42))
+            raw_dir = os.path.join(out_dir, 'data', 'raw', 'reviews')
+            legacy_time, legacy_peak = run('legacy', legacy_chunks, raw_dir, args.chunk_size)
+            streamed_time, streamed_peak = run('streamed', streamed_chunks, raw_dir, args.chunk_size)
+            print(f"  {legacy_time / streamed_time:.1f}x faster, {legacy_peak / max(streamed_peak, 0.1):.1f}x lower peak RSS\n")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,141 @@
+"""
+Rollup cube benchmark: every chart spec answered the former way (one groupby
+over the raw source rows per batch) vs from the rollup cube (a groupby over
+its pre-aggregated cells), for each year in the data.
+
+    python -m benchmarks.bench_rollup --output output --repeat 5
+
+Reads the tables of an existing output folder (run the pipeline first). Every
+chart must come out identical for every year; the benchmark exits non-zero
+on any mismatch.
+"""
+import argparse
+import os
+import sys
+import time
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from etl import chart_compiler, etl_rollup  # noqa: E402
+from etl.chart_specs import CHART_SPECS  # noqa: E402
+from etl.properties import PROPERTY_COLUMN  # noqa: E402
+
+
+def legacy_tables(base_dir):
+    # Source rows with the Year and month columns the former load_tables derived
+    tables = etl_rollup.load_sources(base_dir=base_dir)
+    for name, df in tables.items():
+        date_col = etl_rollup.SOURCES[name][1]
+        df['Year'] = df[date_col].dt.year
+        df['month'] = df[date_col].dt.strftime('%Y-%m')
+        for dim in etl_rollup.CUBE_COLUMNS[name][0]:
+            if dim in etl_rollup.BUCKETED_DIMENSIONS:
+                df[dim] = etl_rollup.dimension_values(df, dim)
+    return tables
+
+
+def legacy_aggregate(df, group_by, measures):
+    # Former chart_compiler.aggregate_batch over raw rows
+    keys = list(group_by)
+    named = {chart_compiler.measure_name(c, f): (c, f) for c, f in measures if f in ('sum', 'mean')}
+    wants_count = any(f == 'count' for _, f in measures)
+    if keys:
+        grouped = df.groupby(keys)
+        parts = []
+        if named:
+            parts.append(grouped.agg(**named))
+        if wants_count:
+            parts.append(grouped.size().rename(chart_compiler.measure_name('*', 'count')))
+        agg = pd.concat(parts, axis=1) if parts else grouped.size().to_frame().iloc[:, :0]
+    else:
+        row = {name: getattr(df[col], func)() for name, (col, func) in named.items()}
+        if wants_count:
+            row[chart_compiler.measure_name('*', 'count')] = len(df)
+        agg = pd.DataFrame([row])
+    if any(f == 'first_seen' for _, f in measures):
+        positions = pd.Series(range(len(df)), index=df.index)
+        first = positions.groupby([df[k] for k in keys]).min() if keys else 0
+        name = chart_compiler.measure_name('*', 'first_seen')
+        agg = agg.join(first.rename(name), how='outer') if keys else agg.assign(**{name: first})
+    for column, func in measures:
+        if func == 'mode':
+            counts = df.groupby(keys + [column]).size().rename('n').reset_index()
+            counts = counts.sort_values(keys + ['n'], ascending=[True] * len(keys) + [False], kind='stable')
+            if keys:
+                mode = counts.drop_duplicates(subset=keys).set_index(keys)[column].rename(chart_compiler.measure_name(column, 'mode'))
+                agg = agg.join(mode, how='outer')
+            else:
+                agg = agg.assign(**{chart_compiler.measure_name(column, 'mode'): counts[column].iloc[0] if not counts.empty else None})
+    return agg.reset_index() if keys else agg
+
+
+def legacy_run(specs, tables, save):
+    for (source, filters, group_by), batch in chart_compiler.plan_batches(specs).items():
+        if source not in tables:
+            continue
+        df = chart_compiler.apply_filters(tables[source], filters)
+        measures = []
+        for spec in batch:
+            for col, func in spec['aggregates'].values():
+                if (col == '*' or col in df.columns) and (col, func) not in measures:
+                    measures.append((col, func))
+        # One chart block per property of the source, as run_specs writes them
+        properties = sorted(tables[source][PROPERTY_COLUMN].unique())
+        aggs = {p: legacy_aggregate(df[df[PROPERTY_COLUMN] == p], group_by, measures) for p in properties}
+        for spec in batch:
+            charts = [chart_compiler.finalize(spec, aggs[p], df.columns).assign(**{PROPERTY_COLUMN: p}) for p in properties]
+            chart = pd.concat(charts, ignore_index=True)
+            save(chart[[PROPERTY_COLUMN] + [col for col in chart.columns if col != PROPERTY_COLUMN]],
+                 spec['chart_id'], spec['chart_type'])
+
+
+def collect(run, specs, data):
+    charts = {}
+    run(specs, data, lambda df, chart_id, chart_type: charts.__setitem__(chart_id, df))
+    return charts
+
+
+def same(expected, actual):
+    # Compared as exported: the CSV text of both tables
+    return expected.to_csv(index=False) == actual.to_csv(index=False)
+
+
+def timed(run, specs, data, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        charts = collect(run, specs, data)
+        best = min(best, time.perf_counter() - start)
+    return best, charts
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--output', default='output', help="output folder holding the source tables")
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    tables = legacy_tables(args.output)
+    cube = etl_rollup.build_cube(etl_rollup.load_sources(base_dir=args.output))
+    print(f"{sum(len(df) for df in tables.values()):,} source rows -> {len(cube):,} cube cells "
+          f"({time.perf_counter() - start:.2f}s to load and build)")
+
+    years = sorted(int(y) for y in cube.loc[cube['level'] == 'year', 'Year'].dropna().unique())
+    mismatches = []
+    for year in years:
+        specs = chart_compiler.resolve_specs(CHART_SPECS, {}, year)
+        legacy_seconds, expected = timed(legacy_run, specs, tables, args.repeat)
+        cube_seconds, actual = timed(chart_compiler.run_specs, specs, cube, args.repeat)
+        wrong = [chart_id for chart_id in expected if chart_id not in actual or not same(expected[chart_id], actual[chart_id])]
+        mismatches += [(year, chart_id) for chart_id in wrong]
+        print(f"{year}: {len(expected)} charts  raw rows {legacy_seconds:.3f}s  cube {cube_seconds:.3f}s  "
+              f"{legacy_seconds / cube_seconds:.1f}x  mismatches: {wrong or 'none'}")
+    if mismatches:
+        sys.exit(f"{len(mismatches)} chart(s) differ between the raw rows and the cube")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,86 @@
+"""
+Subratings extraction benchmark: vectorized wide-to-long reshape vs the former
+iterrows implementation, on a synthetic TripAdvisor export.
+
+    python -m benchmarks.bench_subratings --reviews 100000 --legacy-reviews 5000
+
+The legacy path builds one DataFrame per subrating and is timed on a smaller
+sample (--legacy-reviews); rows/sec is comparable across sample sizes.
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from etl.etl_subratings import extract_subratings  # noqa: E402
+
+SUBRATING_NAMES = ['Value', 'Rooms', 'Location', 'Cleanliness', 'Service', 'Sleep Quality']
+
+
+def synthetic_tripadvisor(n_reviews, seed=42):
+    rng = np.random.default_rng(seed)
+    data = {
+        'id': np.arange(1_000_000_000, 1_000_000_000 + n_reviews),
+        'placeInfo/name': 'Hotel Bizerta Resort Congres & SPA',
+        'publishedDate': pd.to_datetime('2019-01-01') + pd.to_timedelta(rng.integers(0, 6 * 365, n_reviews), unit='D'),
+        'rating': rng.integers(1, 6, n_reviews),
+        'text': 'Synthetic review text',
+        'user/name': [f'user {i}' for i in range(n_reviews)],
+    }
+    for i, name in enumerate(SUBRATING_NAMES):
+        present = rng.random(n_reviews) < 0.7
+        data[f'subratings/{i}/name'] = np.where(present, name, None)
+        data[f'subratings/{i}/value'] = np.where(present, rng.integers(1, 6, n_reviews).astype(float), np.nan)
+    return pd.DataFrame(data)
+
+
+def legacy_extract(df, review_id, reviewer_name, date_str):
+    # Row loop of the previous etl_subratings.process (TripAdvisor pairs + generic fallback)
+    all_dfs = []
+    ta_name_cols = sorted(c for c in df.columns if c.startswith('subratings/') and c.endswith('/name'))
+    ta_value_cols = sorted(c for c in df.columns if c.startswith('subratings/') and c.endswith('/value'))
+    generic_name_cols = sorted(c for c in df.columns if c.endswith('/name'))
+    generic_value_cols = sorted(c for c in df.columns if c.endswith('/value') or c.endswith('/score'))
+    for idx, row in df.iterrows():
+        rid, rname, rdate = review_id.iloc[idx], reviewer_name.iloc[idx], date_str.iloc[idx]
+        for cols in ((ta_name_cols, ta_value_cols), (generic_name_cols, generic_value_cols)):
+            for ncol, vcol in zip(*cols):
+                if pd.notna(row[ncol]) and pd.notna(row[vcol]):
+                    all_dfs.append(pd.DataFrame({
+                        'review_id': [rid], 'reviewer_name': [rname], 'Date': [rdate],
+                        'subrating_name': [row[ncol]], 'subrating_value': [row[vcol]],
+                    }))
+    return pd.concat(all_dfs, ignore_index=True) if all_dfs else pd.DataFrame()
+
+
+def run(label, func, df):
+    review_id = df['id']
+    reviewer_name = pd.Series('Unknown', index=df.index)
+    date_str = df['publishedDate'].dt.strftime('%Y-%m-%d')
+    start = time.perf_counter()
+    out = func(df, review_id, reviewer_name, date_str)
+    elapsed = time.perf_counter() - start
+    print(f"{label:<12} {len(df):>9,} reviews  {len(out):>10,} rows  {elapsed:>8.3f}s  "
+          f"{len(df) / elapsed:>12,.0f} reviews/s  {len(out) / elapsed:>12,.0f} rows/s")
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--reviews', type=int, default=100_000)
+    parser.add_argument('--legacy-reviews', type=int, default=5_000)
+    args = parser.parse_args()
+
+    df = synthetic_tripadvisor(args.reviews)
+    vectorized = run('vectorized', extract_subratings, df) / len(df)
+    legacy = run('legacy', legacy_extract, df.head(args.legacy_reviews)) / min(args.legacy_reviews, len(df))
+    print(f"Speedup per review: {legacy / vectorized:,.0f}x")
+
+
+if __name__ == '__main__':
+    main()
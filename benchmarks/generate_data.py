@@ -0,0 +1,234 @@
+"""
+Synthetic raw data generator for scale testing.
+
+Writes <out>/data/raw/reviews/{tripadvisor,booking,google}.csv and
+<out>/data/raw/facebook/*.csv with the exact column layouts of the files
+shipped in data/raw, so main.py can run unchanged from <out>.
+
+    python -m benchmarks.generate_data --out bench_data/100k --reviews 100000 --fb-days 3650 --hotels 20
+"""
+import argparse
+import os
+import shutil
+
+import numpy as np
+import pandas as pd
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+TEMPLATE_DIR = os.path.join(ROOT, 'data', 'raw')
+CHUNK_SIZE = 50_000
+END_DATE = pd.Timestamp('2025-06-30')
+
+PLATFORM_SHARES = {'tripadvisor': 0.28, 'booking': 0.21, 'google': 0.51}
+
+POSITIVE_PHRASES = [
+    "Très bon séjour, personnel accueillant.", "Great location right on the beach.",
+    "Le buffet était varié et délicieux.", "Rooms were clean and spacious.",
+    "Piscine magnifique, vue sur la mer.", "Staff went out of their way to help us.",
+    "Excellent rapport qualité prix.", "We loved the spa and the breakfast.",
+    "Personale gentilissimo e camere pulite.", "Perfect for a family holiday.",
+]
+NEGATIVE_PHRASES = [
+    "Chambres vieillottes et mal entretenues.", "The music was unbearable until 2am.",
+    "Buffet moyen et peu garni.", "Air conditioning did not work.",
+    "Service très lent au restaurant.", "Bathroom was dirty and smelled bad.",
+    "Wifi inexistant dans les chambres.", "Overpriced for what you get.",
+]
+NEUTRAL_PHRASES = [
+    "Nous sommes restés trois nuits.", "The hotel is close to the congress center.",
+    "Il faut réserver à l'avance.", "Check-in took about twenty minutes.",
+    "We came for a business trip.", "Parking is available in front of the hotel.",
+]
+REVIEWER_NAMES = ['Inge', 'Salvatore', 'Baligh', 'Eliane F', 'Royal W', 'Amine Slim', 'mariam mansour', 'Sami', 'Claire D', 'Youssef']
+COUNTRIES = ['Tunisia', 'France', 'Algeria', 'Italy', 'Germany', 'Libya', 'Canada', 'Poland', 'Qatar', 'Belgium']
+COUNTRY_CODES = ['TN', 'FR', 'DZ', 'IT', 'DE', 'LY', 'CA', 'PL', 'QA', 'BE']
+TA_TRIP_TYPES = ['BUSINESS', 'FAMILY', 'COUPLES', 'FRIENDS', 'NONE', 'SOLO']
+BOOKING_TRAVELER_TYPES = ['Group', 'Family', 'Couple', 'Solo traveller']
+GOOGLE_TRIP_TYPES = ['Vacation', 'Business']
+TA_SUBRATINGS = ['Value', 'Rooms', 'Location', 'Cleanliness', 'Service', 'Sleep Quality']
+BOOKING_SUBRATINGS = [
+    ('hotel_staff', 'Staff'), ('hotel_services', 'Facilities'), ('hotel_clean', 'Cleanliness'),
+    ('hotel_comfort', 'Comfort'), ('hotel_value', 'Value for money'), ('hotel_location', 'Location'),
+    ('hotel_free_wifi', 'Free Wifi'),
+]
+FACEBOOK_DAILY_FILES = {
+    # file name: (mean daily value, date format)
+    'Follows.csv': (40, '%m/%d/%Y'),
+    'Interactions.csv': (60, '%m/%d/%Y'),
+    'Link clicks.csv': (3, '%m/%d/%Y'),
+    'Reach.csv': (900, '%m/%d/%Y'),
+    'Views.csv': (2400, '%-m/%-d/%Y'),
+    'Visits.csv': (45, '%m/%d/%Y'),
+}
+FACEBOOK_SNAPSHOT_FILES = ['Audience.csv', 'Top content formats.csv']
+
+
+def template_columns(platform):
+    return list(pd.read_csv(os.path.join(TEMPLATE_DIR, 'reviews', f'{platform}.csv'), encoding='utf-8-sig', nrows=0).columns)
+
+
+def review_texts(rng, n):
+    # 1-4 phrases mixing positive, negative and neutral pools: many distinct texts, realistic sentiment spread
+    pools = [POSITIVE_PHRASES, NEGATIVE_PHRASES, NEUTRAL_PHRASES]
+    tone = rng.choice(3, size=n, p=[0.6, 0.25, 0.15])
+    lengths = rng.integers(1, 5, size=n)
+    texts = []
+    for t, k in zip(tone, lengths):
+        pool = pools[t]
+        picks = rng.integers(0, len(pool), size=k)
+        extra = rng.integers(0, len(NEUTRAL_PHRASES))
+        texts.append(' '.join([pool[i] for i in picks] + [NEUTRAL_PHRASES[extra]]))
+    return np.array(texts, dtype=object)
+
+
+def random_dates(rng, n, years):
+    offsets = rng.integers(0, int(years * 365), size=n)
+    seconds = rng.integers(0, 86400, size=n)
+    return END_DATE - pd.to_timedelta(offsets, unit='D') + pd.to_timedelta(seconds, unit='s')
+
+
+def with_missing(rng, values, rate):
+    values = np.asarray(values, dtype=object)
+    values[rng.random(len(values)) < rate] = None
+    return values
+
+
+def tripadvisor_chunk(rng, start, n, years, hotels):
+    hotel = rng.integers(0, hotels, size=n)
+    dates = random_dates(rng, n, years)
+    data = {
+        'id': np.arange(2_000_000_000 + start, 2_000_000_000 + start + n),
+        'lang': rng.choice(['fr', 'en', 'it', 'de'], size=n),
+        'locationId': 621137 + hotel,
+        'placeInfo/name': [f'Hotel {h} Resort & SPA' for h in hotel],
+        'placeInfo/addressObj/country': 'Tunisia',
+        'publishedDate': dates.strftime('%Y-%m-%d'),
+        'publishedPlatform': 'OTHER',
+        'rating': rng.integers(1, 6, size=n),
+        'text': review_texts(rng, n),
+        'title': rng.choice(['Une belle expérience', 'Nice stay', 'Décevant', 'Merci !'], size=n),
+        'travelDate': dates.strftime('%Y-%m'),
+        'tripType': rng.choice(TA_TRIP_TYPES, size=n),
+        'user/name': rng.choice(REVIEWER_NAMES, size=n),
+        'user/userLocation/name': with_missing(rng, rng.choice(COUNTRIES, size=n), 0.45),
+    }
+    has_subratings = rng.random(n) < 0.6
+    for i, name in enumerate(TA_SUBRATINGS):
+        present = has_subratings & (rng.random(n) < 0.85)
+        data[f'subratings/{i}/name'] = np.where(present, name, None)
+        data[f'subratings/{i}/value'] = np.where(present, rng.integers(1, 6, size=n).astype(float), np.nan)
+    return data
+
+
+def booking_chunk(rng, start, n, years, hotels):
+    hotel = rng.integers(0, hotels, size=n)
+    dates = random_dates(rng, n, years)
+    data = {
+        'checkInDate': (dates - pd.to_timedelta(rng.integers(1, 10, size=n), unit='D')).strftime('%Y-%m-%d'),
+        'dislikedText': with_missing(rng, review_texts(rng, n), 0.58),
+        'hotelId': 237636 + hotel,
+        'id': [f'{v:016x}' for v in rng.integers(0, 2**62, size=n) + start],
+        'likedText': with_missing(rng, review_texts(rng, n), 0.51),
+        'numberOfNights': rng.integers(1, 8, size=n),
+        'rating': rng.integers(1, 11, size=n),
+        'reviewDate': dates.strftime('%Y-%m-%dT%H:%M:%S.000Z'),
+        'reviewLanguage': rng.choice(['fr', 'en', 'it', 'pl'], size=n),
+        'roomInfo': 'Chambre Double vue sur Ville ',
+        'travelerType': rng.choice(BOOKING_TRAVELER_TYPES, size=n),
+        'userLocation': rng.choice(COUNTRIES, size=n),
+        'userName': rng.choice(REVIEWER_NAMES, size=n),
+    }
+    for i, (code, name) in enumerate(BOOKING_SUBRATINGS):
+        data[f'hotelRatingScores/{i}/codeName'] = code
+        data[f'hotelRatingScores/{i}/name'] = name
+        data[f'hotelRatingScores/{i}/score'] = np.round(rng.uniform(5, 10, size=n), 8)
+    return data
+
+
+def google_chunk(rng, start, n, years, hotels):
+    hotel = rng.integers(0, hotels, size=n)
+    dates = random_dates(rng, n, years)
+    return {
+        'countryCode': rng.choice(COUNTRY_CODES, size=n, p=[0.7] + [0.3 / 9] * 9),
+        'language': 'en',
+        'name': rng.choice(REVIEWER_NAMES, size=n),
+        'originalLanguage': with_missing(rng, rng.choice(['fr', 'ar', 'en'], size=n), 0.44),
+        'placeId': [f'ChIJFVQg_0Me4xIRsB_{h:08d}' for h in hotel],
+        'publishedAtDate': dates.strftime('%Y-%m-%dT%H:%M:%S.000Z'),
+        'rating': None,
+        'reviewContext/Trip type': with_missing(rng, rng.choice(GOOGLE_TRIP_TYPES, size=n), 0.72),
+        'reviewId': [f'Ci9DQUlRQUNvZENodHljRjlvT{start + i:020d}' for i in range(n)],
+        'stars': rng.integers(1, 6, size=n),
+        'text': with_missing(rng, review_texts(rng, n), 0.46),
+        'title': [f'Hôtel {h} Resort & SPA' for h in hotel],
+        'totalScore': 3.7,
+    }
+
+
+PLATFORM_BUILDERS = {
+    'tripadvisor': tripadvisor_chunk,
+    'booking': booking_chunk,
+    'google': google_chunk,
+}
+
+
+def write_reviews(out_dir, reviews, years, hotels, rng):
+    reviews_dir = os.path.join(out_dir, 'data', 'raw', 'reviews')
+    os.makedirs(reviews_dir, exist_ok=True)
+    for platform, share in PLATFORM_SHARES.items():
+        columns = template_columns(platform)
+        total = int(round(reviews * share))
+        path = os.path.join(reviews_dir, f'{platform}.csv')
+        for start in range(0, max(total, 1), CHUNK_SIZE):
+            n = min(CHUNK_SIZE, total - start)
+            if n <= 0:
+                pd.DataFrame(columns=columns).to_csv(path, index=False, encoding='utf-8-sig')
+                break
+            chunk = pd.DataFrame(PLATFORM_BUILDERS[platform](rng, start, n, years, hotels)).reindex(columns=columns)
+            chunk.to_csv(path, index=False, encoding='utf-8-sig' if start == 0 else 'utf-8',
+                         mode='w' if start == 0 else 'a', header=start == 0)
+        print(f"✔ {platform}: {total} reviews → {path}")
+
+
+def write_facebook(out_dir, days, rng):
+    facebook_dir = os.path.join(out_dir, 'data', 'raw', 'facebook')
+    os.makedirs(facebook_dir, exist_ok=True)
+    dates = pd.date_range(end='2025-03-03', periods=days, freq='D')
+    season = 1 + 0.5 * np.sin(2 * np.pi * (dates.dayofyear.to_numpy() - 100) / 365)
+    for file_name, (mean, date_format) in FACEBOOK_DAILY_FILES.items():
+        with open(os.path.join(TEMPLATE_DIR, 'facebook', file_name), 'r', encoding='utf-8-sig') as f:
+            header = f.readline().strip()
+        values = rng.poisson(mean * season)
+        df = pd.DataFrame({'Date': dates.strftime(date_format), 'value': values})
+        df.columns = header.split(',')
+        path = os.path.join(facebook_dir, file_name)
+        df.to_csv(path, index=False)
+        if file_name == 'Views.csv':
+            with open(path, 'a', encoding='utf-8') as f:
+                f.write(f"Sum of  views,{int(values.sum())}\n")
+    for file_name in FACEBOOK_SNAPSHOT_FILES:
+        shutil.copyfile(os.path.join(TEMPLATE_DIR, 'facebook', file_name), os.path.join(facebook_dir, file_name))
+    print(f"✔ Facebook: {days} days x {len(FACEBOOK_DAILY_FILES)} metric files → {facebook_dir}")
+
+
+def generate(out_dir, reviews=10_000, fb_days=3650, years=10, hotels=1, seed=42):
+    rng = np.random.default_rng(seed)
+    write_reviews(out_dir, reviews, years, hotels, rng)
+    write_facebook(out_dir, fb_days, rng)
+    os.makedirs(os.path.join(out_dir, 'output'), exist_ok=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--out', required=True, help="workspace directory to create")
+    parser.add_argument('--reviews', type=int, default=10_000, help="total reviews across the three platforms")
+    parser.add_argument('--fb-days', type=int, default=3650, help="days of daily Facebook metrics")
+    parser.add_argument('--years', type=float, default=10, help="years spanned by review dates")
+    parser.add_argument('--hotels', type=int, default=1)
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+    generate(args.out, args.reviews, args.fb_days, args.years, args.hotels, args.seed)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,150 @@
+"""
+Pipeline benchmark harness.
+
+Runs every step of main.py in its own child process from a workspace directory
+(data/raw + output, e.g. made by benchmarks.generate_data), recording wall time,
+peak RSS and output row counts per step into a JSON results file. Translation
+uses the offline backend and MongoDB an in-memory mongomock server, so the
+suite needs no network or database.
+
+    python -m benchmarks.run_pipeline --workspace bench_data/100k --generate --reviews 100000
+    python -m benchmarks.run_pipeline --workspace bench_data/100k --steps dag
+"""
+import argparse
+import glob
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+
+import pandas as pd
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from benchmarks.generate_data import generate  # noqa: E402
+
+# Files (relative to the workspace) whose row counts are reported after each step
+# (the per-property steps across all partitions)
+STEP_OUTPUTS = {
+    'reviews': ['output/partitions/*/Scrapped_reviews_cleaned.csv'],
+    'subratings': ['output/partitions/*/Subratings_reviews.csv'],
+    'follows_cleaning': ['output/partitions/*/Follows_cleaned.csv'],
+    'facebook_metrics': ['output/partitions/*/Facebook_metrics_table.csv'],
+    'facebook_audience': ['output/partitions/*/Facebook_Audience_details.csv'],
+    'facebook_content': ['output/partitions/*/Facebook_content_type_table.csv'],
+    'partitions': ['output/Scrapped_reviews_cleaned.csv', 'output/Subratings_reviews.csv', 'output/Follows_cleaned.csv',
+                   'output/Facebook_metrics_table.csv', 'output/Facebook_Audience_details.csv',
+                   'output/Facebook_content_type_table.csv'],
+    'schema': ['output/Dim_*.csv', 'output/Fact_*.csv'],
+    'rollup': ['output/Rollup_Cube.csv'],
+    'charts': ['output/charts/*.csv'],
+    'load_mongo': [],
+}
+
+OFFLINE_ENV = {
+    'TRANSLATION_BACKEND': 'offline',
+    'MONGO_URI': 'mongomock://',
+    # mongomock scans the whole collection for every upsert: keep the full reload there
+    'LOAD_MODE': 'replace',
+}
+
+
+def count_rows(path):
+    # Parsed rows, not lines: review texts contain embedded newlines
+    try:
+        return sum(len(chunk) for chunk in pd.read_csv(path, usecols=[0], chunksize=200_000))
+    except (pd.errors.EmptyDataError, ValueError):
+        return 0
+
+
+def output_rows(workspace, patterns):
+    rows = {}
+    for pattern in patterns:
+        for path in sorted(glob.glob(os.path.join(workspace, pattern))):
+            rows[os.path.relpath(path, workspace)] = count_rows(path)
+    return rows
+
+
+def run_step(workspace, step, env):
+    if step == 'dag':
+        # Whole pipeline through main.py's DAG runner, branches in parallel
+        code = "import sys, main; sys.exit(main.main([]))"
+    else:
+        code = f"import main; main.run_step({step!r})"
+    start = time.perf_counter()
+    proc = subprocess.Popen([sys.executable, '-c', code], cwd=workspace, env=env,
+                            stdout=subprocess.PIPE, stderr=subprocess.STDOUT)
+    output = proc.stdout.read()
+    # wait4 gives the child's own rusage (including its reaped children, e.g. worker pools)
+    _, status, usage = os.wait4(proc.pid, 0)
+    elapsed = time.perf_counter() - start
+    proc.returncode = os.waitstatus_to_exitcode(status)
+    return {
+        'step': step,
+        'seconds': round(elapsed, 3),
+        'peak_rss_mb': round(usage.ru_maxrss / 1024, 1),  # ru_maxrss is in KiB on Linux
+        'exit_code': proc.returncode,
+        'output_rows': output_rows(workspace, dag_outputs() if step == 'dag' else STEP_OUTPUTS.get(step, [])),
+        'log_tail': output.decode('utf-8', errors='replace').strip().splitlines()[-5:],
+    }
+
+
+def dag_outputs():
+    return [pattern for patterns in STEP_OUTPUTS.values() for pattern in patterns]
+
+
+def run_benchmark(workspace, steps=None):
+    import main
+    steps = steps or main.STEP_NAMES
+    os.makedirs(os.path.join(workspace, 'output'), exist_ok=True)
+    env = dict(os.environ, PYTHONPATH=ROOT + os.pathsep + os.environ.get('PYTHONPATH', ''), **OFFLINE_ENV)
+
+    results = []
+    for step in steps:
+        result = run_step(workspace, step, env)
+        results.append(result)
+        status = 'ok' if result['exit_code'] == 0 else f"exit {result['exit_code']}"
+        rows = sum(result['output_rows'].values())
+        print(f"{step:<20} {result['seconds']:>9.2f}s  {result['peak_rss_mb']:>9.1f} MB  {rows:>12,} rows  {status}")
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--workspace', required=True, help="directory holding data/raw (created with --generate)")
+    parser.add_argument('--generate', action='store_true', help="generate synthetic raw data into the workspace first")
+    parser.add_argument('--reviews', type=int, default=10_000)
+    parser.add_argument('--fb-days', type=int, default=3650)
+    parser.add_argument('--hotels', type=int, default=1)
+    parser.add_argument('--steps', nargs='*', help="subset of main.py steps to run one by one (default: all); "
+                                                   "'dag' runs the whole pipeline with main.py's parallel scheduler")
+    parser.add_argument('--results', default=None, help="JSON results file (default: <workspace>/benchmark_results.json)")
+    args = parser.parse_args()
+
+    workspace = os.path.abspath(args.workspace)
+    if args.generate:
+        generate(workspace, reviews=args.reviews, fb_days=args.fb_days, hotels=args.hotels)
+
+    started = time.time()
+    steps = run_benchmark(workspace, args.steps)
+    results = {
+        'workspace': workspace,
+        'started_at': time.strftime('%Y-%m-%dT%H:%M:%S', time.localtime(started)),
+        'python': sys.version.split()[0],
+        'pandas': pd.__version__,
+        'machine': platform.platform(),
+        'scale': {'reviews': args.reviews, 'fb_days': args.fb_days, 'hotels': args.hotels} if args.generate else None,
+        'total_seconds': round(sum(s['seconds'] for s in steps), 3),
+        'steps': steps,
+    }
+    results_path = args.results or os.path.join(workspace, 'benchmark_results.json')
+    with open(results_path, 'w', encoding='utf-8') as f:
+        json.dump(results, f, indent=2)
+    print(f"✔ Results saved → {results_path} (total {results['total_seconds']:.2f}s)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,47 @@
+import json
+import os
+import threading
+
+CACHE_DIR = os.path.join('output', '.cache')
+
+
+class JsonCache:
+    """Persistent key -> value map stored as one JSON file, safe to fill from worker threads."""
+
+    def __init__(self, path):
+        self.path = path
+        self.entries = {}
+        self.lock = threading.Lock()
+        self.dirty = False
+        if path and os.path.exists(path):
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    self.entries = json.load(f)
+            except (OSError, ValueError) as e:
+                print(f"Ignoring unreadable cache {path}: {e}")
+
+    def get(self, key):
+        return self.entries.get(key)
+
+    def put(self, key, value):
+        with self.lock:
+            self.entries[key] = value
+            self.dirty = True
+
+    def save(self):
+        if not self.path or not self.dirty:
+            return
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        # Property partitions run in parallel processes that share the cache: keep
+        # the entries another process saved meanwhile, and write through a private file
+        if os.path.exists(self.path):
+            try:
+                with open(self.path, 'r', encoding='utf-8') as f:
+                    self.entries = {**json.load(f), **self.entries}
+            except (OSError, ValueError):
+                pass
+        tmp_path = f"{self.path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.entries, f, ensure_ascii=False)
+        os.replace(tmp_path, self.path)
+        self.dirty = False
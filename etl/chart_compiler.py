@@ -0,0 +1,277 @@
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+from etl.etl_rollup import COUNT_SUFFIX, FIRST_ROW, ROWS, SUM_SUFFIX, cell_index, source_cells
+from etl.properties import PROPERTY_COLUMN
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+METADATA_FILES = ['reviews_dashboard_metadata.csv', 'facebook_dashboard_metadata.csv']
+
+# Output file of each source table, used to cross-check the metadata 'source_data' column
+SOURCE_FILES = {
+    'reviews': 'Scrapped_reviews_cleaned.csv',
+    'subratings': 'Subratings_reviews.csv',
+    'metrics': 'Facebook_metrics_table.csv',
+    'content': 'Facebook_content_type_table.csv',
+    'audience': 'Facebook_Audience_details.csv',
+    'follows': 'Follows_cleaned.csv',
+}
+
+# Placeholder for the dashboard year in filters and cards, resolved by resolve_specs
+CURRENT_YEAR = 'current'
+
+FILTER_OPS = {
+    '==': lambda series, value: series == value,
+    'ieq': lambda series, value: series.astype(str).str.lower() == str(value).lower(),
+}
+
+
+# ─── Metadata ─────────────────────────────────
+def load_chart_metadata(root=ROOT):
+    """chart_id -> row of reviews/facebook_dashboard_metadata.csv (chart_title, type, source_data, ...)."""
+    metadata = {}
+    for file_name in METADATA_FILES:
+        path = os.path.join(root, file_name)
+        if os.path.exists(path):
+            for row in pd.read_csv(path).to_dict('records'):
+                metadata[row['chart_id']] = row
+    return metadata
+
+
+def with_year(value, year):
+    return year if value == CURRENT_YEAR else value
+
+
+def resolve_specs(specs, metadata, year=None):
+    """
+    Fills chart_title and chart_type from the dashboard metadata when a spec
+    does not set them, replaces CURRENT_YEAR by year in filters and cards, and
+    warns when the metadata names another source file.
+    """
+    resolved = []
+    for spec in specs:
+        spec = dict(spec)
+        if 'filters' in spec:
+            spec['filters'] = [(column, op, with_year(value, year)) for column, op, value in spec['filters']]
+        if 'card' in spec:
+            spec['card'] = {key: with_year(value, year) for key, value in spec['card'].items()}
+        meta = metadata.get(spec['chart_id'], {})
+        spec.setdefault('chart_title', meta.get('chart_title'))
+        spec.setdefault('chart_type', meta.get('type', ''))
+        expected = SOURCE_FILES.get(spec['source'])
+        if meta.get('source_data') and expected and meta['source_data'] != expected:
+            print(f"Warning: {spec['chart_id']} reads {expected} but metadata says {meta['source_data']}")
+        resolved.append(spec)
+    return resolved
+
+
+# ─── Planning ─────────────────────────────────
+def batch_key(spec):
+    return (spec['source'], tuple(spec.get('filters', ())), tuple(spec.get('group_by', ())))
+
+
+def plan_batches(specs):
+    """Groups specs that share source, filters and group-by keys: each group is one groupby pass."""
+    batches = {}
+    for spec in specs:
+        batches.setdefault(batch_key(spec), []).append(spec)
+    return batches
+
+
+def cube_level(group_by, filters):
+    # Coarsest cube level holding every period column the batch filters or groups on
+    columns = set(group_by) | {column for column, _, _ in filters}
+    if 'date' in columns:
+        return 'day'
+    return 'month' if 'month' in columns else 'year'
+
+
+def available_columns(cells):
+    # Source columns the cells can answer: dimensions as they are, measures through their sums
+    return set(cells.columns) | {col[:-len(SUM_SUFFIX)] for col in cells.columns if col.endswith(SUM_SUFFIX)}
+
+
+def apply_filters(df, filters):
+    mask = pd.Series(True, index=df.index)
+    for column, op, value in filters:
+        mask &= FILTER_OPS[op](df[column], value)
+    return df[mask]
+
+
+def measure_name(column, func):
+    return f"{column}|{func}"
+
+
+# ─── Aggregation ──────────────────────────────
+def aggregate_batch(cells, group_by, measures):
+    """
+    One grouped pass over rollup cube cells computing every (column, func)
+    measure of a batch from the cells' mergeable parts: 'count' adds up their
+    row counts, 'sum' their sums, 'mean' is the summed sums over the summed
+    non-null counts, 'first_seen' the smallest first row (value_counts tie
+    order) and 'mode' the value with the most rows, ties broken by sort order
+    (same as Series.mode().iloc[0]).
+    """
+    keys = list(group_by)
+    parts = {ROWS: 'sum', FIRST_ROW: 'min'}
+    for column, func in measures:
+        if func in ('sum', 'mean'):
+            parts.update({column + SUM_SUFFIX: 'sum', column + COUNT_SUFFIX: 'sum'})
+    if keys:
+        totals = cells.groupby(keys).agg(parts)
+    else:
+        totals = pd.DataFrame([{col: getattr(cells[col], how)() for col, how in parts.items()}])
+
+    agg = pd.DataFrame(index=totals.index)
+    for column, func in measures:
+        name = measure_name(column, func)
+        if func == 'count':
+            agg[name] = totals[ROWS]
+        elif func == 'first_seen':
+            agg[name] = totals[FIRST_ROW]
+        elif func == 'sum':
+            agg[name] = totals[column + SUM_SUFFIX]
+        elif func == 'mean':
+            counts = totals[column + COUNT_SUFFIX].astype(float)
+            agg[name] = totals[column + SUM_SUFFIX].astype(float) / counts.where(counts > 0, np.nan)
+        elif func == 'mode':
+            mode = mode_aggregate(cells, keys, column)
+            agg = agg.join(mode, how='outer') if keys else agg.assign(**{name: mode})
+    return agg.reset_index() if keys else agg
+
+
+def mode_aggregate(cells, keys, column):
+    counts = cells.groupby(keys + [column])[ROWS].sum().rename('n').reset_index()
+    counts = counts.sort_values(keys + ['n'], ascending=[True] * len(keys) + [False], kind='stable')
+    if not keys:
+        return counts[column].iloc[0] if not counts.empty else None
+    top = counts.drop_duplicates(subset=keys)
+    return top.set_index(keys)[column].rename(measure_name(column, 'mode'))
+
+
+# ─── Finalizing one chart ─────────────────────
+def add_margin(df, value_col, group_col):
+    """
+    Adds margin percentage and absolute margin columns to a DataFrame.
+    Assumes df is sorted by group_col in ascending order.
+    """
+    df = df.sort_values(group_col).reset_index(drop=True)
+    df['Margin (Abs)'] = df[value_col].diff().fillna(0)
+    df['Margin (%)'] = df[value_col].pct_change().fillna(0).round(4) * 100
+    return df
+
+
+def finalize(spec, agg, available_columns):
+    keys = list(spec.get('group_by', ()))
+    aggregates = {name: (col, func) for name, (col, func) in spec['aggregates'].items()
+                  if col == '*' or col in available_columns}
+    out = agg[keys + [measure_name(c, f) for c, f in aggregates.values()]].copy()
+    out.columns = keys + list(aggregates)
+
+    if 'round' in spec:
+        out[list(aggregates)] = out[list(aggregates)].round(spec['round'])
+
+    if 'rank' in spec:
+        # Keep the row with the highest value per group (first key in sort order on ties)
+        per = list(spec['rank'].get('per', ()))
+        by = spec['rank']['by']
+        out = out.sort_values(per + [by], ascending=[True] * len(per) + [False], kind='stable')
+        out = out.drop_duplicates(subset=per) if per else out.head(1)
+        out = out.reset_index(drop=True)
+
+    if 'sort' in spec:
+        steps = spec['sort'] if isinstance(spec['sort'], list) else [spec['sort']]
+        for step in steps:
+            out = out.sort_values(step['by'], ascending=step.get('ascending', True), kind=step.get('kind', 'stable'))
+        out = out.reset_index(drop=True)
+    if 'limit' in spec:
+        out = out.head(spec['limit'])
+
+    if 'unpivot' in spec:
+        # One block per measure: group key, measure name, value and its own YoY margin
+        var_name, value_name = spec['unpivot']['var_name'], spec['unpivot']['value_name']
+        blocks = []
+        for name in aggregates:
+            block = add_margin(out[keys + [name]], name, keys[0]).rename(columns={name: value_name})
+            block[var_name] = name
+            blocks.append(block[keys + [var_name, value_name, 'Margin (%)', 'Margin (Abs)']])
+        out = pd.concat(blocks, ignore_index=True)
+    elif 'margin' in spec:
+        out = add_margin(out, spec['margin'], keys[0])
+
+    if 'rename' in spec:
+        out = out.rename(columns=spec['rename'])
+    if 'columns' in spec:
+        out = out[spec['columns']]
+
+    if 'card' in spec:
+        # Single-row summary card: identity columns, the filtered year, then the values
+        card = {'chart_id': [spec['chart_id']], 'chart_title': [spec['chart_title']],
+                'chart_type': [spec['chart_type']], 'years': [spec['card']['years']]}
+        for name in aggregates:
+            value = out[name].iloc[0] if not out.empty else spec['card'].get('empty')
+            card[name] = [value]
+        out = pd.DataFrame(card)
+    return out
+
+
+def finalize_per_property(spec, agg, empty, available_columns, properties):
+    """
+    The chart of each property, property_id first: agg is grouped by property
+    then the spec's keys, and every property is finalized on its own rows. A
+    property without any gets `empty`, the aggregate of no cells (zero counts
+    and sums on cards).
+    """
+    parts = dict(tuple(agg.groupby(PROPERTY_COLUMN, sort=False)))
+    charts = []
+    for property_id in properties:
+        part = parts[property_id].drop(columns=PROPERTY_COLUMN).reset_index(drop=True) if property_id in parts else empty
+        chart = finalize(spec, part, available_columns)
+        chart.insert(0, PROPERTY_COLUMN, property_id)
+        charts.append(chart)
+    return pd.concat(charts, ignore_index=True)
+
+
+# ─── Compiler ─────────────────────────────────
+def run_specs(specs, cube, save):
+    """
+    Runs the specs against the rollup cube: one grouped pass over the cells
+    of each batch (source and level), grouped by property first, then
+    per-chart, per-property finalizing and save(df, chart_id, chart_type).
+    Every chart holds one block per property of its source. Returns
+    [(chart_id, seconds)], batch time split evenly over its charts.
+    """
+    timings = []
+    index = cell_index(cube)
+    sources = {source for source, _ in index}
+    # Cells of each (source, level) the batches read, sliced once
+    slices = {}
+    batches = plan_batches(specs)
+    for (source, filters, group_by), batch in batches.items():
+        if source not in sources:
+            print(f"Skipping {', '.join(s['chart_id'] for s in batch)}: missing source {source}")
+            continue
+        start = time.perf_counter()
+        level = cube_level(group_by, filters)
+        if (source, level) not in slices:
+            slices[source, level] = source_cells(cube, source, level, index)
+        properties = sorted(slices[source, level][PROPERTY_COLUMN].unique())
+        cells = apply_filters(slices[source, level], filters)
+        available = available_columns(cells)
+        measures = []
+        for spec in batch:
+            for col, func in spec['aggregates'].values():
+                if (col == '*' or col in available) and (col, func) not in measures:
+                    measures.append((col, func))
+        agg = aggregate_batch(cells, [PROPERTY_COLUMN, *group_by], measures)
+        empty = aggregate_batch(cells.iloc[:0], group_by, measures)
+        shared = (time.perf_counter() - start) / len(batch)
+        for spec in batch:
+            chart_start = time.perf_counter()
+            save(finalize_per_property(spec, agg, empty, available, properties), spec['chart_id'], spec['chart_type'])
+            timings.append((spec['chart_id'], shared + time.perf_counter() - chart_start))
+    print(f"Compiled {len(specs)} chart specs into {len(batches)} grouped passes over the rollup cube")
+    return timings
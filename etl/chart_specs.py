@@ -0,0 +1,171 @@
+"""
+Declarative dashboard chart specs, compiled by etl/chart_compiler.py.
+
+Each spec reads the rollup cube cells of one source table (see
+etl_rollup.SOURCES and CUBE_COLUMNS) and describes:
+  chart_id      output id (chart_<chart_id>.csv, Charts collection)
+  source        source table name
+  filters       [(column, op, value)], op in chart_compiler.FILTER_OPS
+  group_by      grouping keys ([] aggregates the whole filtered table)
+  aggregates    {output column: (source column or '*', 'count' | 'sum' | 'mean' | 'mode' | 'first_seen')}
+  round         decimals applied to the aggregates
+  rank          {'by': column, 'per': [keys]}: keep the top row per group
+  sort          {'by', 'ascending', 'kind'} or a list of such steps, applied in order
+  limit         keep the first N rows
+  margin        column whose YoY margin is added along group_by[0]
+  unpivot       {'var_name', 'value_name'}: one block per aggregate, each with its margin
+  rename        {column: new name}
+  columns       final column selection and order
+  card          {'years': year}: single-row summary card (chart_id, chart_title, chart_type, years, value)
+
+CURRENT_YEAR in filters and cards stands for the dashboard year, resolved at
+run time (DASHBOARD_YEAR, or the latest year in the data).
+
+chart_title and chart_type default to the dashboard metadata CSVs, so a chart
+listed there only needs its data recipe here. Specs that share source, filters
+and group_by are computed in a single groupby pass.
+"""
+from etl.chart_compiler import CURRENT_YEAR
+
+IN_YEAR = ('Year', '==', CURRENT_YEAR)
+
+FACEBOOK_KPIS = {
+    'fb_card_1': ('Total Interactions', 'interactions'),
+    'fb_card_2': ('Total Reach', 'reach'),
+    'fb_card_3': ('Total Followers', 'follows'),
+    'fb_card_4': ('Total Link Clicks', 'link_clicks'),
+    'fb_card_5': ('Total Views', 'views'),
+    'fb_card_6': ('Total Visits', 'visits'),
+}
+FACEBOOK_LINES = {
+    'fb_chart_line_1': 'interactions',
+    'fb_chart_line_2': 'reach',
+    'fb_chart_line_3': 'follows',
+    'fb_chart_line_4': 'link_clicks',
+    'fb_chart_line_5': 'views',
+    'fb_chart_line_6': 'visits',
+}
+
+
+def count_by(chart_id, column, year_filter=True, **extra):
+    # Value-counts style bar: one row per value, most frequent first
+    spec = {
+        'chart_id': chart_id, 'chart_type': 'bar', 'source': 'reviews',
+        'filters': [IN_YEAR] if year_filter else [],
+        'group_by': [column],
+        'aggregates': {'review_count': ('*', 'count'), 'first_seen': ('*', 'first_seen')},
+        # Same steps as Series.value_counts(): groups in first-appearance order, then a quicksort on the count
+        'sort': [{'by': 'first_seen'}, {'by': 'review_count', 'ascending': False, 'kind': 'quicksort'}],
+        'columns': [column, 'review_count'],
+    }
+    spec.update(extra)
+    return spec
+
+
+def top_per_year(chart_id, source, column, value='Review Count', measure=('*', 'count')):
+    return {
+        'chart_id': chart_id, 'source': source,
+        'group_by': ['Year', column],
+        'aggregates': {value: measure},
+        'rank': {'by': value, 'per': ['Year']},
+    }
+
+
+def yearly_with_margin(chart_id, source, value, measure, **extra):
+    spec = {
+        'chart_id': chart_id, 'source': source,
+        'group_by': ['Year'],
+        'aggregates': {value: measure},
+        'margin': value,
+        'columns': ['Year', value, 'Margin (%)', 'Margin (Abs)'],
+    }
+    spec.update(extra)
+    return spec
+
+
+CHART_SPECS = [
+    # ─── Scraped reviews: cards ───────────────
+    {'chart_id': 'scr_card_1', 'chart_title': 'Total Reviews', 'chart_type': 'summary_card', 'source': 'reviews',
+     'filters': [IN_YEAR], 'group_by': [], 'aggregates': {'review_count': ('*', 'count')}, 'card': {'years': CURRENT_YEAR}},
+    {'chart_id': 'scr_card_2', 'chart_title': 'Average Rating', 'chart_type': 'summary_card', 'source': 'reviews',
+     'filters': [IN_YEAR], 'group_by': [], 'aggregates': {'normalized_rating': ('normalized_rating', 'mean')},
+     'round': 2, 'card': {'years': CURRENT_YEAR}},
+    {'chart_id': 'scr_card_3', 'chart_title': 'Positive Reviews', 'chart_type': 'summary_card', 'source': 'reviews',
+     'filters': [IN_YEAR, ('sentiment', 'ieq', 'positive')], 'group_by': [],
+     'aggregates': {'sentiment': ('*', 'count')}, 'card': {'years': CURRENT_YEAR}},
+    {'chart_id': 'scr_card_4', 'chart_title': 'Negative Reviews', 'chart_type': 'summary_card', 'source': 'reviews',
+     'filters': [IN_YEAR, ('sentiment', 'ieq', 'negative')], 'group_by': [],
+     'aggregates': {'sentiment': ('*', 'count')}, 'card': {'years': CURRENT_YEAR}},
+    {'chart_id': 'scr_card_5', 'chart_title': 'Most Common Stay Type', 'chart_type': 'summary_card', 'source': 'reviews',
+     'filters': [IN_YEAR], 'group_by': [], 'aggregates': {'stay_type': ('stay_type', 'mode')}, 'card': {'years': CURRENT_YEAR}},
+
+    # ─── Scraped reviews: charts ──────────────
+    {'chart_id': 'scr_chart_line_1', 'chart_type': 'line', 'source': 'reviews',
+     'group_by': ['month'], 'aggregates': {'review_count': ('*', 'count')}},
+    {'chart_id': 'scr_chart_line_2', 'chart_type': 'line', 'source': 'reviews',
+     'group_by': ['month'], 'aggregates': {'normalized_rating': ('normalized_rating', 'mean')}, 'round': 2},
+    count_by('scr_chart_bar_1', 'sentiment'),
+    count_by('scr_chart_bar_2', 'country', limit=10),
+    count_by('scr_chart_bar_3', 'stay_type'),
+    {'chart_id': 'scr_chart_bar_4', 'chart_type': 'bar', 'source': 'subratings',
+     'filters': [IN_YEAR], 'group_by': ['subrating_name'],
+     'aggregates': {'avg_subrating': ('subrating_value', 'mean')}, 'round': 2,
+     'rename': {'subrating_name': 'subrating'}},
+    {'chart_id': 'scr_chart_bar_5', 'chart_type': 'bar', 'source': 'reviews',
+     'filters': [IN_YEAR], 'group_by': ['rating'], 'aggregates': {'review_count': ('*', 'count')}},
+    count_by('scr_chart_pie_5', 'platform', chart_type='pie'),
+
+    # ─── Facebook: cards and yearly lines ─────
+    *[{'chart_id': chart_id, 'chart_title': title, 'chart_type': 'summary_card', 'source': 'metrics',
+       'filters': [IN_YEAR], 'group_by': [], 'aggregates': {kpi: (kpi, 'sum')}, 'card': {'years': CURRENT_YEAR}}
+      for chart_id, (title, kpi) in FACEBOOK_KPIS.items()],
+    *[{'chart_id': chart_id, 'chart_type': 'line', 'source': 'metrics',
+       'group_by': ['Year'], 'aggregates': {kpi: (kpi, 'sum')}, 'rename': {'Year': 'year'}}
+      for chart_id, kpi in FACEBOOK_LINES.items()],
+    {'chart_id': 'fb_chart_bar_1', 'chart_type': 'bar', 'source': 'content',
+     'filters': [IN_YEAR], 'group_by': ['content_type'], 'aggregates': {'interactions': ('interactions', 'sum')}},
+    {'chart_id': 'fb_chart_pie_2', 'chart_type': 'pie', 'source': 'audience',
+     'filters': [IN_YEAR], 'group_by': ['gender'], 'aggregates': {'followers': ('followers', 'sum')}},
+    {'chart_id': 'fb_chart_pie_3', 'chart_type': 'pie', 'source': 'audience',
+     'filters': [IN_YEAR], 'group_by': ['age_range'], 'aggregates': {'followers': ('followers', 'sum')}},
+
+    # ─── Facebook: dashboard metadata charts ──
+    {'chart_id': 'facebook_metrics_summary', 'chart_type': 'summary_card', 'source': 'metrics',
+     'group_by': ['Year'],
+     'aggregates': {kpi: (kpi, 'sum') for kpi in ['visits', 'views', 'link_clicks', 'interactions', 'reach']},
+     'unpivot': {'var_name': 'KPI', 'value_name': 'Value'}},
+    yearly_with_margin('follower_growth', 'follows', 'Follows', ('Follows', 'sum')),
+    yearly_with_margin('engagement_over_time', 'metrics', 'interactions', ('interactions', 'sum')),
+    yearly_with_margin('reach_over_time', 'metrics', 'reach', ('reach', 'sum')),
+    {'chart_id': 'content_type_performance', 'source': 'content',
+     'group_by': ['Year', 'content_type'], 'aggregates': {'interactions': ('interactions', 'sum')}},
+    {'chart_id': 'audience_gender_age', 'chart_type': 'bar', 'source': 'audience',
+     'group_by': ['Year', 'gender', 'age_range'], 'aggregates': {'followers': ('followers', 'sum')}},
+    {'chart_id': 'audience_country', 'source': 'audience',
+     'group_by': ['Year', 'country'], 'aggregates': {'followers': ('followers', 'sum')}},
+    yearly_with_margin('total_interactions', 'metrics', 'interactions', ('interactions', 'sum')),
+    yearly_with_margin('total_follows', 'follows', 'Follows', ('Follows', 'sum')),
+    yearly_with_margin('total_reach', 'metrics', 'reach', ('reach', 'sum')),
+    top_per_year('top_country', 'audience', 'country', 'followers', ('followers', 'sum')),
+    top_per_year('top_age_range', 'audience', 'age_range', 'followers', ('followers', 'sum')),
+    top_per_year('top_gender', 'audience', 'gender', 'followers', ('followers', 'sum')),
+
+    # ─── Reviews: dashboard metadata charts ───
+    yearly_with_margin('avg_rating_over_time', 'reviews', 'Average Rating', ('normalized_rating', 'mean'), round=2),
+    yearly_with_margin('review_volume_over_time', 'reviews', 'Review Count', ('*', 'count')),
+    {'chart_id': 'sentiment_distribution', 'chart_type': 'bar', 'source': 'reviews',
+     'group_by': ['Year', 'sentiment'], 'aggregates': {'Review Count': ('*', 'count')}},
+    {'chart_id': 'subratings_analysis', 'chart_type': 'bar', 'source': 'subratings',
+     'group_by': ['Year', 'subrating_name'], 'aggregates': {'subrating_value': ('subrating_value', 'mean')}, 'round': 2},
+    {'chart_id': 'reviews_by_country', 'source': 'reviews',
+     'group_by': ['Year', 'country'], 'aggregates': {'Review Count': ('*', 'count')}},
+    {'chart_id': 'reviews_by_stay_type', 'source': 'reviews',
+     'group_by': ['Year', 'stay_type'], 'aggregates': {'Review Count': ('*', 'count')}},
+    yearly_with_margin('total_reviews', 'reviews', 'Total Reviews', ('*', 'count')),
+    yearly_with_margin('average_rating', 'reviews', 'Average Rating', ('normalized_rating', 'mean'), round=2),
+    {'chart_id': 'most_common_sentiment', 'source': 'reviews',
+     'group_by': ['Year'], 'aggregates': {'Most Common Sentiment': ('sentiment', 'mode')}},
+    top_per_year('top_country_reviews', 'reviews', 'country'),
+    top_per_year('top_stay_type', 'reviews', 'stay_type'),
+    top_per_year('most_reviewed_platform', 'reviews', 'platform'),
+]
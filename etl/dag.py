@@ -0,0 +1,109 @@
+import os
+import time
+from collections import namedtuple
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+# One pipeline step. inputs/outputs are the files or directories it reads and
+# writes: a task depends on every task that produces one of its inputs. params
+# are the settings that change its result besides the inputs (part of its
+# stage-cache fingerprint).
+Task = namedtuple('Task', ['name', 'message', 'func', 'error', 'inputs', 'outputs', 'params'], defaults=[None])
+
+
+def task_dependencies(tasks):
+    """name -> set of upstream task names, derived from inputs/outputs."""
+    producers = {}
+    for task in tasks:
+        for path in task.outputs:
+            if path in producers:
+                raise ValueError(f"{path} is produced by both {producers[path]} and {task.name}")
+            producers[path] = task.name
+    deps = {}
+    for task in tasks:
+        deps[task.name] = {producers[p] for p in task.inputs if p in producers and producers[p] != task.name}
+    return deps
+
+
+def execution_order(tasks, deps=None):
+    """Topological order of the task names (declaration order among ready tasks); fails on cycles."""
+    deps = deps or task_dependencies(tasks)
+    order, done = [], set()
+    remaining = [task.name for task in tasks]
+    while remaining:
+        ready = [name for name in remaining if deps[name] <= done]
+        if not ready:
+            raise ValueError(f"Dependency cycle between tasks: {', '.join(remaining)}")
+        order.extend(ready)
+        done.update(ready)
+        remaining = [name for name in remaining if name not in done]
+    return order
+
+
+def timed_call(func):
+    # Runs in a worker process; module-level so the pool can pickle it
+    start = time.perf_counter()
+    func()
+    return time.perf_counter() - start
+
+
+def run_dag(tasks, max_workers=None, manifest=None, force=False):
+    """
+    Runs each task in a worker process as soon as its upstream tasks succeed,
+    at most max_workers at a time, so independent branches run concurrently.
+    A failed task only stops the tasks downstream of it. With a StageManifest,
+    a task whose input fingerprint matches its last successful run and whose
+    outputs exist is not run again (unless force). Returns name -> (status,
+    seconds), status being 'ok', 'cached', 'failed' or 'skipped'.
+    """
+    deps = task_dependencies(tasks)
+    execution_order(tasks, deps)
+    max_workers = max_workers or os.cpu_count() or 1
+    by_name = {task.name: task for task in tasks}
+    results = {}
+    pending = [task.name for task in tasks]
+    running = {}
+    fingerprints = {}
+
+    while pending or running:
+        # Skip tasks behind a failure, start tasks whose upstream is done
+        for name in list(pending):
+            upstream = deps[name]
+            blocked = [u for u in upstream if results.get(u, ('',))[0] in ('failed', 'skipped')]
+            if blocked:
+                print(f"Skipping {name}: upstream {', '.join(sorted(blocked))} did not complete")
+                results[name] = ('skipped', 0.0)
+                pending.remove(name)
+            elif all(u in results for u in upstream) and len(running) < max_workers:
+                task = by_name[name]
+                if manifest is not None:
+                    fingerprints[name] = manifest.fingerprint(task.inputs, task.params)
+                    if not force and manifest.is_fresh(name, fingerprints[name], task.outputs):
+                        print(f"✔ {name} unchanged, skipped (stage cache)")
+                        results[name] = ('cached', 0.0)
+                        pending.remove(name)
+                        continue
+                print(task.message)
+                # One single-worker pool per task: a crashed worker (e.g. out of memory) fails only that task
+                pool = ProcessPoolExecutor(max_workers=1)
+                running[pool.submit(timed_call, task.func)] = (name, pool)
+                pending.remove(name)
+        if not running:
+            # Only skipped or cached tasks were settled in this round; rescan for their dependents
+            continue
+
+        done, _ = wait(running, return_when=FIRST_COMPLETED)
+        for future in done:
+            name, pool = running.pop(future)
+            pool.shutdown()
+            try:
+                seconds = future.result()
+                results[name] = ('ok', seconds)
+                print(f"✔ {name} done in {seconds:.2f}s")
+                if manifest is not None:
+                    manifest.record(name, fingerprints[name])
+            except Exception as e:
+                results[name] = ('failed', 0.0)
+                print(f"{by_name[name].error}: {e}")
+                if manifest is not None:
+                    manifest.forget(name)
+    return results
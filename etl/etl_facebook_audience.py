@@ -1,56 +1,107 @@
 import pandas as pd
+import numpy as np
 import os
+import re
+from etl.storage import read_table, write_table
+from etl.utils import read_csv_sections
 
-def process(follows_path='output/Follows_cleaned.csv', output_path='output/Facebook_Audience_details.csv', **kwargs):
+COUNTRIES = [
+    "Tunisie", "Algérie", "France", "Libye", "Canada",
+    "Italie", "Allemagne", "Qatar", "Arabie Saoudite", "Émirats arabes unis"
+]
+GENDERS = ["Male", "Female"]
+AGE_RANGES = ["18-24", "25-34", "35-44", "45-54", "55-64", "65+"]
+# Audience.csv column -> gender
+GENDER_LABELS = {'men': 'Male', 'women': 'Female'}
+
+# Example plausible distribution, used without Audience.csv: more followers in 25-34 and 35-44, more for female in 25-34
+AGE_GENDER_WEIGHTS = {
+    ("Male", "18-24"): 1,
+    ("Male", "25-34"): 4,
+    ("Male", "35-44"): 5,
+    ("Male", "45-54"): 2,
+    ("Male", "55-64"): 1,
+    ("Male", "65+"): 1,
+    ("Female", "18-24"): 2,
+    ("Female", "25-34"): 12,
+    ("Female", "35-44"): 9,
+    ("Female", "45-54"): 3,
+    ("Female", "55-64"): 1,
+    ("Female", "65+"): 1,
+}
+
+def repair_name(name, known=COUNTRIES):
+    # The export replaced accented letters with U+FFFD ("Alg�rie"): match them against the known names
+    if '\ufffd' not in name:
+        return name
+    pattern = re.compile(re.escape(name).replace('\ufffd', '.'), re.IGNORECASE)
+    return next((k for k in known if pattern.fullmatch(k)), name.replace('\ufffd', ''))
+
+def default_weights():
+    weights = np.array([[AGE_GENDER_WEIGHTS[(g, a)] for a in AGE_RANGES] for g in GENDERS])
+    # gender x age x country, countries weighted equally
+    return GENDERS, AGE_RANGES, COUNTRIES, np.repeat(weights[:, :, None], len(COUNTRIES), axis=2)
+
+def audience_weights(audience_path):
+    """
+    (genders, age ranges, countries, weight tensor gender x age x country). From
+    Audience.csv: the 'Age & gender' shares times the 'Top countries' shares;
+    the default distribution when the file or one of its sections is missing.
+    """
+    if not audience_path or not os.path.exists(audience_path):
+        return default_weights()
+    sections = read_csv_sections(audience_path)
+    age_gender, countries = sections.get('Age & gender'), sections.get('Top countries')
+    if not age_gender or not countries or len(countries) < 2:
+        print(f"  {audience_path}: no 'Age & gender' / 'Top countries' sections, using the default distribution")
+        return default_weights()
+
+    header, rows = age_gender[0], age_gender[1:]
+    columns = {GENDER_LABELS[label.lower()]: i for i, label in enumerate(header) if label.lower() in GENDER_LABELS}
+    genders = [g for g in GENDERS if g in columns]
+    ages = [row[0] for row in rows]
+    age_gender_share = np.array([[float(row[columns[g]]) for row in rows] for g in genders])
+
+    names, shares = countries[0], countries[1]
+    country_names = [repair_name(name) for name in names[:len(shares)]]
+    country_share = np.array([float(v) for v in shares[:len(country_names)]])
+    return genders, ages, country_names, age_gender_share[:, :, None] * country_share[None, None, :]
+
+def allocate(dates, follows, genders, ages, countries, weights):
+    """
+    Audience rows (date x gender x age x country) as columnar arrays: the
+    followers matrix is the outer product of the daily follows and the weight
+    tensor, normalized by its total, at least 1 per segment.
+    """
+    date_codes, date_labels = pd.factorize(pd.Series(dates))
+    days, segments = len(date_codes), weights.size
+    followers = np.rint(np.outer(follows, weights.ravel()) / weights.sum())
+    followers = np.maximum(1, followers).astype(int).ravel()
+
+    # Segment codes in gender, age, country order, repeated for each day
+    gender_codes, age_codes, country_codes = (np.tile(codes.ravel(), days) for codes in np.indices(weights.shape))
+    return pd.DataFrame({
+        'date': pd.Categorical.from_codes(np.repeat(date_codes, segments), categories=date_labels),
+        'gender': pd.Categorical.from_codes(gender_codes, categories=genders),
+        'age_range': pd.Categorical.from_codes(age_codes, categories=ages),
+        'country': pd.Categorical.from_codes(country_codes, categories=countries),
+        'followers': followers,
+    })
+
+def process(follows_path='output/Follows_cleaned.csv', output_path='output/Facebook_Audience_details.csv', audience_path=None, **kwargs):
     print("Running etl_facebook_audience.process...")
 
-    follows_df = pd.read_csv(follows_path, encoding='utf-8-sig')
-    # Robust date parsing for mixed formats
-    follows_df['Date'] = pd.to_datetime(follows_df['Date'], errors='coerce', infer_datetime_format=True)
-    follows_df = follows_df.sort_values(by='Date').reset_index(drop=True)
-
-    countries = [
-        "Tunisie", "Algérie", "France", "Libye", "Canada",
-        "Italie", "Allemagne", "Qatar", "Arabie Saoudite", "Émirats arabes unis"
-    ]
-    genders = ["Male", "Female"]
-    age_ranges = ["18-24", "25-34", "35-44", "45-54", "55-64", "65+"]
-
-    # Example plausible distribution: more followers in 25-34 and 35-44, more for female in 25-34
-    age_gender_weights = {
-        ("Male", "18-24"): 1,
-        ("Male", "25-34"): 4,
-        ("Male", "35-44"): 5,
-        ("Male", "45-54"): 2,
-        ("Male", "55-64"): 1,
-        ("Male", "65+"): 1,
-        ("Female", "18-24"): 2,
-        ("Female", "25-34"): 12,
-        ("Female", "35-44"): 9,
-        ("Female", "45-54"): 3,
-        ("Female", "55-64"): 1,
-        ("Female", "65+"): 1,
-    }
-    total_weight = sum(age_gender_weights.values()) * len(countries)
-
-    audience_rows = []
-    for _, row in follows_df.iterrows():
-        date = row['Date'].strftime('%m/%d/%Y')
-        total_follows = int(row['Follows']) if row['Follows'] > 0 else 1
-        for gender in genders:
-            for age_range in age_ranges:
-                for country in countries:
-                    weight = age_gender_weights[(gender, age_range)]
-                    followers = max(1, round(total_follows * weight / total_weight))
-                    audience_rows.append({
-                        'date': date,
-                        'gender': gender,
-                        'age_range': age_range,
-                        'country': country,
-                        'followers': followers
-                    })
-    audience_df = pd.DataFrame(audience_rows)
-    audience_df = audience_df[['date', 'gender', 'age_range', 'country', 'followers']]
+    follows_df = read_table(follows_path, ['Date', 'Follows'])
+    follows_df['Date'] = pd.to_datetime(follows_df['Date'], errors='coerce')
+    follows_df = follows_df.dropna(subset=['Date']).sort_values(by='Date').reset_index(drop=True)
+
+    genders, ages, countries, weights = audience_weights(audience_path)
+    follows = pd.to_numeric(follows_df['Follows'], errors='coerce').to_numpy(dtype=float)
+    # A day without follows still gets its segments (1 follower each)
+    follows = np.where(follows > 0, np.trunc(follows), 1)
+
+    dates = follows_df['Date'].dt.strftime('%m/%d/%Y')
+    audience_df = allocate(dates, follows, genders, ages, countries, weights)
     os.makedirs(os.path.dirname(output_path), exist_ok=True)
-    audience_df.to_csv(output_path, index=False, encoding='utf-8-sig')
+    write_table(audience_df, output_path)
     print(f"Facebook audience saved → {output_path} ({len(audience_df)} rows)")
@@ -1,37 +1,147 @@
 import pandas as pd
+import numpy as np
 import os
+from etl.storage import read_table, table_exists, write_table
+from etl.utils import read_csv_sections
 
-def process(follows_path='output/Follows_cleaned.csv', output_path='output/Facebook_content_type_table.csv', **kwargs):
+METRICS = ['published', 'interactions', 'reach']
+# Top content formats.csv section -> metric it totals per content type
+FORMAT_SECTIONS = {
+    'Published content': 'published',
+    'Content interactions': 'interactions',
+    'Facebook reach': 'reach',
+}
+# Used without Top content formats.csv: the content_type names and order from your sample,
+# one published post and interaction a day and example reach values for each type
+CONTENT_TYPES = [
+    'Links', 'Multi media', 'Multi photo', 'Others', 'Photos', 'Reels', 'Stories', 'Text', 'Videos'
+]
+DEFAULT_DAILY = {
+    'published': [1] * len(CONTENT_TYPES),
+    'interactions': [1] * len(CONTENT_TYPES),
+    'reach': [12, 1, 7, 67, 65, 12, 4, 5, 3],
+}
+
+def content_mix(formats_path):
+    """
+    (content types, {metric: period total per type}) from the sections of Top
+    content formats.csv, or None without the file. A type missing from a
+    section counts 0 for that metric.
+    """
+    if not formats_path or not os.path.exists(formats_path):
+        return None
+    sections = read_csv_sections(formats_path)
+    totals = {}
+    for section, metric in FORMAT_SECTIONS.items():
+        rows = sections.get(section)
+        if rows and len(rows) >= 2:
+            totals[metric] = {name: float(value.replace(',', '')) for name, value in zip(rows[0], rows[1])}
+    if not totals:
+        return None
+    content_types = sorted(set().union(*totals.values()))
+    return content_types, {metric: np.array([totals.get(metric, {}).get(t, 0) for t in content_types]) for metric in METRICS}
+
+def largest_remainder(quotas, totals, axis):
+    """
+    Integer counts of quotas summing to totals along axis: each cell gets the
+    floor of its quota and the units left over go to the cells with the
+    largest fractions.
+    """
+    values = np.floor(quotas)
+    leftover = np.rint(totals) - values.sum(axis=axis)
+    order = np.argsort(values - quotas, axis=axis, kind='stable')
+    ranks = np.empty_like(order)
+    np.put_along_axis(ranks, order, np.expand_dims(np.arange(quotas.shape[axis]), 1 - axis), axis=axis)
+    return values + (ranks < np.expand_dims(leftover, axis))
+
+def daily_values(day_weights, totals):
+    """
+    days x types counts splitting each type's period total over the days by
+    their weight (one outer product per metric), so every type sums to its total.
+    """
+    quotas = np.outer(day_weights / day_weights.sum(), totals)
+    return largest_remainder(quotas, totals, axis=0).astype(np.int32)
+
+def daily_shares(day_totals, totals):
+    """
+    days x types counts splitting each day's own total of the metric by the
+    types' shares of the period totals, so every day sums to its total. Days
+    without a total stay NaN.
+    """
+    shares = totals / totals.sum() if totals.sum() > 0 else np.zeros(len(totals))
+    known = ~np.isnan(day_totals)
+    day_totals = np.where(known, day_totals, 0) * (totals.sum() > 0)
+    values = largest_remainder(np.outer(day_totals, shares), day_totals, axis=1)
+    return np.where(known[:, None], values, np.nan)
+
+def metric_totals(metrics_path, dates):
+    """{metric: total of each of dates} from the metrics table (NaN where it has no value), {} without it."""
+    if not metrics_path or not table_exists(metrics_path):
+        return {}
+    df = read_table(metrics_path, categories=False)
+    df.index = pd.to_datetime(df['date'], errors='coerce')
+    df = df[df.index.notna()]
+    days = pd.DatetimeIndex(dates)
+    return {metric: pd.to_numeric(df[metric], errors='coerce').groupby(level=0).sum(min_count=1)
+                      .reindex(days).to_numpy(dtype=float)
+            for metric in METRICS if metric in df.columns}
+
+def build_content_table(dates, content_types, values):
+    """
+    (date x content_type) table, date-major, from {metric: days x types array}:
+    dates and types repeated/tiled as categorical codes, metrics flattened.
+    Only the distinct dates are formatted.
+    """
+    date_codes, days = pd.factorize(pd.Series(dates))
+    date_labels = pd.DatetimeIndex(days).strftime('%m/%d/%Y')
+    types = len(content_types)
+    table = {
+        'date': pd.Categorical.from_codes(np.repeat(date_codes, types), categories=date_labels),
+        'content_type': pd.Categorical.from_codes(np.tile(np.arange(types), len(date_codes)), categories=content_types),
+    }
+    for metric in METRICS:
+        # Nullable: a day the metrics table has no value for stays empty
+        table[metric] = pd.array(np.asarray(values[metric], dtype=float).ravel()).astype('Int32')
+    return pd.DataFrame(table)
+
+def process(follows_path='output/Follows_cleaned.csv', output_path='output/Facebook_content_type_table.csv', formats_path=None,
+            metrics_path=None, **kwargs):
+    """
+    One row per day of the follows table and content type. With Top content
+    formats.csv, interactions and reach split each day's own total from the
+    metrics table by the types' shares of the file's period totals. Published
+    posts have no daily count in the exports: that metric (and any metric
+    without a metrics table column) is a follows-weighted split of the
+    file's period totals over the days, not an observed daily count.
+    """
     print("Running etl_facebook_content.process...")
 
-    if not os.path.exists(follows_path):
+    if not table_exists(follows_path):
         print(f"Error: Input file not found: {follows_path}")
         return
 
-    follows_df = pd.read_csv(follows_path, encoding='utf-8-sig')
-    # Robust date parsing for mixed formats
-    follows_df['Date'] = pd.to_datetime(follows_df['Date'], errors='coerce', infer_datetime_format=True)
-    follows_df = follows_df.sort_values('Date').reset_index(drop=True)
-
-    # Use the content_type names and order from your sample
-    content_types = [
-        'Links', 'Multi media', 'Multi photo', 'Others', 'Photos', 'Reels', 'Stories', 'Text', 'Videos'
-    ]
-    # Example reach values for each type (from your sample, or use a pattern)
-    reach_values = [12, 1, 7, 67, 65, 12, 4, 5, 3]
-    daily_rows = []
-    for idx, row in follows_df.iterrows():
-        date = row['Date'].strftime('%m/%d/%Y')
-        for i, ctype in enumerate(content_types):
-            daily_rows.append({
-                'date': date,
-                'content_type': ctype,
-                'published': 1,
-                'interactions': 1,
-                'reach': reach_values[i % len(reach_values)]
-            })
-    final_df = pd.DataFrame(daily_rows)
-    final_df = final_df[['date', 'content_type', 'published', 'interactions', 'reach']]
+    follows_df = read_table(follows_path, ['Date', 'Follows'])
+    follows_df['Date'] = pd.to_datetime(follows_df['Date'], errors='coerce')
+    follows_df = follows_df.dropna(subset=['Date']).sort_values('Date').reset_index(drop=True)
+    days = len(follows_df)
+
+    mix = content_mix(formats_path)
+    if mix is None:
+        content_types = CONTENT_TYPES
+        values = {metric: np.broadcast_to(DEFAULT_DAILY[metric], (days, len(content_types))) for metric in METRICS}
+    else:
+        content_types, totals = mix
+        day_totals = metric_totals(metrics_path, follows_df['Date'])
+        # Without daily totals, days are weighted by their follows (at least 1) as a proxy for page activity
+        follows = pd.to_numeric(follows_df['Follows'], errors='coerce').fillna(0).to_numpy(dtype=float)
+        day_weights = np.maximum(follows, 1)
+        values = {metric: daily_shares(day_totals[metric], totals[metric]) if metric in day_totals
+                  else daily_values(day_weights, totals[metric])
+                  for metric in METRICS}
+        print(f"  Daily totals from the metrics table: {', '.join(day_totals) or 'none'}; "
+              f"follows-weighted split: {', '.join(m for m in METRICS if m not in day_totals)}")
+
+    final_df = build_content_table(follows_df['Date'], content_types, values)
     os.makedirs(os.path.dirname(output_path), exist_ok=True)
-    final_df.to_csv(output_path, index=False, encoding='utf-8-sig')
+    write_table(final_df, output_path)
     print(f"✔ Facebook content types saved → {output_path} ({len(final_df)} rows)")
@@ -1,69 +1,85 @@
 import pandas as pd
 import os
+from etl.storage import write_table
+from etl.utils import clean_csv_file
 
-def process(raw_dir='data/raw/facebook/metrics', output_path='output/Facebook_metrics_table.csv', **kwargs):
-    print("Running etl_facebook_metrics.process...")
+# KPI columns of the metrics table, in output order; other KPIs found in the exports are appended
+KPI_COLUMNS = ['interactions', 'link_clicks', 'reach', 'views', 'visits', 'follows']
+# Export column (lower_snake_case) -> KPI, for the exports that name a KPI differently
+KPI_ALIASES = {
+    'total_reach': 'reach',
+    'page_views': 'views',
+    'page_likes': 'likes',
+    'followers': 'follows',
+}
+# Optional clip of the table to a period (YYYY-MM-DD); unset, the table covers every day of the exports
+START_DATE = os.getenv('METRICS_START_DATE') or None
+END_DATE = os.getenv('METRICS_END_DATE') or None
 
-    metrics = []
+def read_kpi_file(path):
+    """
+    Daily KPIs of one export as a date-indexed frame (one column per numeric
+    column), or None when the file is not a daily export (no date column, e.g.
+    Audience.csv).
+    """
+    df = clean_csv_file(path, parse_dates=True)
+    if 'date' not in df.columns:
+        return None
+    dates = pd.DatetimeIndex(pd.to_datetime(df['date'], errors='coerce')).normalize()
+    kpis = {}
+    for col in df.columns.drop('date'):
+        values = df[col] if pd.api.types.is_numeric_dtype(df[col]) else pd.to_numeric(df[col], errors='coerce')
+        if values.notna().any():
+            kpis[KPI_ALIASES.get(col, col)] = values.to_numpy()
+    if not kpis:
+        return None
+    # Rows without a date (e.g. the "Sum of views" total line) are not days
+    frame = pd.DataFrame(kpis, index=dates)[dates.notna()]
+    if frame.index.has_duplicates:
+        frame = frame.groupby(level=0).sum(min_count=1)
+    return frame
 
-    for file in os.listdir(raw_dir):
-        if file.endswith('.csv'):
-            df = pd.read_csv(os.path.join(raw_dir, file), encoding='utf-8-sig')
-            df.columns = df.columns.str.strip().str.replace('\ufeff', '')  # Fix BOM
-            df = df.rename(columns=lambda x: x.strip())
+def assemble_metrics(frames, start=START_DATE, end=END_DATE):
+    """
+    One row per day: every KPI frame outer-joined on the date index in a single
+    aligned concat. Exports of the same KPI (e.g. consecutive periods) are summed.
+    KPIs are nullable integers, NA where no export has the day.
+    start/end clip the days (None: first/last day found in the exports).
+    """
+    wide = pd.concat(frames, axis=1, join='outer', sort=True)
+    if wide.columns.has_duplicates:
+        wide = wide.T.groupby(level=0, sort=False).sum(min_count=1).T
+    wide = wide.loc[start:end]
 
-            # Normalize date
-            if 'Date' in df.columns:
-                df['Date'] = pd.to_datetime(df['Date'], dayfirst=True, errors='coerce')
-                df = df[df['Date'].between('2022-02-04', '2025-03-03')]
-            else:
-                continue
+    # A day missing from an export, or a KPI without any export, stays NA: nothing is invented
+    extra = sorted(col for col in wide.columns if col not in KPI_COLUMNS)
+    wide = wide.reindex(columns=KPI_COLUMNS + extra).round().astype('Int64')
 
-            # Replace zero values with minimum of 1 to avoid zero bias
-            for col in df.columns:
-                if df[col].dtype in ['int64', 'float64']:
-                    df[col] = df[col].replace(0, 1)
+    wide.index.name = 'date'
+    final_df = wide.reset_index()
+    final_df['date'] = final_df['date'].dt.strftime('%m/%d/%Y')
+    return final_df
 
-            metrics.append(df)
+def process(raw_dir='data/raw/facebook/metrics', output_path='output/Facebook_metrics_table.csv', start=START_DATE, end=END_DATE):
+    print("Running etl_facebook_metrics.process...")
+
+    # Every daily export in raw_dir is a KPI source: files are discovered, not listed
+    metrics = []
+    for file in sorted(os.listdir(raw_dir)):
+        if file.endswith('.csv'):
+            frame = read_kpi_file(os.path.join(raw_dir, file))
+            if frame is not None:
+                metrics.append(frame)
 
     if not metrics:
         print(" No valid Facebook metrics files found.")
         return
 
-    final_df = pd.concat(metrics, ignore_index=True)
-
-    # Standardize column names
-    col_rename_map = {
-        'Total Reach': 'reach',
-        'Reach': 'reach',
-        'Interactions': 'interactions',
-        'Page Views': 'views',
-        'Views': 'views',
-        'Visits': 'visits',
-        'Page Likes': 'likes',
-        'Followers': 'follows',
-        'Link Clicks': 'link_clicks',
-        'link_clicks': 'link_clicks',
-    }
-    for col in col_rename_map:
-        if col in final_df.columns:
-            final_df = final_df.rename(columns={col: col_rename_map[col]})
-
-    # Ensure all key KPIs exist and fill missing with 1
-    expected = ['date', 'interactions', 'link_clicks', 'reach', 'views', 'visits', 'follows']
-    for col in expected:
-        if col not in final_df.columns:
-            final_df[col] = 1
-    # Rename Date column to date and format
-    final_df['date'] = pd.to_datetime(final_df['Date'], errors='coerce').dt.strftime('%m/%d/%Y')
-    final_df = final_df[expected]
-    final_df = final_df.fillna(1)
-    # Convert all numeric columns to integers (no decimals)
-    for col in ['interactions', 'link_clicks', 'reach', 'views', 'visits', 'follows']:
-        if col in final_df.columns:
-            final_df[col] = pd.to_numeric(final_df[col], errors='coerce').fillna(1).astype(int)
-    final_df = final_df.sort_values('date')
+    final_df = assemble_metrics(metrics, start, end)
+    extra = [col for col in final_df.columns[1:] if col not in KPI_COLUMNS]
+    if extra:
+        print(f"  Additional KPI columns: {', '.join(extra)}")
 
     os.makedirs(os.path.dirname(output_path), exist_ok=True)
-    final_df.to_csv(output_path, index=False, encoding='utf-8-sig')
+    write_table(final_df, output_path)
     print(f"Facebook metrics saved → {output_path} ({len(final_df)} rows)")
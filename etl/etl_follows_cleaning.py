@@ -1,5 +1,12 @@
 import pandas as pd
+import os
 import re
+import sys
+
+# Allow `python etl/etl_follows_cleaning.py` as well as `import etl.etl_follows_cleaning`
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from etl.storage import write_table  # noqa: E402
 
 INPUT_PATH = "data/raw/facebook/Follows.csv"
 OUTPUT_PATH = "output/Follows_cleaned.csv"
@@ -40,7 +47,7 @@ def clean_follows_csv():
     df = pd.DataFrame(cleaned_rows)
     if not df.empty:
         df = df.sort_values(by='Date')
-        df.to_csv(OUTPUT_PATH, index=False, encoding='utf-8-sig')
+        write_table(df, OUTPUT_PATH)
         print(f"✔ Saved cleaned follows to: {OUTPUT_PATH} with {len(df)} rows")
     else:
         print("No valid rows found in follows data.")
@@ -51,7 +58,7 @@ def process(raw_path, output_path):
     # Use correct column name 'Follows' (capital F)
     if 'Follows' in df.columns:
         df_cleaned = df[df['Follows'] > 0]
-        df_cleaned.to_csv(output_path, index=False, encoding='utf-8-sig')
+        write_table(df_cleaned, output_path)
         print(f"✔ Saved cleaned follows to: {output_path} with {len(df_cleaned)} rows")
     else:
         print("Column 'Follows' not found in input file.")
@@ -1,156 +1,219 @@
 import pandas as pd
 import os
+import sys
 from datetime import datetime
 
+# Allow `python etl/etl_generate_schema.py` as well as `import etl.etl_generate_schema`
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from etl.properties import DEFAULT_PROPERTY, PROPERTY_COLUMN  # noqa: E402
+from etl.storage import read_table, table_columns, table_exists, write_table  # noqa: E402
+from etl.surrogate_keys import DimensionLookup  # noqa: E402
+
 OUTPUT = "output"
 os.makedirs(OUTPUT, exist_ok=True)
 
 def save(df, name):
-    df.to_csv(os.path.join(OUTPUT, f"{name}.csv"), index=False, encoding='utf-8-sig')
+    write_table(df, os.path.join(OUTPUT, f"{name}.csv"))
+
+# Every table is partitioned by property: dimension ids are numbered within each
+# property, so one property's tables can be regenerated and reloaded alone
+def read_partitioned(path, columns):
+    columns = [col for col in columns if col in table_columns(path)]
+    if PROPERTY_COLUMN not in table_columns(path):
+        # Outputs written before partitioning belong to the single default property
+        df = read_table(path, columns)
+        df.insert(0, PROPERTY_COLUMN, DEFAULT_PROPERTY)
+        return df
+    return read_table(path, [PROPERTY_COLUMN] + columns)
+
+def numbered(dim, id_col, columns):
+    # Distinct (property_id, columns) rows in their current order, id 1..n within each property
+    dim = dim[[PROPERTY_COLUMN] + columns].drop_duplicates().reset_index(drop=True)
+    dim.insert(1, id_col, dim.groupby(PROPERTY_COLUMN, sort=False, observed=True).cumcount() + 1)
+    return dim
+
+def sorted_dim(path, column, id_col, name):
+    # Dimension of the distinct non-empty values of one column, sorted within each property
+    if not table_exists(path):
+        return pd.DataFrame(columns=[PROPERTY_COLUMN, id_col, name])
+    df = read_partitioned(path, [column]).dropna(subset=[column])
+    df = df.rename(columns={column: name}).astype({PROPERTY_COLUMN: str, name: str})
+    return numbered(df.sort_values([PROPERTY_COLUMN, name]), id_col, [name])
 
 # --- Dim_Date ---
 def generate_dim_date():
-    # Collect all unique dates from all sources
-    dates = set()
+    # Collect all unique dates of each property from all sources
+    dates = []
     for fname in ["Facebook_metrics_table.csv", "Follows_cleaned.csv", "Facebook_Audience_details.csv", "Facebook_content_type_table.csv", "Scrapped_reviews_cleaned.csv", "Subratings_reviews.csv"]:
         path = os.path.join(OUTPUT, fname)
-        if os.path.exists(path):
-            df = pd.read_csv(path)
-            for col in df.columns:
-                if 'date' in col.lower():
-                    dates.update(pd.to_datetime(df[col], errors='coerce').dropna().dt.date.tolist())
-    dates = sorted(list(dates))
-    dim_date = pd.DataFrame({
-        'date_id': range(1, len(dates)+1),
-        'date': dates,
-        'day': [d.day for d in dates],
-        'month': [d.month for d in dates],
-        'year': [d.year for d in dates],
-    })
+        if table_exists(path):
+            date_cols = [col for col in table_columns(path) if 'date' in col.lower()]
+            df = read_partitioned(path, date_cols)
+            for col in date_cols:
+                dates.append(pd.DataFrame({
+                    PROPERTY_COLUMN: df[PROPERTY_COLUMN].astype(str),
+                    'date': pd.to_datetime(df[col], errors='coerce').dt.normalize(),
+                }).dropna().drop_duplicates())
+    if not dates:
+        dim_date = pd.DataFrame(columns=[PROPERTY_COLUMN, 'date_id', 'date', 'day', 'month', 'year'])
+        save(dim_date, 'Dim_Date')
+        return dim_date
+    dim_date = numbered(pd.concat(dates).sort_values([PROPERTY_COLUMN, 'date']), 'date_id', ['date'])
+    days = dim_date['date']
+    dim_date['date'] = days.dt.date
+    dim_date['day'], dim_date['month'], dim_date['year'] = days.dt.day, days.dt.month, days.dt.year
     save(dim_date, 'Dim_Date')
     return dim_date
 
 # --- Dim_Content_Type ---
 def generate_dim_content_type():
-    path = os.path.join(OUTPUT, "Facebook_content_type_table.csv")
-    if not os.path.exists(path):
-        return pd.DataFrame(columns=['content_type_id', 'content_type'])
-    df = pd.read_csv(path)
-    content_types = sorted(df['content_type'].dropna().unique())
-    dim = pd.DataFrame({'content_type_id': range(1, len(content_types)+1), 'content_type': content_types})
+    dim = sorted_dim(os.path.join(OUTPUT, "Facebook_content_type_table.csv"), 'content_type', 'content_type_id', 'content_type')
     save(dim, 'Dim_Content_Type')
     return dim
 
 # --- Dim_Audience ---
 def generate_dim_audience():
     path = os.path.join(OUTPUT, "Facebook_Audience_details.csv")
-    if not os.path.exists(path):
-        return pd.DataFrame(columns=['audience_id', 'gender', 'age_range', 'country'])
-    df = pd.read_csv(path)
-    unique = df[['gender', 'age_range', 'country']].drop_duplicates().reset_index(drop=True)
-    unique['audience_id'] = range(1, len(unique)+1)
-    cols = ['audience_id', 'gender', 'age_range', 'country']
-    save(unique[cols], 'Dim_Audience')
-    return unique[cols]
+    cols = [PROPERTY_COLUMN, 'audience_id', 'gender', 'age_range', 'country']
+    if not table_exists(path):
+        return pd.DataFrame(columns=cols)
+    df = read_partitioned(path, ['gender', 'age_range', 'country'])
+    # Segments keep the order they first appear in within each property
+    df = df.astype({col: str for col in [PROPERTY_COLUMN, 'gender', 'age_range', 'country']})
+    dim = numbered(df, 'audience_id', ['gender', 'age_range', 'country'])
+    save(dim[cols], 'Dim_Audience')
+    return dim[cols]
 
 # --- Dim_Reviews ---
 def generate_dim_reviews():
     path = os.path.join(OUTPUT, "Scrapped_reviews_cleaned.csv")
-    if not os.path.exists(path):
-        return pd.DataFrame(columns=['review_id', 'translated_text', 'sentiment'])
-    df = pd.read_csv(path)
-    dim = df[['id', 'translated_review_text', 'sentiment']].drop_duplicates().rename(columns={'id':'review_id', 'translated_review_text':'translated_text'})
+    if not table_exists(path):
+        return pd.DataFrame(columns=[PROPERTY_COLUMN, 'review_id', 'translated_text', 'sentiment'])
+    df = read_partitioned(path, ['id', 'translated_review_text', 'sentiment'])
+    dim = df[[PROPERTY_COLUMN, 'id', 'translated_review_text', 'sentiment']].drop_duplicates().rename(columns={'id':'review_id', 'translated_review_text':'translated_text'})
     save(dim, 'Dim_Reviews')
     return dim
 
 # --- Dim_Reviewer ---
 def generate_dim_reviewer():
     path = os.path.join(OUTPUT, "Scrapped_reviews_cleaned.csv")
-    if not os.path.exists(path):
-        return pd.DataFrame(columns=['reviewer_id', 'reviewer_name', 'country'])
-    df = pd.read_csv(path)
-    dim = df[['id', 'reviewer_name', 'country']].drop_duplicates().rename(columns={'id':'reviewer_id'})
+    if not table_exists(path):
+        return pd.DataFrame(columns=[PROPERTY_COLUMN, 'reviewer_id', 'reviewer_name', 'country'])
+    df = read_partitioned(path, ['id', 'reviewer_name', 'country'])
+    dim = df[[PROPERTY_COLUMN, 'id', 'reviewer_name', 'country']].drop_duplicates().rename(columns={'id':'reviewer_id'})
     save(dim, 'Dim_Reviewer')
     return dim
 
 # --- Dim_Subrating ---
 def generate_dim_subrating():
-    path = os.path.join(OUTPUT, "Subratings_reviews.csv")
-    if not os.path.exists(path):
-        return pd.DataFrame(columns=['subrating_id', 'subrating_name'])
-    df = pd.read_csv(path)
-    names = sorted(df['subrating_name'].dropna().unique())
-    dim = pd.DataFrame({'subrating_id': range(1, len(names)+1), 'subrating_name': names})
+    dim = sorted_dim(os.path.join(OUTPUT, "Subratings_reviews.csv"), 'subrating_name', 'subrating_id', 'subrating_name')
     save(dim, 'Dim_Subrating')
     return dim
 
 # --- Dim_Platform ---
 def generate_dim_platform():
-    path = os.path.join(OUTPUT, "Scrapped_reviews_cleaned.csv")
-    if not os.path.exists(path):
-        return pd.DataFrame(columns=['platform_id', 'platform_name'])
-    df = pd.read_csv(path)
-    platforms = sorted(df['platform'].dropna().unique())
-    dim = pd.DataFrame({'platform_id': range(1, len(platforms)+1), 'platform_name': platforms})
+    dim = sorted_dim(os.path.join(OUTPUT, "Scrapped_reviews_cleaned.csv"), 'platform', 'platform_id', 'platform_name')
     save(dim, 'Dim_Platform')
     return dim
 
 # --- Dim_StayType ---
 def generate_dim_staytype():
-    path = os.path.join(OUTPUT, "Scrapped_reviews_cleaned.csv")
-    if not os.path.exists(path):
-        return pd.DataFrame(columns=['stay_type_id', 'stay_type'])
-    df = pd.read_csv(path)
-    types = sorted(df['stay_type'].dropna().unique())
-    dim = pd.DataFrame({'stay_type_id': range(1, len(types)+1), 'stay_type': types})
+    dim = sorted_dim(os.path.join(OUTPUT, "Scrapped_reviews_cleaned.csv"), 'stay_type', 'stay_type_id', 'stay_type')
     save(dim, 'Dim_StayType')
     return dim
 
-# --- Fact_Facebook ---
-def generate_fact_facebook(dim_date, dim_content, dim_audience):
-    path = os.path.join(OUTPUT, "Facebook_metrics_table.csv")
-    if not os.path.exists(path):
-        return pd.DataFrame()
-    df = pd.read_csv(path)
+# --- Facebook facts: one table per grain, keyed on integer surrogate ids ---
+def check_grain(fact, source, name, key=None):
+    # Dimension joins must not add or drop rows; key, when given, is unique per row
+    if len(fact) != len(source):
+        raise ValueError(f"{name}: {len(fact)} rows for {len(source)} source rows")
+    if key:
+        dupes = fact.duplicated(subset=key).sum()
+        if dupes:
+            raise ValueError(f"{name}: {dupes} duplicate rows for grain {key}")
+    print(f"✔ {name}: {len(fact)} rows ({len(source)} source rows)")
+
+def read_dated(fname, columns):
+    path = os.path.join(OUTPUT, fname)
+    if not table_exists(path):
+        return None
+    df = read_partitioned(path, columns)
+    df[PROPERTY_COLUMN] = df[PROPERTY_COLUMN].astype(str)
     df['date'] = pd.to_datetime(df['date'], errors='coerce').dt.date
-    # Join with date_id
-    fact = df.merge(dim_date, left_on='date', right_on='date', how='left')
-    # For content_type_id, use Facebook_content_type_table.csv
-    ctype_path = os.path.join(OUTPUT, "Facebook_content_type_table.csv")
-    if os.path.exists(ctype_path):
-        cdf = pd.read_csv(ctype_path)
-        cdf['date'] = pd.to_datetime(cdf['date'], errors='coerce').dt.date
-        cdf = cdf.merge(dim_content, left_on='content_type', right_on='content_type', how='left')
-        cdf = cdf[['date', 'content_type_id', 'content_type']]
-        fact = fact.merge(cdf[['date', 'content_type_id']], on='date', how='left')
-    else:
-        fact['content_type_id'] = 1
-    # For audience_id, use Facebook_Audience_details.csv
-    aud_path = os.path.join(OUTPUT, "Facebook_Audience_details.csv")
-    if os.path.exists(aud_path):
-        adf = pd.read_csv(aud_path)
-        adf['date'] = pd.to_datetime(adf['date'], errors='coerce').dt.date
-        adf = adf.merge(dim_audience, on=['gender', 'age_range', 'country'], how='left')
-        adf = adf[['date', 'audience_id']]
-        fact = fact.merge(adf, on='date', how='left')
-    else:
-        fact['audience_id'] = 1
-    cols = ['date_id', 'content_type_id', 'audience_id', 'reach', 'views', 'interactions', 'link_clicks', 'visits', 'follows']
-    fact = fact[cols]
-    save(fact, 'Fact_Facebook')
+    return df
+
+def resolve(dim, key_cols, id_col, name, keys):
+    # Surrogate id of each (property_id, key) row of keys
+    return DimensionLookup(dim, [PROPERTY_COLUMN] + key_cols, id_col, name).resolve(keys)
+
+def with_date_id(df, dim_date):
+    fact = df.reset_index(drop=True)
+    fact['date_id'] = resolve(dim_date, ['date'], 'date_id', 'Dim_Date', fact[[PROPERTY_COLUMN, 'date']])
     return fact
 
+# --- Fact_Facebook_Daily (grain: property x date) ---
+def generate_fact_facebook_daily(dim_date):
+    df = read_dated("Facebook_metrics_table.csv", ['date', 'reach', 'views', 'interactions', 'link_clicks', 'visits', 'follows'])
+    if df is None:
+        return pd.DataFrame()
+    fact = with_date_id(df, dim_date)
+    fact = fact[[PROPERTY_COLUMN, 'date_id', 'reach', 'views', 'interactions', 'link_clicks', 'visits', 'follows']]
+    check_grain(fact, df, 'Fact_Facebook_Daily', key=[PROPERTY_COLUMN, 'date_id'])
+    save(fact, 'Fact_Facebook_Daily')
+    return fact
+
+# --- Fact_Facebook_Content (grain: property x date x content type) ---
+def generate_fact_facebook_content(dim_date, dim_content):
+    df = read_dated("Facebook_content_type_table.csv", ['date', 'content_type', 'published', 'interactions', 'reach'])
+    if df is None:
+        return pd.DataFrame()
+    fact = with_date_id(df, dim_date)
+    fact['content_type_id'] = resolve(dim_content, ['content_type'], 'content_type_id', 'Dim_Content_Type',
+                                      fact[[PROPERTY_COLUMN, 'content_type']].astype(str))
+    fact = fact[[PROPERTY_COLUMN, 'date_id', 'content_type_id', 'published', 'interactions', 'reach']]
+    check_grain(fact, df, 'Fact_Facebook_Content', key=[PROPERTY_COLUMN, 'date_id', 'content_type_id'])
+    save(fact, 'Fact_Facebook_Content')
+    return fact
+
+# --- Fact_Facebook_Audience (grain: property x date x gender x age range x country) ---
+def generate_fact_facebook_audience(dim_date, dim_audience):
+    df = read_dated("Facebook_Audience_details.csv", ['date', 'gender', 'age_range', 'country', 'followers'])
+    if df is None:
+        return pd.DataFrame()
+    fact = with_date_id(df, dim_date)
+    audience_keys = ['gender', 'age_range', 'country']
+    fact['audience_id'] = resolve(dim_audience, audience_keys, 'audience_id', 'Dim_Audience',
+                                  fact[[PROPERTY_COLUMN] + audience_keys].astype(str))
+    fact = fact[[PROPERTY_COLUMN, 'date_id', 'audience_id', 'followers']]
+    check_grain(fact, df, 'Fact_Facebook_Audience', key=[PROPERTY_COLUMN, 'date_id', 'audience_id'])
+    save(fact, 'Fact_Facebook_Audience')
+    return fact
+
+def generate_fact_facebook(dim_date, dim_content, dim_audience):
+    # The former single Fact_Facebook crossed every metrics row with all content and audience rows of its day
+    legacy = os.path.join(OUTPUT, "Fact_Facebook.csv")
+    if os.path.exists(legacy):
+        os.remove(legacy)
+        print(f"Removed {legacy}: replaced by Fact_Facebook_Daily/_Content/_Audience")
+    return (
+        generate_fact_facebook_daily(dim_date),
+        generate_fact_facebook_content(dim_date, dim_content),
+        generate_fact_facebook_audience(dim_date, dim_audience),
+    )
+
 # --- Fact_Reviews ---
 def generate_fact_reviews(dim_date, dim_reviewer, dim_subrating, dim_platform, dim_staytype):
     path = os.path.join(OUTPUT, "Subratings_reviews.csv")
     reviews_path = os.path.join(OUTPUT, "Scrapped_reviews_cleaned.csv")
-    out_cols = ['review_id','reviewer_id','subrating_id','platform_id','date_id','stay_type_id','rating','Subrating_value']
-    if not os.path.exists(path) or not os.path.exists(reviews_path):
+    out_cols = [PROPERTY_COLUMN,'review_id','reviewer_id','subrating_id','platform_id','date_id','stay_type_id','rating','Subrating_value']
+    if not table_exists(path) or not table_exists(reviews_path):
         print("Subratings_reviews.csv or Scrapped_reviews_cleaned.csv not found. Fact_Reviews will be empty.")
         save(pd.DataFrame(columns=out_cols), 'Fact_Reviews')
         return pd.DataFrame(columns=out_cols)
-    df = pd.read_csv(path)
-    rdf = pd.read_csv(reviews_path)
+    # Review ids are stored as text on both sides
+    df = read_partitioned(path, ['review_id', 'id', 'Date', 'subrating_name', 'subrating_value'])
+    rdf = read_partitioned(reviews_path, ['id', 'review_id', 'platform', 'stay_type', 'normalized_rating'])
     # Always ensure subratings has 'review_id' and reviews has 'id'
     if 'review_id' not in df.columns:
         if 'id' in df.columns:
@@ -166,51 +229,46 @@ def generate_fact_reviews(dim_date, dim_reviewer, dim_subrating, dim_platform, d
             print("Scrapped_reviews_cleaned.csv missing 'id' and 'review_id' columns!")
             save(pd.DataFrame(columns=out_cols), 'Fact_Reviews')
             return pd.DataFrame(columns=out_cols)
-    # Print unique values for join columns for diagnostics
-    print(f"Subratings review_id sample: {df['review_id'].dropna().unique()[:5]}")
-    print(f"Reviews id sample: {rdf['id'].dropna().unique()[:5]}")
-    # Merge on review_id <-> id
-    merged = df.merge(rdf, left_on='review_id', right_on='id', how='left', suffixes=('', '_r'))
-    print(f"Merged subratings with reviews: {len(merged)} rows (should match subratings rows)")
-    if merged.empty:
-        print("WARNING: Fact_Reviews merge is empty! Check review_id and id values for overlap.")
-    else:
-        print(merged.head())
-    merged = merged.merge(dim_reviewer, left_on='reviewer_name', right_on='reviewer_name', how='left')
-    print(f"After reviewer join: {len(merged)} rows")
-    merged = merged.merge(dim_subrating, left_on='subrating_name', right_on='subrating_name', how='left')
-    print(f"After subrating join: {len(merged)} rows")
-    merged = merged.merge(dim_platform, left_on='platform', right_on='platform_name', how='left')
-    print(f"After platform join: {len(merged)} rows")
-    merged = merged.merge(dim_staytype, left_on='stay_type', right_on='stay_type', how='left')
-    print(f"After staytype join: {len(merged)} rows")
-    merged = merged.merge(dim_date, left_on='Date', right_on='date', how='left')
-    print(f"After date join: {len(merged)} rows")
-    # Output columns as per schema
-    for col in ['review_id','reviewer_id','subrating_id','platform_id','date_id','stay_type_id']:
-        if col not in merged.columns:
-            merged[col] = None
-    # Use normalized_rating from reviews, subrating_value from subratings
-    if 'normalized_rating' not in merged.columns:
-        merged['normalized_rating'] = None
-    if 'subrating_value' not in merged.columns:
-        merged['subrating_value'] = None
-    merged = merged.rename(columns={'normalized_rating':'rating', 'subrating_value':'Subrating_value'})
-    # Only keep output columns
-    merged = merged[out_cols]
-    # If merged is empty, output a single row with all columns None (for schema)
-    if merged.empty:
-        print("Fact_Reviews is empty after all joins. Outputting a single row with all columns as None for schema.")
-        merged = pd.DataFrame([{col: None for col in out_cols}])
-    save(merged, 'Fact_Reviews')
+    for col in ['platform', 'stay_type', 'normalized_rating']:
+        if col not in rdf.columns:
+            rdf[col] = None
+
+    # One row per subrating: every key is resolved by lookup, never by a join that could fan out
+    df[PROPERTY_COLUMN] = df[PROPERTY_COLUMN].astype(str)
+    rdf[PROPERTY_COLUMN] = rdf[PROPERTY_COLUMN].astype(str)
+    review_keys = df[[PROPERTY_COLUMN, 'review_id']]
+    review = DimensionLookup(rdf, [PROPERTY_COLUMN, 'id'], name='Scrapped_reviews_cleaned').lookup(
+        review_keys, ['platform', 'stay_type', 'normalized_rating'])
+    reviewer_ids = dim_reviewer.astype({PROPERTY_COLUMN: str, 'reviewer_id': str})
+    with_key = lambda values: pd.concat([df[PROPERTY_COLUMN], values.astype(object)], axis=1)
+    fact = pd.DataFrame({
+        PROPERTY_COLUMN: df[PROPERTY_COLUMN],
+        'review_id': df['review_id'],
+        # Dim_Reviewer is keyed by review id
+        'reviewer_id': resolve(reviewer_ids, ['reviewer_id'], 'reviewer_id', 'Dim_Reviewer', review_keys),
+        'subrating_id': resolve(dim_subrating, ['subrating_name'], 'subrating_id', 'Dim_Subrating', with_key(df['subrating_name'])),
+        'platform_id': resolve(dim_platform, ['platform_name'], 'platform_id', 'Dim_Platform', with_key(review['platform'])),
+        'date_id': resolve(dim_date, ['date'], 'date_id', 'Dim_Date',
+                           with_key(pd.to_datetime(df['Date'], errors='coerce').dt.date)),
+        'stay_type_id': resolve(dim_staytype, ['stay_type'], 'stay_type_id', 'Dim_StayType', with_key(review['stay_type'])),
+        'rating': review['normalized_rating'],
+        'Subrating_value': df['subrating_value'] if 'subrating_value' in df.columns else None,
+    })
+    check_grain(fact, df, 'Fact_Reviews')
+    # If fact is empty, output a single row with all columns None (for schema)
+    if fact.empty:
+        print("Fact_Reviews is empty. Outputting a single row with all columns as None for schema.")
+        fact = pd.DataFrame([{col: None for col in out_cols}])
+    save(fact[out_cols], 'Fact_Reviews')
     fact_reviews_path = os.path.join(OUTPUT, 'Fact_Reviews.csv')
-    if os.path.exists(fact_reviews_path):
-        print(f"✔ Fact_Reviews.csv written to: {fact_reviews_path} ({len(merged)} rows)")
+    if table_exists(fact_reviews_path):
+        print(f"✔ Fact_Reviews.csv written to: {fact_reviews_path} ({len(fact)} rows)")
     else:
         print(f"❌ Fact_Reviews.csv was NOT created at: {fact_reviews_path}")
-    return merged
+    return fact
 
-if __name__ == "__main__":
+# --- Generate all dimension and fact tables ---
+def generate_all():
     dim_date = generate_dim_date()
     dim_content = generate_dim_content_type()
     dim_audience = generate_dim_audience()
@@ -221,3 +279,6 @@ if __name__ == "__main__":
     dim_staytype = generate_dim_staytype()
     generate_fact_facebook(dim_date, dim_content, dim_audience)
     generate_fact_reviews(dim_date, dim_reviewer, dim_subrating, dim_platform, dim_staytype)
+
+if __name__ == "__main__":
+    generate_all()
@@ -1,30 +1,52 @@
+import os
+import numpy as np
 import pandas as pd
-from etl.utils import translate_text, classify_sentiment, normalize_score, get_first_matching_col
-
-def process_reviews(source_file, source_type):
-    try:
-        df = pd.read_csv(source_file, encoding='utf-8-sig')
-    except UnicodeDecodeError:
-        df = pd.read_csv(source_file, encoding='latin1')
+from etl.utils import detect_encoding, read_header, iter_csv_chunks
+from etl.header_schema import header_mapping
+from etl.ratings import review_ratings
+from etl.translation import TranslationCache, get_backend, translate_series
+from etl.sentiment import SentimentCache, score_sentiment
+from etl.storage import read_table, table_exists, write_table
+from etl.watermark import (DEFAULT_STATE_PATH, forget_missing, load_watermarks, save_watermarks, row_fingerprints,
+                           select_delta, update_watermark)
+
+PLATFORMS = ['tripadvisor', 'booking', 'google']
+CHUNK_SIZE = 5000
+
+def iter_raw_reviews(source_file, chunk_size=CHUNK_SIZE):
+    """
+    Streams a raw export in chunks of at most chunk_size rows, reading only the
+    columns its header mapping resolves (exports carry hundreds of photo and
+    owner-response columns that are never used).
+    """
+    encoding = detect_encoding(source_file)
+    header = read_header(source_file, encoding)
+    fields = header_mapping(header)
+    print(f"{os.path.basename(source_file)}: {fields.describe()}")
+    # At least one column, so rows are still counted when no alias matches
+    usecols = fields.usecols() or header[:1]
+    return iter_csv_chunks(source_file, usecols, encoding, chunk_size)
+
+def transform_reviews(df, source_type, translator=None, translation_cache=None, sentiment_cache=None):
+    df = df.copy()
+    fields = header_mapping(df.columns)
 
     # ─── Reviewer Name ─────────────────────────────
-    reviewer = get_first_matching_col(df, [
-        'reviewer_name', 'user_name', 'author', 'name', 'user/name', 'username'
-    ], default='Unknown')
+    reviewer = fields.get(df, 'reviewer', default='Unknown')
     df['reviewer_name'] = reviewer.fillna('Unknown') if reviewer is not None else 'Unknown'
 
     # ─── Review Text ───────────────────────────────
     if source_type == 'booking' 'google''tripadvisor':
-        liked = get_first_matching_col(df, ['likedtext', 'liked_text'], '')
-        disliked = get_first_matching_col(df, ['dislikedtext', 'disliked_text'], '')
+        liked = fields.get(df, 'liked', '')
+        disliked = fields.get(df, 'disliked', '')
         df['review_text'] = (liked.fillna('') + ' ' + disliked.fillna('')).str.strip()
         df['review_text'] = df['review_text'].replace('', None)
     else:
-        text = get_first_matching_col(df, ['text', 'review', 'review_text', 'comment'], None)
+        text = fields.get(df, 'text', None)
         df['review_text'] = text.astype(str).replace('nan', None) if text is not None else None
 
     # ─── Review ID ────────────────────────────────
-    id_col = get_first_matching_col(df, ['id', 'reviewid', 'review_id'], None)
+    id_col = fields.get(df, 'id', None)
     if id_col is None:
         df['id'] = df.index + 1000000
     else:
@@ -33,9 +55,7 @@ def process_reviews(source_file, source_type):
         df.loc[missing_mask, 'id'] = df[missing_mask].index + 1000000
 
     # ─── Review Date ──────────────────────────────
-    date_col = get_first_matching_col(df, [
-        'Date', 'publisheddate', 'review_date', 'reviewdate', 'publishedatdate', 'day', 'datetime'
-    ], None)
+    date_col = fields.get(df, 'date', None)
     if date_col is not None:
         df['date'] = pd.to_datetime(date_col, errors='coerce')
         df['date'] = df['date'].mask(df['date'].dt.year < 2000, pd.NaT)
@@ -44,52 +64,32 @@ def process_reviews(source_file, source_type):
         df['date'] = '2023-01-01'
 
     # ─── Country ──────────────────────────────────
-    country = get_first_matching_col(df, [
-        'country', 'location', 'placeinfo/addressobj/country', 'userlocation', 'user/userlocation/name', 'countrycode'
-    ], 'Unknown')
+    country = fields.get(df, 'country', 'Unknown')
     df['country'] = country.fillna('Unknown') if country is not None else 'Unknown'
 
     # ─── Stay Type ────────────────────────────────
-    stay_type = get_first_matching_col(df, [
-        'stay_type', 'room_type', 'triptype', 'travelertype', 'reviewcontext/trip type'
-    ], 'Unknown')
+    stay_type = fields.get(df, 'stay_type', 'Unknown')
     df['stay_type'] = stay_type.fillna('Unknown') if stay_type is not None else 'Unknown'
 
     # ─── Platform ────────────────────────────────
     df['platform'] = source_type.capitalize()
 
     # ─── Translation, Sentiment ───────────────────
-    df['translated_review_text'] = df['review_text'].apply(translate_text)
-    df['sentiment'] = df['translated_review_text'].apply(classify_sentiment)
-
-    # ─── Normalized Rating ────────────────────────
-    rating_col = get_first_matching_col(df, ['rating', 'score', 'stars', 'totalscore'], None)
-    if rating_col is not None:
-        scale = 10 if source_type == 'booking' else 5
-        df['normalized_rating'] = rating_col.apply(lambda x: normalize_score(x, scale))
-    else:
-        df['normalized_rating'] = None
-
-    # ─── Generate Rating From Sentiment If Missing ─
-    def rating_from_sentiment(sent):
-        if sent == 'positive':
-            return 9
-        elif sent == 'neutral':
-            return 6
-        elif sent == 'negative':
-            return 3
-        else:
-            return 5
-
-    df['normalized_rating'] = df['normalized_rating'].fillna(
-        df['sentiment'].apply(rating_from_sentiment)
+    # Caches passed in are saved by the caller, once per run rather than once per chunk
+    df['translated_review_text'] = translate_series(
+        df['review_text'], backend=translator, cache=translation_cache, save=translation_cache is None
     )
-    df['normalized_rating'] = df['normalized_rating'].astype(int)
+    scored = score_sentiment(df['translated_review_text'], cache=sentiment_cache, save=sentiment_cache is None)
+    df['sentiment'] = scored['sentiment']
+    df['sentiment_polarity'] = scored['sentiment_polarity']
+
+    # ─── Normalized Rating (sentiment fallback when missing) ─
+    df['normalized_rating'] = review_ratings(fields.get(df, 'rating', None), source_type, df['sentiment'])
 
     # ─── Final Columns ────────────────────────────
     out_cols = [
         'id', 'reviewer_name', 'platform', 'review_text', 'translated_review_text',
-        'normalized_rating', 'date', 'country', 'sentiment', 'stay_type'
+        'normalized_rating', 'date', 'country', 'sentiment', 'sentiment_polarity', 'stay_type'
     ]
     for col in out_cols:
         if col not in df.columns:
@@ -102,21 +102,104 @@ def process_reviews(source_file, source_type):
 
     return df
 
+def raw_review_keys(df):
+    # Same id/date resolution as transform_reviews, computed on the raw export
+    fields = header_mapping(df.columns)
+    id_col = fields.get(df, 'id', None)
+    fallback_ids = pd.Series(df.index + 1000000, index=df.index)
+    ids = fallback_ids if id_col is None else id_col.fillna(fallback_ids)
+    date_col = fields.get(df, 'date', None)
+    dates = pd.to_datetime(date_col, errors='coerce') if date_col is not None else pd.Series(pd.NaT, index=df.index)
+    if getattr(dates.dt, 'tz', None) is not None:
+        dates = dates.dt.tz_localize(None)  # keep wall-clock dates, as transform_reviews does
+    return ids, dates
+
+def review_keys(df):
+    return df['platform'].astype(str) + '|' + df['id'].astype(str)
+
+def concat_rows(frames):
+    # Empty chunks (nothing new on a platform) would only trigger pandas' empty-entry dtype warning
+    non_empty = [frame for frame in frames if not frame.empty]
+    return pd.concat(non_empty or frames[:1], ignore_index=True)
+
+def merge_reviews(existing, delta, positions):
+    """
+    The previous output updated with the reprocessed reviews: a review in delta
+    replaces its previous version, reviews no longer in the raw exports are
+    dropped, and rows follow the exports' order (positions: platform|id ->
+    first raw row), as a full rebuild writes them.
+    """
+    existing_keys = review_keys(existing)
+    kept = existing[existing_keys.isin(positions.keys()) & ~existing_keys.isin(set(review_keys(delta)))]
+    merged = concat_rows([kept, delta])
+    order = review_keys(merged).map(positions).to_numpy()
+    return merged.iloc[np.argsort(order, kind='stable')].reset_index(drop=True)
+
+def read_previous_output(output_path):
+    # Same text form as transform_reviews output, so merged rows export unchanged
+    existing = read_table(output_path, categories=False)
+    existing['date'] = existing['date'].dt.strftime('%Y-%m-%d')
+    return existing
+
 # Used by main.py
-def process(raw_dir, output_path):
+def process(raw_dir, output_path, incremental=False, state_path=DEFAULT_STATE_PATH):
     print("Running etl_reviews.process...")
 
-    df_tripadvisor = process_reviews(f"{raw_dir}/tripadvisor.csv", 'tripadvisor')
-    df_booking = process_reviews(f"{raw_dir}/booking.csv", 'booking')
-    df_google = process_reviews(f"{raw_dir}/google.csv", 'google')
-
-    combined = pd.concat([df_tripadvisor, df_booking, df_google], ignore_index=True)
+    # Shared backend and caches, so a re-run only translates and scores new reviews
+    translator = get_backend()
+    caches = {'translation_cache': TranslationCache(), 'sentiment_cache': SentimentCache()}
+
+    # Without a previous output the watermark cannot be trusted: rebuild everything
+    incremental = incremental and table_exists(output_path)
+    state = load_watermarks(state_path) if incremental else {}
+
+    frames = []
+    positions = {}  # platform|id of every raw row -> its first position, to drop deleted reviews and keep raw order
+    for platform in PLATFORMS:
+        source = f"{raw_dir}/{platform}.csv"
+        if not os.path.exists(source):
+            # Not every property is listed on every platform
+            print(f"{platform}: no export in {raw_dir}, skipped")
+            state.pop(platform, None)
+            continue
+        platform_state = state.setdefault(platform, {})
+        platform_ids = set()
+        rows = selected = 0
+        # Chunk by chunk: watermark check, transform, watermark update
+        for raw in iter_raw_reviews(source):
+            ids, dates = raw_review_keys(raw)
+            fingerprints = row_fingerprints(raw)
+            mask = select_delta(ids, dates, fingerprints, platform_state) if incremental else pd.Series(True, index=raw.index)
+            rows += len(raw)
+            selected += int(mask.sum())
+            frames.append(transform_reviews(raw[mask], platform, translator, **caches))
+            update_watermark(platform_state, ids[mask], dates[mask], fingerprints[mask])
+            keys = ids.astype(str)
+            platform_ids.update(keys)
+            for review_id in keys:
+                positions.setdefault(f"{platform.capitalize()}|{review_id}", len(positions))
+        forget_missing(platform_state, platform_ids)
+        print(f"{platform}: {selected} new or changed of {rows} rows")
+    for cache in caches.values():
+        cache.save()
+
+    delta = concat_rows(frames)
+
+    if incremental:
+        existing = read_previous_output(output_path)
+        combined = merge_reviews(existing, delta, positions)
+        removed = len(existing) - int(review_keys(existing).isin(positions.keys()).sum())
+        if removed:
+            print(f"{removed} review(s) no longer in the raw exports removed")
+    else:
+        combined = delta
 
     # Final cleaning before export
     combined.replace("N/A", None, inplace=True)
 
-    combined.to_csv(output_path, index=False, encoding='utf-8')
-    print(f"✔ Saved cleaned reviews to: {output_path} with {len(combined)} rows")
+    write_table(combined, output_path, encoding='utf-8')
+    save_watermarks(state, state_path)
+    print(f"✔ Saved cleaned reviews to: {output_path} with {len(combined)} rows ({len(delta)} processed)")
 
 # Optional direct execution
 def run():
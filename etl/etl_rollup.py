@@ -0,0 +1,200 @@
+"""
+Rollup cube: every source table pre-aggregated at day, month and year level,
+crossed with its dimensions (platform, sentiment, country, stay type, content
+type, audience segment, ...) and the property.
+
+Each cell holds only mergeable measures: the row count, the first source row
+(for value_counts tie order), and for every measure column its sum and
+non-null count, so that any coarser group is a plain sum of cells and a mean
+is sum / count. Month cells are rolled up from day cells and year cells from
+month cells. Dashboards and etl_charts answer any year or filter from this one
+table (output/Rollup_Cube.csv, Mongo collection Rollup_Cube).
+"""
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+# Allow `python etl/etl_rollup.py` as well as `import etl.etl_rollup`
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from etl.properties import DEFAULT_PROPERTY, PROPERTY_COLUMN  # noqa: E402
+from etl.storage import read_table, table_exists, write_table  # noqa: E402
+
+OUTPUT = 'output'
+CUBE_PATH = os.path.join(OUTPUT, 'Rollup_Cube.csv')
+
+# Source tables: name -> (file in output/, date column)
+SOURCES = {
+    'reviews': ('Scrapped_reviews_cleaned.csv', 'date'),
+    'subratings': ('Subratings_reviews.csv', 'Date'),
+    'metrics': ('Facebook_metrics_table.csv', 'date'),
+    'content': ('Facebook_content_type_table.csv', 'date'),
+    'audience': ('Facebook_Audience_details.csv', 'date'),
+    'follows': ('Follows_cleaned.csv', 'Date'),
+}
+# Source -> (dimension columns, measure columns)
+CUBE_COLUMNS = {
+    'reviews': (['platform', 'sentiment', 'country', 'stay_type', 'rating'], ['normalized_rating']),
+    'subratings': (['subrating_name'], ['subrating_value']),
+    'metrics': ([], ['interactions', 'link_clicks', 'reach', 'views', 'visits', 'follows']),
+    'content': (['content_type'], ['published', 'interactions', 'reach']),
+    'audience': (['gender', 'age_range', 'country'], ['followers']),
+    'follows': ([], ['Follows']),
+}
+
+
+def rating_bucket(ratings):
+    # Whole points of the /10 scale: at most 11 groups, whatever the precision of the ratings
+    return pd.to_numeric(ratings, errors='coerce').round().clip(0, 10).astype('Int64')
+
+
+# Dimensions bucketed from a measure column (dimension -> (column, bucketing)):
+# a measure never keys the cells with its raw values
+BUCKETED_DIMENSIONS = {'rating': ('normalized_rating', rating_bucket)}
+
+LEVELS = ['day', 'month', 'year']
+# Period columns of each level, finest last
+LEVEL_KEYS = {'day': ['Year', 'month', 'date'], 'month': ['Year', 'month'], 'year': ['Year']}
+ROWS = 'rows'
+FIRST_ROW = 'first_row'
+SUM_SUFFIX = '_sum'
+COUNT_SUFFIX = '_count'
+
+
+def measure_columns(measures):
+    return [m + suffix for m in measures for suffix in (SUM_SUFFIX, COUNT_SUFFIX)]
+
+
+def source_columns(dims):
+    # Columns of the source table the dimensions are read from
+    return [BUCKETED_DIMENSIONS[dim][0] if dim in BUCKETED_DIMENSIONS else dim for dim in dims]
+
+
+def dimension_values(df, dim):
+    if dim in BUCKETED_DIMENSIONS:
+        column, bucket = BUCKETED_DIMENSIONS[dim]
+        return bucket(df[column])
+    return df[dim]
+
+
+def rollup_aggregates(measures):
+    # How cells merge: counts and sums add up, the first row is the smallest
+    aggregates = {ROWS: 'sum', FIRST_ROW: 'min'}
+    aggregates.update({col: 'sum' for col in measure_columns(measures)})
+    return aggregates
+
+
+def load_sources(sources=SOURCES, base_dir=OUTPUT):
+    """Reads every available source once, with its date column parsed."""
+    tables = {}
+    for name, (file_name, date_col) in sources.items():
+        path = os.path.join(base_dir, file_name)
+        if not table_exists(path):
+            print(f"Source not found: {path}")
+            continue
+        dims, measures = CUBE_COLUMNS[name]
+        df = read_table(path, [PROPERTY_COLUMN, date_col] + source_columns(dims) + measures, categories=False)
+        if PROPERTY_COLUMN not in df.columns:
+            df.insert(0, PROPERTY_COLUMN, DEFAULT_PROPERTY)
+        df[date_col] = pd.to_datetime(df[date_col], errors='coerce')
+        tables[name] = df
+    return tables
+
+
+def day_cells(df, date_col, dims, measures):
+    """Day-level cells of one source: one row per property, date and dimension values."""
+    days = df[date_col].dt.normalize()
+    # Format each distinct date once: tables have many rows per day
+    codes, uniques = pd.factorize(days)
+    months = pd.Series(uniques.strftime('%Y-%m').to_numpy(dtype=object)).reindex(codes).to_numpy()
+    cells = pd.DataFrame({
+        PROPERTY_COLUMN: df[PROPERTY_COLUMN].astype(object).to_numpy(),
+        'Year': days.dt.year.to_numpy(),
+        'month': months,
+        'date': days.to_numpy(),
+        ROWS: np.ones(len(df), dtype=np.int64),
+        FIRST_ROW: np.arange(len(df), dtype=np.int64),
+    })
+    for dim in dims:
+        cells[dim] = dimension_values(df, dim).to_numpy()
+    for m in measures:
+        values = pd.to_numeric(df[m], errors='coerce')
+        cells[m + SUM_SUFFIX] = values.to_numpy()
+        cells[m + COUNT_SUFFIX] = values.notna().to_numpy(dtype=np.int64)
+    return rollup(cells, 'day', dims, measures)
+
+
+def rollup(cells, level, dims, measures):
+    # Merges cells into the given level; empty dimension values stay groups of their own
+    keys = [PROPERTY_COLUMN] + LEVEL_KEYS[level] + dims
+    merged = cells.groupby(keys, dropna=False, sort=True).agg(rollup_aggregates(measures)).reset_index()
+    merged.insert(0, 'level', level)
+    return merged
+
+
+def build_cube(tables):
+    """All levels of every source in one frame, keyed by source, level, property, period and dimensions."""
+    frames = []
+    for source, df in tables.items():
+        date_col = SOURCES[source][1]
+        dims, measures = CUBE_COLUMNS[source]
+        day = day_cells(df, date_col, dims, measures)
+        month = rollup(day, 'month', dims, measures)
+        year = rollup(month, 'year', dims, measures)
+        for cells in (day, month, year):
+            frames.append(cells.assign(source=source))
+    if not frames:
+        return pd.DataFrame(columns=['source', 'level', PROPERTY_COLUMN, 'Year', 'month', 'date', ROWS, FIRST_ROW])
+    cube = pd.concat(frames, ignore_index=True)
+    ordered = ['source', 'level', PROPERTY_COLUMN, 'Year', 'month', 'date']
+    return cube[ordered + [col for col in cube.columns if col not in ordered]]
+
+
+def restore_integers(cells):
+    # Columns that only became float in the union of sources (NaN where a source lacks them)
+    for col in cells.columns[cells.dtypes == float]:
+        values = cells[col].dropna()
+        if len(values) and (values == values.round()).all():
+            cells[col] = cells[col].astype('int64' if len(values) == len(cells) else 'Int64')
+    return cells
+
+
+def cell_index(cube):
+    # (source, level) -> row positions of its cells, from one pass over the cube
+    return cube.groupby(['source', 'level'], sort=False).indices
+
+
+def source_cells(cube, source, level, index=None):
+    """The cells of one source at one level, with only that source's columns and their integer types."""
+    if index is None:
+        cells = cube[(cube['source'] == source) & (cube['level'] == level)]
+    else:
+        cells = cube.iloc[index.get((source, level), [])]
+    cells = cells.dropna(axis=1, how='all').drop(columns=['source', 'level']).reset_index(drop=True)
+    return restore_integers(cells)
+
+
+def read_cube(path=CUBE_PATH):
+    if not table_exists(path):
+        return None
+    return read_table(path, categories=False)
+
+
+def process(output_path=CUBE_PATH, base_dir=OUTPUT):
+    print("Running etl_rollup.process...")
+    start = time.perf_counter()
+    tables = load_sources(base_dir=base_dir)
+    cube = build_cube(tables)
+    write_table(cube, output_path)
+    counts = cube.groupby('level').size().reindex(LEVELS, fill_value=0) if not cube.empty else {}
+    print(f"✔ Rollup cube saved → {output_path} ({len(cube)} cells: "
+          f"{', '.join(f'{n} {level}' for level, n in dict(counts).items())}) "
+          f"from {sum(len(df) for df in tables.values())} source rows in {time.perf_counter() - start:.2f}s")
+    return cube
+
+
+if __name__ == '__main__':
+    process()
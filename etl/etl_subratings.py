@@ -1,126 +1,98 @@
 import pandas as pd
+import numpy as np
 import os
+import re
+from etl.storage import write_table
+from etl.utils import detect_encoding, read_header, iter_csv_chunks
+from etl.header_schema import header_mapping
 
-def process(raw_dir='data/raw/reviews', output_path='output/Subratings_reviews.csv'):
-    print("Running etl_subratings.process...")
-
-    all_dfs = []
-    subrating_names = ['Value', 'Rooms', 'Location', 'Cleanliness', 'Service', 'Sleep Quality']
-    subrating_names_lower = [s.lower().replace(' ', '').replace('_', '') for s in subrating_names]
-
-    for file in os.listdir(raw_dir):
-        if file.endswith('.csv'):
-            df = pd.read_csv(os.path.join(raw_dir, file), encoding='utf-8-sig')
+OUT_COLS = ['review_id', 'reviewer_name', 'Date', 'subrating_name', 'subrating_value']
+CHUNK_SIZE = 5000
+# TripAdvisor subratings/<i>/name + /value, Booking hotelRatingScores/<i>/name + /score, and any export using the same layout
+SUBRATING_COL_PATTERN = re.compile(r'^(?P<prefix>.+)/(?P<index>\d+)/(?P<field>name|value|score)$')
 
-            # Find review_id column
-            review_id = None
-            for col in df.columns:
-                if col.lower().replace('_', '') in ['reviewid', 'id']:
-                    review_id = df[col]
-                    break
-            if review_id is None:
-                review_id = pd.Series(df.index + 100000, index=df.index)
+def find_subrating_pairs(columns):
+    """
+    Pairs name and value/score columns sharing the same '<prefix>/<index>/' stem,
+    each pair exactly once, ordered by prefix then numeric index.
+    """
+    groups = {}
+    for col in columns:
+        match = SUBRATING_COL_PATTERN.match(col)
+        if match:
+            groups.setdefault((match['prefix'], int(match['index'])), {})[match['field']] = col
+    pairs = []
+    for key in sorted(groups):
+        fields = groups[key]
+        value_col = fields.get('value', fields.get('score'))
+        if 'name' in fields and value_col is not None:
+            pairs.append((fields['name'], value_col))
+    return pairs
 
-            # Find reviewer_name column
-            reviewer_name = None
-            for col in df.columns:
-                if col.lower().replace('_', '') in ['reviewername', 'username', 'user_name']:
-                    reviewer_name = df[col]
-                    break
-            if reviewer_name is None:
-                reviewer_name = pd.Series(['Unknown'] * len(df), index=df.index)
+def extract_subratings(df, review_id, reviewer_name, date_str):
+    # Wide-to-long: one output row per (review, subrating pair), built from 2-D arrays in one pass
+    pairs = find_subrating_pairs(df.columns)
+    if not pairs or df.empty:
+        return pd.DataFrame(columns=OUT_COLS)
+    names = df[[name_col for name_col, _ in pairs]].to_numpy(dtype=object)
+    values = df[[value_col for _, value_col in pairs]].to_numpy(dtype=object)
+    width = len(pairs)
+    long_df = pd.DataFrame({
+        'review_id': np.repeat(review_id.to_numpy(), width),
+        'reviewer_name': np.repeat(reviewer_name.to_numpy(), width),
+        'Date': np.repeat(date_str.to_numpy(), width),
+        'subrating_name': names.ravel(),
+        'subrating_value': values.ravel(),
+    })
+    return long_df[long_df['subrating_name'].notna() & long_df['subrating_value'].notna()]
 
-            # Find date column
-            review_date = None
-            for col in df.columns:
-                if col.lower().replace('_', '') in ['date', 'reviewdate', 'publisheddate']:
-                    review_date = df[col]
-                    break
-            if review_date is None:
-                review_date = pd.Series([pd.to_datetime('2023-01-01')] * len(df), index=df.index)
+def subrating_usecols(header):
+    """Review id, reviewer, date and subrating pair columns of a raw export header: the only columns read."""
+    pair_cols = [col for pair in find_subrating_pairs(header) for col in pair]
+    # At least one column, so rows are still counted when nothing matches
+    return header_mapping(header, 'subratings').usecols(pair_cols) or header[:1]
 
-            # Format date
-            date_series = pd.to_datetime(review_date, errors='coerce')
-            if hasattr(date_series, 'dt'):
-                date_str = date_series.dt.strftime('%Y-%m-%d')
-            elif isinstance(date_series, pd.Series):
-                date_str = date_series.astype(str)
-            elif isinstance(date_series, pd.Timestamp):
-                date_str = date_series.strftime('%Y-%m-%d')
-            else:
-                date_str = str(date_series)
-
-            # Extract TripAdvisor subratings: subratings/*/name, subratings/*/value
-            ta_name_cols = [col for col in df.columns if col.startswith('subratings/') and col.endswith('/name')]
-            ta_value_cols = [col for col in df.columns if col.startswith('subratings/') and col.endswith('/value')]
-            ta_name_cols.sort()
-            ta_value_cols.sort()
-
-            # Extract Booking.com subratings: hotelRatingScores/*/name, hotelRatingScores/*/score
-            booking_name_cols = [col for col in df.columns if col.startswith('hotelRatingScores/') and col.endswith('/name')]
-            booking_score_cols = [col for col in df.columns if col.startswith('hotelRatingScores/') and col.endswith('/score')]
-            booking_name_cols.sort()
-            booking_score_cols.sort()
+def process(raw_dir='data/raw/reviews', output_path='output/Subratings_reviews.csv', chunk_size=CHUNK_SIZE):
+    print("Running etl_subratings.process...")
 
-            # Also handle generic patterns: any */name and */score or */value
-            generic_name_cols = [col for col in df.columns if col.endswith('/name')]
-            generic_value_cols = [col for col in df.columns if col.endswith('/value') or col.endswith('/score')]
-            generic_name_cols.sort()
-            generic_value_cols.sort()
+    all_dfs = []
 
-            for idx, row in df.iterrows():
-                rid = review_id.iloc[idx] if isinstance(review_id, pd.Series) else review_id
-                rname = reviewer_name.iloc[idx] if isinstance(reviewer_name, pd.Series) else reviewer_name
-                rdate = date_str.iloc[idx] if isinstance(date_str, pd.Series) else date_str
+    # In name order: a review repeated in a later export keeps that export's scores
+    for file in sorted(os.listdir(raw_dir)):
+        if file.endswith('.csv'):
+            path = os.path.join(raw_dir, file)
+            encoding = detect_encoding(path)
+            header = read_header(path, encoding)
+            fields = header_mapping(header, 'subratings')
+            id_col, reviewer_col, date_col = fields.column('id'), fields.column('reviewer'), fields.column('date')
 
-                # TripAdvisor subratings
-                for ncol, vcol in zip(ta_name_cols, ta_value_cols):
-                    sub_name = row[ncol]
-                    sub_value = row[vcol]
-                    if pd.notna(sub_name) and pd.notna(sub_value):
-                        all_dfs.append(pd.DataFrame({
-                            'review_id': [rid],
-                            'reviewer_name': [rname],
-                            'Date': [rdate],
-                            'subrating_name': [sub_name],
-                            'subrating_value': [sub_value]
-                        }))
+            # Streamed in bounded chunks of the needed columns only
+            for df in iter_csv_chunks(path, subrating_usecols(header), encoding, chunk_size):
+                review_id = df[id_col] if id_col else pd.Series(df.index + 100000, index=df.index)
+                reviewer_name = df[reviewer_col] if reviewer_col else pd.Series(['Unknown'] * len(df), index=df.index)
+                if date_col:
+                    review_date = df[date_col]
+                else:
+                    review_date = pd.Series([pd.to_datetime('2023-01-01')] * len(df), index=df.index)
 
-                # Booking.com subratings
-                for ncol, vcol in zip(booking_name_cols, booking_score_cols):
-                    sub_name = row[ncol]
-                    sub_value = row[vcol]
-                    if pd.notna(sub_name) and pd.notna(sub_value):
-                        all_dfs.append(pd.DataFrame({
-                            'review_id': [rid],
-                            'reviewer_name': [rname],
-                            'Date': [rdate],
-                            'subrating_name': [sub_name],
-                            'subrating_value': [sub_value]
-                        }))
+                # Format date (mixed time zones leave an object Series without .dt)
+                date_series = pd.to_datetime(review_date, errors='coerce')
+                date_str = date_series.dt.strftime('%Y-%m-%d') if hasattr(date_series, 'dt') else date_series.astype(str)
 
-                # Generic fallback: any */name and */value or */score
-                for ncol, vcol in zip(generic_name_cols, generic_value_cols):
-                    sub_name = row[ncol]
-                    sub_value = row[vcol]
-                    if pd.notna(sub_name) and pd.notna(sub_value):
-                        all_dfs.append(pd.DataFrame({
-                            'review_id': [rid],
-                            'reviewer_name': [rname],
-                            'Date': [rdate],
-                            'subrating_name': [sub_name],
-                            'subrating_value': [sub_value]
-                        }))
+                all_dfs.append(extract_subratings(df, review_id, reviewer_name, date_str))
 
+    all_dfs = [frame for frame in all_dfs if not frame.empty]
     if all_dfs:
         final_df = pd.concat(all_dfs, ignore_index=True)
+        # One score per review and subrating, the grain the Mongo loader keys on
+        final_df = final_df.drop_duplicates(subset=['review_id', 'subrating_name'], keep='last')
         # Ensure correct column order and types
-        final_df = final_df[['review_id', 'reviewer_name', 'Date', 'subrating_name', 'subrating_value']]
+        final_df = final_df[OUT_COLS]
         final_df['Date'] = pd.to_datetime(final_df['Date'], errors='coerce').dt.strftime('%Y-%m-%d')
-        final_df.to_csv(output_path, index=False, encoding='utf-8-sig')
+        write_table(final_df, output_path)
         print(f"Subratings saved → {output_path} ({len(final_df)} rows)")
     else:
         # Always generate the file, even if empty
-        empty_df = pd.DataFrame(columns=['review_id', 'reviewer_name', 'Date', 'subrating_name', 'subrating_value'])
-        empty_df.to_csv(output_path, index=False, encoding='utf-8-sig')
+        empty_df = pd.DataFrame(columns=OUT_COLS)
+        write_table(empty_df, output_path)
         print(f"No subrating data found. Empty file generated at {output_path}")
@@ -0,0 +1,99 @@
+"""
+Header schema mapping for raw review exports.
+
+A header is normalized once into {normalized name: first column} and every
+logical field is resolved against that index in one pass. Mappings are
+memoized per distinct header, so the chunks and files that share an export
+layout resolve it once. Each mapping records which alias matched, for
+diagnostics.
+"""
+import functools
+
+import pandas as pd
+
+
+def normalize(name):
+    return name.strip().lower()
+
+
+def compact(name):
+    # Subratings matching also ignores underscores (review_id == reviewId)
+    return normalize(name).replace('_', '')
+
+
+# field -> aliases, in priority order: the first alias present in the header wins
+REVIEW_FIELDS = {
+    'reviewer': ['reviewer_name', 'user_name', 'author', 'name', 'user/name', 'username'],
+    'liked': ['likedtext', 'liked_text'],
+    'disliked': ['dislikedtext', 'disliked_text'],
+    'text': ['text', 'review', 'review_text', 'comment'],
+    'id': ['id', 'reviewid', 'review_id'],
+    'date': ['Date', 'publisheddate', 'review_date', 'reviewdate', 'publishedatdate', 'day', 'datetime'],
+    'country': ['country', 'location', 'placeinfo/addressobj/country', 'userlocation', 'user/userlocation/name', 'countrycode'],
+    'stay_type': ['stay_type', 'room_type', 'triptype', 'travelertype', 'reviewcontext/trip type'],
+    'rating': ['rating', 'score', 'stars', 'totalscore'],
+}
+SUBRATING_FIELDS = {
+    'id': ['reviewid', 'id'],
+    'reviewer': ['reviewername', 'username'],
+    'date': ['date', 'reviewdate', 'publisheddate'],
+}
+# field set name -> (fields, name normalizer)
+FIELD_SETS = {
+    'reviews': (REVIEW_FIELDS, normalize),
+    'subratings': (SUBRATING_FIELDS, compact),
+}
+
+
+class HeaderMapping:
+    """Logical field -> header column (and the alias that matched it) for one header."""
+
+    def __init__(self, header, fields, normalizer):
+        self.header = list(header)
+        index = {}
+        for col in self.header:
+            index.setdefault(normalizer(col), col)
+        self.columns = {}
+        self.aliases = {}
+        for field, aliases in fields.items():
+            for alias in aliases:
+                col = index.get(normalizer(alias))
+                if col is not None:
+                    self.columns[field] = col
+                    self.aliases[field] = alias
+                    break
+        self.missing = [field for field in fields if field not in self.columns]
+
+    def column(self, field):
+        return self.columns.get(field)
+
+    def get(self, df, field, default=None):
+        """
+        df's column for field; when unmatched, a Series of default aligned to
+        df (or None without a default).
+        """
+        col = self.columns.get(field)
+        if col is not None and col in df.columns:
+            return df[col]
+        return pd.Series([default] * len(df), index=df.index) if default is not None else None
+
+    def usecols(self, extra=()):
+        """Matched columns plus extra, in header order: the only columns a reader needs."""
+        wanted = set(self.columns.values()) | set(extra)
+        return [col for col in self.header if col in wanted]
+
+    def describe(self):
+        matched = ', '.join(f"{field}={col}" + (f" ({self.aliases[field]})" if normalize(col) != normalize(self.aliases[field]) else '')
+                            for field, col in self.columns.items())
+        return matched + (f"; unmatched: {', '.join(self.missing)}" if self.missing else '')
+
+
+@functools.lru_cache(maxsize=None)
+def cached_mapping(header, field_set):
+    fields, normalizer = FIELD_SETS[field_set]
+    return HeaderMapping(header, fields, normalizer)
+
+
+def header_mapping(header, field_set='reviews'):
+    """Memoized HeaderMapping of header (any sequence of column names) for a FIELD_SETS entry."""
+    return cached_mapping(tuple(header), field_set)
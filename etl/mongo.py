@@ -0,0 +1,9 @@
+from pymongo import MongoClient
+
+
+def get_client(uri):
+    # "mongomock://" runs the loaders against an in-memory server (benchmarks, offline runs)
+    if uri and uri.startswith('mongomock://'):
+        import mongomock
+        return mongomock.MongoClient()
+    return MongoClient(uri)
@@ -0,0 +1,160 @@
+"""
+Index manifest for the dashboard's MongoDB collections.
+
+Both loaders call ensure_indexes() on every collection they write, and
+check_query_plans() explains the known dashboard queries to verify that
+they are served by an index rather than a collection scan:
+
+    python -m etl.mongo_indexes          # provision + explain check against MONGO_URI
+"""
+import os
+import sys
+from datetime import datetime
+
+from dotenv import load_dotenv
+
+from etl.mongo import get_client
+
+# collection -> list of index key lists, in the order dashboards filter on them.
+# Every table is partitioned by property. Dimension ids are numbered within each
+# property, so fact and dimension lookups are only meaningful per property and
+# their indexes lead with property_id (which also serves a one-property refresh).
+# The other collections keep a separate property_id index for that refresh.
+INDEX_MANIFEST = {
+    'Charts': [[('chart_id', 1), ('Year', 1)], [('property_id', 1)]],
+    'Fact_Reviews': [[('property_id', 1), ('date_id', 1), ('platform_id', 1)], [('property_id', 1), ('review_id', 1)],
+                     [('property_id', 1), ('subrating_id', 1)]],
+    'Fact_Facebook_Daily': [[('property_id', 1), ('date_id', 1)]],
+    'Fact_Facebook_Content': [[('property_id', 1), ('date_id', 1), ('content_type_id', 1)],
+                              [('property_id', 1), ('content_type_id', 1)]],
+    'Fact_Facebook_Audience': [[('property_id', 1), ('date_id', 1), ('audience_id', 1)],
+                               [('property_id', 1), ('audience_id', 1)]],
+    'Dim_Date': [[('property_id', 1), ('date_id', 1)], [('property_id', 1), ('date', 1)]],
+    'Dim_Reviews': [[('property_id', 1), ('review_id', 1)]],
+    'Dim_Reviewer': [[('property_id', 1), ('reviewer_id', 1)]],
+    'Dim_Platform': [[('property_id', 1), ('platform_id', 1)]],
+    'Dim_StayType': [[('property_id', 1), ('stay_type_id', 1)]],
+    'Dim_Subrating': [[('property_id', 1), ('subrating_id', 1)]],
+    'Dim_Content_Type': [[('property_id', 1), ('content_type_id', 1)]],
+    'Dim_Audience': [[('property_id', 1), ('audience_id', 1)]],
+    'output.Scrapped_reviews_cleaned': [[('date', 1)], [('platform', 1), ('date', 1)], [('property_id', 1)]],
+    'output.Subratings_reviews': [[('Date', 1)], [('subrating_name', 1), ('Date', 1)], [('property_id', 1)]],
+    'output.Facebook_metrics_table': [[('date', 1)], [('property_id', 1)]],
+    'output.Facebook_Audience_details': [[('date', 1)], [('property_id', 1)]],
+    'output.Facebook_content_type_table': [[('date', 1), ('content_type', 1)], [('property_id', 1)]],
+    'output.Follows_cleaned': [[('Date', 1)], [('property_id', 1)]],
+    'Rollup_Cube': [[('source', 1), ('level', 1), ('Year', 1)], [('property_id', 1)]],
+}
+
+# (collection, filter) of the lookups the dashboards run; fact and dimension ids
+# are only unique within a property, so those lookups name one
+DASHBOARD_QUERIES = [
+    ('Charts', {'chart_id': 'scr_card_1'}),
+    ('Charts', {'chart_id': 'facebook_metrics_summary', 'Year': 2025}),
+    ('Fact_Reviews', {'property_id': 'default', 'date_id': 1, 'platform_id': 1}),
+    ('Fact_Facebook_Daily', {'property_id': 'default', 'date_id': {'$gte': 1}}),
+    ('Fact_Facebook_Content', {'property_id': 'default', 'date_id': {'$gte': 1}, 'content_type_id': 1}),
+    ('Fact_Facebook_Audience', {'property_id': 'default', 'audience_id': 1}),
+    ('Dim_Date', {'property_id': 'default', 'date_id': 1}),
+    ('output.Scrapped_reviews_cleaned', {'date': {'$gte': datetime(2025, 1, 1)}}),
+    ('output.Scrapped_reviews_cleaned', {'platform': 'Google', 'date': {'$gte': datetime(2025, 1, 1)}}),
+    ('output.Facebook_metrics_table', {'date': {'$gte': datetime(2025, 1, 1)}}),
+    ('output.Facebook_content_type_table', {'date': {'$gte': datetime(2025, 1, 1)}}),
+    ('output.Follows_cleaned', {'Date': {'$gte': datetime(2025, 1, 1)}}),
+    ('Fact_Reviews', {'property_id': {'$in': ['default']}}),
+    ('Rollup_Cube', {'source': 'reviews', 'level': 'year'}),
+]
+
+INDEX_STAGES = ('IXSCAN', 'EXPRESS_IXSCAN', 'IDHACK', 'COUNT_SCAN', 'DISTINCT_SCAN')
+
+
+def ensure_indexes(collection, name=None):
+    """
+    Creates the manifest indexes of `name` (default: the collection's own name)
+    on collection. A key already indexed (e.g. the loaders' unique natural key,
+    whose default name the manifest index would take) is left as it is.
+    """
+    indexed = {tuple(info['key']) for info in collection.index_information().values()}
+    for keys in INDEX_MANIFEST.get(name or collection.name, []):
+        if tuple(keys) not in indexed:
+            collection.create_index(keys)
+
+
+def superseded(name, keys):
+    """
+    Whether keys is an index of an earlier manifest of `name`: the same keys
+    now led by property_id, or property_id alone where compound indexes lead with it.
+    """
+    manifest = [list(k) for k in INDEX_MANIFEST.get(name, [])]
+    keys = [tuple(k) for k in keys]
+    if keys in manifest:
+        return False
+    led = [k for k in manifest if len(k) > 1 and k[0] == ('property_id', 1)]
+    return [('property_id', 1)] + keys in manifest or (keys == [('property_id', 1)] and bool(led))
+
+
+def ensure_all_indexes(db):
+    existing = set(db.list_collection_names())
+    for name in INDEX_MANIFEST:
+        if name in existing:
+            ensure_indexes(db[name])
+
+
+def plan_stages(plan):
+    # Every 'stage' in an explain() winning plan, walking inputStage(s) and queryPlan nesting
+    if isinstance(plan, dict):
+        if 'stage' in plan:
+            yield plan['stage']
+        for value in plan.values():
+            yield from plan_stages(value)
+    elif isinstance(plan, list):
+        for item in plan:
+            yield from plan_stages(item)
+
+
+def uses_index(explain):
+    winning = explain.get('queryPlanner', {}).get('winningPlan', {})
+    return any(stage in INDEX_STAGES for stage in plan_stages(winning))
+
+
+def check_query_plans(db, queries=DASHBOARD_QUERIES):
+    """
+    Explains each dashboard query and returns [(collection, filter, used_index)].
+    used_index is None when the server cannot explain (e.g. mongomock) or the
+    collection is not loaded.
+    """
+    existing = set(db.list_collection_names())
+    results = []
+    for name, query in queries:
+        if name not in existing:
+            results.append((name, query, None))
+            continue
+        try:
+            explain = db[name].find(query).explain()
+        except (AttributeError, NotImplementedError):
+            results.append((name, query, None))
+            continue
+        results.append((name, query, uses_index(explain)))
+    return results
+
+
+def assert_queries_use_indexes(db, queries=DASHBOARD_QUERIES):
+    results = check_query_plans(db, queries)
+    for name, query, used in results:
+        status = {True: 'index', False: 'COLLECTION SCAN', None: 'not checked'}[used]
+        print(f"  {name:<36} {str(query):<70} {status}")
+    scans = [(name, query) for name, query, used in results if used is False]
+    assert not scans, f"Dashboard queries without an index: {scans}"
+    return results
+
+
+if __name__ == '__main__':
+    load_dotenv()
+    db = get_client(os.getenv("MONGO_URI", "mongodb://localhost:27017/"))[os.getenv("DB_NAME", "PFE")]
+    ensure_all_indexes(db)
+    try:
+        assert_queries_use_indexes(db)
+    except AssertionError as e:
+        print(e)
+        sys.exit(1)
+    print("✔ Dashboard query plans use indexes")
@@ -0,0 +1,70 @@
+"""
+Property partitioning: one partition per hotel / Facebook page.
+
+Raw exports are discovered per property under data/raw/properties/<property_id>/
+(each with the reviews/ and facebook/ folders of the single-property layout);
+a tree without that folder is the single property DEFAULT_PROPERTY read from
+data/raw itself. The ETL stages run once per property and write their tables
+under output/partitions/<property_id>/; combine_partitions() then writes each
+table to output/ as the union of its partitions with a property_id column,
+which the star schema and the Mongo loaders key on.
+"""
+import os
+
+import pandas as pd
+
+from etl.storage import read_table, table_exists, write_table
+
+PROPERTY_COLUMN = 'property_id'
+RAW_DIR = os.path.join('data', 'raw')
+PROPERTIES_DIR = 'properties'
+PARTITIONS_DIR = 'partitions'
+DEFAULT_PROPERTY = os.getenv('PROPERTY_ID', 'default')
+
+
+def discover_properties(raw_dir=RAW_DIR):
+    """property_id -> its raw folder, in property_id order."""
+    root = os.path.join(raw_dir, PROPERTIES_DIR)
+    if os.path.isdir(root):
+        found = {name: os.path.join(root, name) for name in sorted(os.listdir(root))
+                 if not name.startswith('.') and os.path.isdir(os.path.join(root, name))}
+        if found:
+            return found
+    return {DEFAULT_PROPERTY: raw_dir}
+
+
+def partition_dir(property_id, output_dir='output'):
+    return os.path.join(output_dir, PARTITIONS_DIR, property_id)
+
+
+def partition_path(path, property_id):
+    """Partition of table path (output/X.csv -> output/partitions/<property_id>/X.csv)."""
+    folder, name = os.path.split(path)
+    return os.path.join(partition_dir(property_id, folder), name)
+
+
+def with_property(df, property_id):
+    df = df.drop(columns=PROPERTY_COLUMN, errors='ignore')
+    df.insert(0, PROPERTY_COLUMN, property_id)
+    return df
+
+
+def combine_partitions(path, property_ids, encoding='utf-8-sig'):
+    """
+    Writes table path as the union of its partitions, property_id first.
+    Properties without a partition (e.g. no Facebook export) are left out.
+    """
+    frames = [with_property(read_table(partition_path(path, pid), categories=False), pid)
+              for pid in property_ids if table_exists(partition_path(path, pid))]
+    if not frames:
+        print(f"No partition of {path} found, not combined")
+        return None
+    combined = pd.concat(frames, ignore_index=True)
+    write_table(combined, path, encoding=encoding)
+    print(f"✔ Combined {len(frames)} partition(s) → {path} ({len(combined)} rows)")
+    return combined
+
+
+def property_filter(properties):
+    # Mongo filter on a set of partitions (None: all of them)
+    return {PROPERTY_COLUMN: {'$in': list(properties)}} if properties else {}
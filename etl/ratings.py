@@ -0,0 +1,55 @@
+"""
+Vectorized review ratings: platform scores normalized to /10, with a
+sentiment-based fallback for reviews that have no score.
+
+normalize_scores() applies utils.normalize_score once per distinct score
+(exports only hold a handful of them); ratings_from_sentiment() maps the
+labels returned by the sentiment scorer ('Positive', 'Neutral', 'Negative')
+through a categorical lookup.
+"""
+import numpy as np
+import pandas as pd
+
+from etl.utils import normalize_score
+
+# Native rating scale of each platform's export
+PLATFORM_SCALES = {'booking': 10, 'tripadvisor': 5, 'google': 5}
+DEFAULT_SCALE = 5
+
+# Rating given to a review without a score, by sentiment label (any case)
+SENTIMENT_RATINGS = {'positive': 9, 'neutral': 6, 'negative': 3}
+UNKNOWN_SENTIMENT_RATING = 5
+
+
+def platform_scale(source_type):
+    return PLATFORM_SCALES.get(str(source_type).lower(), DEFAULT_SCALE)
+
+
+def normalize_scores(scores, scale):
+    """Scores on a 0..scale range as /10 ratings with one decimal (NaN when not numeric)."""
+    scores = pd.Series(scores)
+    lookup = {value: normalize_score(value, scale) for value in scores.dropna().unique()}
+    return scores.map(lookup).astype(float)
+
+
+def ratings_from_sentiment(labels):
+    """Fallback rating of each sentiment label; unknown or missing labels give UNKNOWN_SENTIMENT_RATING."""
+    labels = pd.Series(labels).astype('category')
+    # One lookup entry per distinct label (any case), plus the default for code -1 (missing)
+    lookup = np.array([SENTIMENT_RATINGS.get(str(label).lower(), UNKNOWN_SENTIMENT_RATING)
+                       for label in labels.cat.categories] + [UNKNOWN_SENTIMENT_RATING])
+    return pd.Series(lookup[labels.cat.codes.to_numpy()], index=labels.index)
+
+
+def review_ratings(scores, source_type, sentiments):
+    """
+    Integer /10 rating of each review: the normalized platform score, or the
+    sentiment fallback when the score is missing or not numeric.
+    scores may be None (export without a rating column).
+    """
+    fallback = ratings_from_sentiment(sentiments)
+    if scores is None:
+        return fallback.astype(int)
+    normalized = normalize_scores(scores, platform_scale(source_type))
+    normalized.index = fallback.index
+    return normalized.fillna(fallback).astype(int)
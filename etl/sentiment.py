@@ -0,0 +1,86 @@
+import hashlib
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+
+from etl.cache import CACHE_DIR, JsonCache
+
+DEFAULT_CACHE_PATH = os.path.join(CACHE_DIR, 'sentiment.json')
+POSITIVE_THRESHOLD = 0.1
+NEGATIVE_THRESHOLD = -0.1
+CHUNK_SIZE = 200
+MIN_PARALLEL_TEXTS = 1000  # below this, process pool start-up costs more than it saves
+
+
+def text_hash(text):
+    return hashlib.sha256(str(text).encode('utf-8')).hexdigest()
+
+
+class SentimentCache(JsonCache):
+    """Persistent JSON map of sha256(text) -> TextBlob polarity."""
+
+    def __init__(self, path=DEFAULT_CACHE_PATH):
+        super().__init__(path)
+
+
+def score_chunk(texts):
+    from textblob import TextBlob
+    scores = []
+    for text in texts:
+        try:
+            scores.append(float(TextBlob(text).sentiment.polarity))
+        except Exception:
+            scores.append(0.0)
+    return scores
+
+
+def label_polarity(polarity):
+    """Positive above POSITIVE_THRESHOLD, Negative below NEGATIVE_THRESHOLD, Neutral otherwise."""
+    labels = pd.Series('Neutral', index=polarity.index, dtype=object)
+    labels[polarity > POSITIVE_THRESHOLD] = 'Positive'
+    labels[polarity < NEGATIVE_THRESHOLD] = 'Negative'
+    return labels
+
+
+def score_sentiment(series, cache=None, max_workers=None, chunk_size=CHUNK_SIZE, save=True):
+    """
+    Returns a DataFrame with 'sentiment' (label) and 'sentiment_polarity' (float)
+    aligned on series.index. Identical texts are scored once and polarities are
+    memoized by content hash across runs; with save=False the caller saves the cache.
+    """
+    cache = cache if cache is not None else SentimentCache()
+
+    valid = series.notna() & (series.astype(str).str.strip() != '')
+    texts = series[valid].astype(str)
+    unique_texts = texts.unique()
+
+    polarities = {}
+    misses = []
+    for text in unique_texts:
+        hit = cache.get(text_hash(text))
+        if hit is None:
+            misses.append(text)
+        else:
+            polarities[text] = hit
+
+    if misses:
+        chunks = [misses[i:i + chunk_size] for i in range(0, len(misses), chunk_size)]
+        if len(misses) >= MIN_PARALLEL_TEXTS and len(chunks) > 1:
+            with ProcessPoolExecutor(max_workers=max_workers) as pool:
+                results = list(pool.map(score_chunk, chunks))
+        else:
+            results = [score_chunk(chunk) for chunk in chunks]
+        for chunk, scores in zip(chunks, results):
+            for text, score in zip(chunk, scores):
+                polarities[text] = score
+                cache.put(text_hash(text), score)
+        if save:
+            cache.save()
+
+    print(f"Sentiment cache: {len(unique_texts) - len(misses)} hits, {len(misses)} misses "
+          f"({len(texts)} texts, {len(unique_texts)} unique)")
+
+    polarity = pd.Series(0.0, index=series.index)
+    polarity[valid] = texts.map(polarities).astype(float)
+    return pd.DataFrame({'sentiment': label_polarity(polarity), 'sentiment_polarity': polarity.round(4)})
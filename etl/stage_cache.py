@@ -0,0 +1,82 @@
+import hashlib
+import json
+import os
+import time
+
+from etl.cache import JsonCache
+from etl.storage import stored_path, table_exists
+
+DEFAULT_MANIFEST_PATH = os.path.join('output', '.state', 'stages.json')
+
+
+def file_sha256(path, chunk_size=1 << 20):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def list_files(path):
+    """The file itself, or every file under a directory (sorted, hidden files skipped)."""
+    if os.path.isfile(path):
+        return [path]
+    files = []
+    for dirpath, dirnames, filenames in os.walk(path):
+        dirnames[:] = sorted(d for d in dirnames if not d.startswith('.'))
+        files.extend(os.path.join(dirpath, name) for name in sorted(filenames) if not name.startswith('.'))
+    return files
+
+
+class StageManifest(JsonCache):
+    """
+    Per-stage fingerprints of the last successful run, plus a size/mtime/sha256
+    entry per input file so unchanged files are not re-hashed on every run:
+    {'files': {path: {'size', 'mtime_ns', 'sha256'}}, 'stages': {name: {'fingerprint', 'finished_at'}}}
+    """
+
+    def __init__(self, path=DEFAULT_MANIFEST_PATH):
+        super().__init__(path)
+        self.entries.setdefault('files', {})
+        self.entries.setdefault('stages', {})
+
+    def file_hash(self, path):
+        stat = os.stat(path)
+        known = self.entries['files'].get(path)
+        if known and known['size'] == stat.st_size and known['mtime_ns'] == stat.st_mtime_ns:
+            return known['sha256']
+        sha = file_sha256(path)
+        with self.lock:
+            self.entries['files'][path] = {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns, 'sha256': sha}
+            self.dirty = True
+        return sha
+
+    def fingerprint(self, inputs, params=None):
+        """Content hash of every input (missing inputs included as such) and the stage parameters; tables are hashed through their stored copy."""
+        digest = hashlib.sha256()
+        for path in sorted(inputs):
+            if not table_exists(path):
+                digest.update(f"{path}\0missing\n".encode('utf-8'))
+                continue
+            for file_path in list_files(stored_path(path)):
+                digest.update(f"{file_path}\0{self.file_hash(file_path)}\n".encode('utf-8'))
+        digest.update(json.dumps(params or {}, sort_keys=True, default=str).encode('utf-8'))
+        return digest.hexdigest()
+
+    def is_fresh(self, name, fingerprint, outputs):
+        stage = self.entries['stages'].get(name)
+        return bool(stage) and stage['fingerprint'] == fingerprint and all(table_exists(p) for p in outputs)
+
+    def record(self, name, fingerprint):
+        self.put_stage(name, {'fingerprint': fingerprint, 'finished_at': time.strftime('%Y-%m-%dT%H:%M:%S')})
+        self.save()
+
+    def forget(self, name):
+        if self.entries['stages'].pop(name, None) is not None:
+            self.dirty = True
+            self.save()
+
+    def put_stage(self, name, entry):
+        with self.lock:
+            self.entries['stages'][name] = entry
+            self.dirty = True
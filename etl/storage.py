@@ -0,0 +1,205 @@
+"""
+Columnar storage for the pipeline's tables in output/.
+
+write_table() stores each table as typed Parquet under output/.parquet/
+(dates as datetime64, repetitive text as categories) and read_table() loads
+back only the columns a stage asks for. Reads go through an uncompressed
+Arrow IPC copy under output/.arrow/ that is memory-mapped rather than parsed:
+text columns stay in the mapped pages (pd.ArrowDtype), so processes reading
+the same table share them and RSS does not grow with the review text.
+
+The CSV at the table's path is an export for the Mongo loaders and for
+people. The stages only write it with EXPORT_CSV=1; otherwise the loaders
+call export_csv(), which writes it from the Parquet copy when missing or
+older (dates then in ISO form; the loaders parse them either way).
+
+    python -m etl.storage            # export every table whose CSV is missing or older
+
+Tables are always named by their CSV path, so stages, the DAG and the stage
+cache keep one name per table whichever of its files exist.
+"""
+import os
+import sys
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+PARQUET_DIR = '.parquet'
+ARROW_DIR = '.arrow'
+EXPORT_CSV = os.getenv('EXPORT_CSV', '0') == '1'
+
+# Table (CSV file name without extension) -> typed columns. 'text' columns hold
+# ids that must stay strings even when they look numeric.
+TABLE_SCHEMAS = {
+    'Scrapped_reviews_cleaned': {'dates': ['date'], 'categories': ['platform', 'country', 'sentiment', 'stay_type'], 'text': ['id']},
+    'Subratings_reviews': {'dates': ['Date'], 'categories': ['subrating_name'], 'text': ['review_id']},
+    'Follows_cleaned': {'dates': ['Date']},
+    'Facebook_metrics_table': {'dates': ['date']},
+    'Facebook_Audience_details': {'dates': ['date'], 'categories': ['gender', 'age_range', 'country']},
+    'Facebook_content_type_table': {'dates': ['date'], 'categories': ['content_type']},
+    'Dim_Date': {'dates': ['date']},
+    'Rollup_Cube': {'dates': ['date'], 'categories': ['source', 'level', 'platform', 'sentiment', 'country', 'stay_type',
+                                                     'subrating_name', 'content_type', 'gender', 'age_range']},
+}
+
+
+def parquet_path(path):
+    folder, name = os.path.split(path)
+    return os.path.join(folder, PARQUET_DIR, os.path.splitext(name)[0] + '.parquet')
+
+
+def arrow_path(path):
+    folder, name = os.path.split(path)
+    return os.path.join(folder, ARROW_DIR, os.path.splitext(name)[0] + '.arrow')
+
+
+def table_schema(path):
+    return TABLE_SCHEMAS.get(os.path.splitext(os.path.basename(path))[0], {})
+
+
+def stored_path(path):
+    """The file holding table path: its Parquet copy, unless the CSV is newer (edited by hand, restored by git)."""
+    target = parquet_path(path)
+    if not os.path.exists(target):
+        return path
+    if os.path.exists(path) and os.stat(path).st_mtime_ns > os.stat(target).st_mtime_ns:
+        return path
+    return target
+
+
+def table_exists(path):
+    return os.path.exists(path) or os.path.exists(parquet_path(path))
+
+
+def as_text(series):
+    return series.where(series.isna(), series.astype(str))
+
+
+def typed(df, schema):
+    """Copy of df with the schema's dates, categories and text ids."""
+    df = df.copy()
+    for col in schema.get('dates', []):
+        if col in df.columns:
+            df[col] = pd.to_datetime(df[col], errors='coerce')
+    for col in schema.get('text', []):
+        if col in df.columns:
+            df[col] = as_text(df[col])
+    for col in schema.get('categories', []):
+        if col in df.columns:
+            df[col] = df[col].astype('category')
+    # An object column mixing numbers and strings has no single Arrow type: store it as text
+    for col in df.columns[df.dtypes == object]:
+        if pd.api.types.infer_dtype(df[col], skipna=True).startswith('mixed'):
+            df[col] = as_text(df[col])
+    return df
+
+
+def match_mtime(path, target):
+    # A CSV export carries the mtime of its Parquet source: only a later edit makes it newer
+    stat = os.stat(target)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+
+
+def write_table(df, path, encoding='utf-8-sig', csv=None):
+    """Writes df as typed Parquet, plus the CSV export at path unless csv=False (default: EXPORT_CSV)."""
+    target = parquet_path(path)
+    os.makedirs(os.path.dirname(target), exist_ok=True)
+    table = pa.Table.from_pandas(typed(df, table_schema(path)), preserve_index=False)
+    # Replaced atomically for concurrent readers
+    tmp_path = f"{target}.{os.getpid()}.tmp"
+    pq.write_table(table, tmp_path)
+    os.replace(tmp_path, target)
+    write_arrow(table, arrow_path(path))
+    if EXPORT_CSV if csv is None else csv:
+        df.to_csv(path, index=False, encoding=encoding)
+        match_mtime(path, target)
+    return target
+
+
+def write_arrow(table, target):
+    # Uncompressed so that readers map the buffers as they are on disk
+    os.makedirs(os.path.dirname(target), exist_ok=True)
+    tmp_path = f"{target}.{os.getpid()}.tmp"
+    with pa.OSFile(tmp_path, 'wb') as sink, pa.ipc.new_file(sink, table.schema) as writer:
+        writer.write_table(table)
+    os.replace(tmp_path, target)
+
+
+def load_stored(path):
+    source = stored_path(path)
+    if source.endswith('.parquet'):
+        return pq.read_table(source)
+    schema = table_schema(path)
+    text = {col: str for col in schema.get('text', [])}
+    df = typed(pd.read_csv(source, encoding='utf-8-sig', dtype=text), schema)
+    return pa.Table.from_pandas(df, preserve_index=False)
+
+
+def arrow_table(path):
+    """
+    Memory-mapped Arrow table of table path. The IPC cache is rebuilt from the
+    stored copy when missing or older than it (CSV-only trees, edited CSVs).
+    """
+    target = arrow_path(path)
+    source = stored_path(path)
+    if not os.path.exists(target) or os.stat(target).st_mtime_ns < os.stat(source).st_mtime_ns:
+        write_arrow(load_stored(path), target)
+    return pa.ipc.open_file(pa.memory_map(target, 'r')).read_all()
+
+
+def arrow_strings(arrow_type):
+    if pa.types.is_string(arrow_type) or pa.types.is_large_string(arrow_type):
+        return pd.ArrowDtype(arrow_type)
+    return None
+
+
+def table_columns(path):
+    return arrow_table(path).column_names
+
+
+def read_table(path, columns=None, categories=True):
+    """
+    Reads table path with typed dates and ids, loading only `columns` (in
+    table order; names the table lacks are skipped). Text columns are
+    pd.ArrowDtype(string) views of the mapped cache; categories=False returns
+    category columns as plain object columns.
+    """
+    table = arrow_table(path)
+    if columns is not None:
+        wanted = set(columns)
+        table = table.select([col for col in table.column_names if col in wanted])
+    df = table.to_pandas(types_mapper=arrow_strings)
+    if not categories:
+        for col in df.columns[df.dtypes == 'category']:
+            df[col] = df[col].astype(object)
+    return df
+
+
+def export_csv(paths, encoding='utf-8-sig'):
+    """Writes the CSV of every table whose Parquet copy is newer than it (or has none). Returns the paths written."""
+    written = []
+    for path in paths:
+        target = parquet_path(path)
+        if not os.path.exists(target):
+            continue
+        if stored_path(path) == path or os.path.exists(path) and os.stat(path).st_mtime_ns == os.stat(target).st_mtime_ns:
+            continue
+        pd.read_parquet(target).to_csv(path, index=False, encoding=encoding)
+        match_mtime(path, target)
+        print(f"✔ Exported {path} ({os.path.basename(target)})")
+        written.append(path)
+    return written
+
+
+def stored_tables(folder='output'):
+    parquet_dir = os.path.join(folder, PARQUET_DIR)
+    if not os.path.isdir(parquet_dir):
+        return []
+    return [os.path.join(folder, os.path.splitext(name)[0] + '.csv')
+            for name in sorted(os.listdir(parquet_dir)) if name.endswith('.parquet')]
+
+
+if __name__ == '__main__':
+    folder = sys.argv[1] if len(sys.argv) > 1 else 'output'
+    print(f"{len(export_csv(stored_tables(folder)))} CSV export(s) written")
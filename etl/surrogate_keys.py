@@ -0,0 +1,71 @@
+import numpy as np
+import pandas as pd
+
+
+def key_index(frame, key_cols):
+    if len(key_cols) == 1:
+        return pd.Index(frame[key_cols[0]])
+    return pd.MultiIndex.from_frame(frame[key_cols])
+
+
+def as_key_frame(keys, key_cols):
+    if isinstance(keys, pd.DataFrame):
+        return keys.set_axis(key_cols, axis=1)
+    return pd.DataFrame({key_cols[0]: keys})
+
+
+class DimensionLookup:
+    """
+    Surrogate-key lookup for one dimension, built once: a hash index over the
+    dimension's natural key columns. Fact keys are mapped to dimension rows in
+    one vectorized get_indexer pass, so a join never adds rows, and keys with
+    no dimension row are reported instead of silently becoming NaN ids.
+    """
+
+    def __init__(self, dim, key_cols, id_col=None, name='dimension'):
+        self.key_cols = [key_cols] if isinstance(key_cols, str) else list(key_cols)
+        self.id_col = id_col
+        self.name = name
+        dupes = dim.duplicated(subset=self.key_cols)
+        if dupes.any():
+            print(f"{name}: {dupes.sum()} duplicate keys on {self.key_cols}, keeping the first row of each")
+        self.dim = dim[~dupes].reset_index(drop=True)
+        self.index = key_index(self.dim, self.key_cols)
+
+    def positions(self, keys, report=True):
+        """Dimension row of each key (-1 when unmatched); keys is a Series or a DataFrame of key columns."""
+        key_frame = as_key_frame(keys, self.key_cols)
+        positions = self.index.get_indexer(key_index(key_frame, self.key_cols))
+        if report:
+            self.report_unmatched(key_frame, positions)
+        return positions
+
+    def report_unmatched(self, key_frame, positions):
+        missing = positions == -1
+        null_keys = key_frame.isna().any(axis=1).to_numpy()
+        unmatched = missing & ~null_keys
+        if unmatched.any():
+            sample = key_frame[unmatched].drop_duplicates().head(5)
+            sample = sample.iloc[:, 0].tolist() if len(self.key_cols) == 1 else list(sample.itertuples(index=False, name=None))
+            print(f"WARNING: {self.name}: {unmatched.sum()} of {len(positions)} keys have no dimension row "
+                  f"({key_frame[unmatched].drop_duplicates().shape[0]} distinct), e.g. {sample}")
+        if (missing & null_keys).any():
+            print(f"{self.name}: {(missing & null_keys).sum()} rows have an empty key")
+
+    def lookup(self, keys, columns, report=True):
+        """Dimension columns for each key, aligned to keys (NA when unmatched)."""
+        positions = self.positions(keys, report=report)
+        found = positions != -1
+        if self.dim.empty:
+            out = pd.DataFrame(pd.NA, index=range(len(positions)), columns=columns)
+        else:
+            out = self.dim[columns].iloc[np.where(found, positions, 0)].reset_index(drop=True)
+            out = out.astype({c: 'Int64' for c in columns if pd.api.types.is_integer_dtype(out[c])})
+            out[~found] = pd.NA
+        if isinstance(keys, (pd.Series, pd.DataFrame)):
+            out.index = keys.index
+        return out
+
+    def resolve(self, keys, report=True):
+        """Surrogate id of each key (nullable Int64 for integer ids)."""
+        return self.lookup(keys, [self.id_col], report=report)[self.id_col]
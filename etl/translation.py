@@ -0,0 +1,135 @@
+import hashlib
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+from etl.cache import CACHE_DIR, JsonCache
+
+DEFAULT_CACHE_PATH = os.path.join(CACHE_DIR, 'translations.json')
+BATCH_MARKER = '@@@'
+MAX_BATCH_CHARS = 4500  # GoogleTranslator rejects payloads above 5000 characters
+
+
+# ─── Backends ─────────────────────────────────
+class GoogleBackend:
+    """Google Translate through deep_translator, several texts per request."""
+
+    name = 'google'
+
+    def __init__(self, source='auto', target='en'):
+        from deep_translator import GoogleTranslator
+        self.translator_cls = GoogleTranslator
+        self.source = source
+        self.target = target
+
+    def translate_one(self, text):
+        try:
+            return self.translator_cls(source=self.source, target=self.target).translate(text)
+        except Exception:
+            return None
+
+    def translate_batch(self, texts):
+        # Returns one entry per input text; None marks a failed translation
+        if len(texts) == 1:
+            return [self.translate_one(texts[0])]
+        joined = f"\n{BATCH_MARKER}\n".join(texts)
+        try:
+            result = self.translator_cls(source=self.source, target=self.target).translate(joined)
+            parts = [p.strip() for p in (result or '').split(BATCH_MARKER)]
+            if len(parts) == len(texts):
+                return parts
+        except Exception:
+            pass
+        # Marker got mangled or the request failed: translate one by one
+        return [self.translate_one(t) for t in texts]
+
+
+class OfflineBackend:
+    """Identity backend for tests and offline runs: returns texts unchanged."""
+
+    name = 'offline'
+
+    def __init__(self, source='auto', target='en'):
+        self.target = target
+
+    def translate_batch(self, texts):
+        return list(texts)
+
+
+BACKENDS = {
+    'google': GoogleBackend,
+    'offline': OfflineBackend,
+}
+
+
+def get_backend(name=None, target='en'):
+    name = name or os.getenv('TRANSLATION_BACKEND', 'google')
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown translation backend '{name}' (expected one of {sorted(BACKENDS)})")
+    return BACKENDS[name](target=target)
+
+
+# ─── Cache ────────────────────────────────────
+def cache_key(text, target):
+    return hashlib.sha256(f"{target}\x1f{text}".encode('utf-8')).hexdigest()
+
+
+class TranslationCache(JsonCache):
+    """Persistent JSON map of sha256(target, source text) -> translated text."""
+
+    def __init__(self, path=DEFAULT_CACHE_PATH):
+        super().__init__(path)
+
+
+# ─── Engine ───────────────────────────────────
+def make_batches(texts, batch_size):
+    batch, size = [], 0
+    for text in texts:
+        if batch and (len(batch) >= batch_size or size + len(text) > MAX_BATCH_CHARS):
+            yield batch
+            batch, size = [], 0
+        batch.append(text)
+        size += len(text)
+    if batch:
+        yield batch
+
+
+def translate_series(series, target='en', backend=None, cache=None, batch_size=10, max_workers=4, save=True):
+    """
+    Translates a Series of texts, only sending texts missing from the cache.
+    Empty values become "N/A" and failed translations keep the original text.
+    With save=False the caller saves the cache once it is done with it.
+    """
+    backend = backend or get_backend(target=target)
+    cache = cache if cache is not None else TranslationCache()
+
+    texts = series.where(series.notna(), '').astype(str)
+    unique_texts = [t for t in texts.unique() if t.strip() != '']
+
+    translated = {}
+    misses = []
+    for text in unique_texts:
+        hit = cache.get(cache_key(text, target))
+        if hit is None:
+            misses.append(text)
+        else:
+            translated[text] = hit
+
+    failed = 0
+    if misses:
+        batches = list(make_batches(misses, batch_size))
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            for batch, results in zip(batches, pool.map(backend.translate_batch, batches)):
+                for text, result in zip(batch, results):
+                    if result is None:
+                        failed += 1
+                        translated[text] = text
+                    else:
+                        translated[text] = result
+                        cache.put(cache_key(text, target), result)
+        if save:
+            cache.save()
+
+    print(f"Translation cache ({backend.name}): {len(unique_texts) - len(misses)} hits, "
+          f"{len(misses)} misses, {failed} failed")
+
+    return texts.map(lambda t: translated.get(t, 'N/A') if t.strip() != '' else 'N/A')
@@ -1,32 +1,11 @@
-from textblob import TextBlob
-from deep_translator import GoogleTranslator
 import pandas as pd
 import re
-from io import StringIO
+import codecs
+import csv
+from datetime import datetime
 import numpy as np
 
 
-def translate_text(text):
-    try:
-        if pd.isna(text) or str(text).strip() == "":
-            return "N/A"
-        return GoogleTranslator(source='auto', target='en').translate(str(text))
-    except Exception:
-        return text
-
-def classify_sentiment(text):
-    if not text or pd.isna(text):
-        return "Neutral"
-    try:
-        polarity = TextBlob(str(text)).sentiment.polarity
-        if polarity > 0.1:
-            return "Positive"
-        elif polarity < -0.1:
-            return "Negative"
-        return "Neutral"
-    except Exception:
-        return "Neutral"
-
 def normalize_score(score, original_scale):
     try:
         if pd.isna(score):
@@ -35,33 +14,119 @@ def normalize_score(score, original_scale):
     except Exception:
         return None
 
-def get_first_matching_col(df, possible_names, default=None):
-    for name in possible_names:
-        for col in df.columns:
-            if col.strip().lower() == name.strip().lower():
-                return df[col]
-    return pd.Series([default] * len(df)) if default is not None else None
+def detect_encoding(file_path, encodings=('utf-8-sig', 'latin1'), block_size=1 << 20):
+    # First encoding that decodes the whole file, checked block by block (latin1 decodes anything)
+    for encoding in encodings:
+        decoder = codecs.getincrementaldecoder(encoding)()
+        try:
+            with open(file_path, 'rb') as f:
+                for block in iter(lambda: f.read(block_size), b''):
+                    decoder.decode(block)
+                decoder.decode(b'', final=True)
+            return encoding
+        except UnicodeDecodeError:
+            continue
+    return encodings[-1]
 
-def clean_csv_file(file_path):
-    
-    try:
-        with open(file_path, 'r', encoding='utf-8-sig', errors='ignore') as f:
-            lines = f.readlines()
+def read_header(file_path, encoding='utf-8-sig'):
+    return list(pd.read_csv(file_path, nrows=0, encoding=encoding).columns)
+
+def iter_csv_chunks(file_path, usecols, encoding='utf-8-sig', chunk_size=5000):
+    """
+    Streams only `usecols` of a CSV in DataFrames of at most chunk_size rows.
+    Row labels continue across chunks (0..n-1 over the file), as with one read.
+    """
+    yield from pd.read_csv(file_path, usecols=usecols, encoding=encoding, chunksize=chunk_size)
+
+FB_SKIP_PREFIXES = ('sep=', '��sep=', 'facebook')
+FB_DATE_FORMATS = ('%Y-%m-%dT%H:%M:%S', '%Y-%m-%d', '%m/%d/%Y', '%d/%m/%Y')
+QUOTED_COMMA = re.compile(r'"+\s*,\s*"+')
+SMART_QUOTES = re.compile(r'[“”]')
+TABS = re.compile(r'\t+')
 
-        clean_lines = [
-            re.sub(r'[“”]', '"', line)
-            for line in lines
-            if not line.lower().startswith(('sep=', '��sep=', 'facebook')) and line.strip()
-        ]
+def sanitize_fb_lines(lines):
+    # Per-line form of the export cleanup: title/sep= lines dropped, quotes, BOMs and tabs normalized.
+    # Each rewrite only runs on lines containing its characters; most data lines need none.
+    for line in lines:
+        if '“' in line or '”' in line:
+            line = SMART_QUOTES.sub('"', line)
+        if not line.strip() or line[:12].lower().startswith(FB_SKIP_PREFIXES):
+            continue
+        if '\u202c' in line or '\ufeff' in line:
+            line = line.replace('\u202c', '').replace('\ufeff', '')
+        if '"' in line:
+            line = QUOTED_COMMA.sub(',', line)
+        if '\t' in line:
+            line = TABS.sub(',', line)
+        yield line
+
+class LineStream:
+    """Read-only file object over an iterator of text lines, so pd.read_csv can consume it as a stream."""
+
+    def __init__(self, lines):
+        self.lines = iter(lines)
+        self.pending = ''
+
+    def read(self, size=-1):
+        parts, length = [self.pending], len(self.pending)
+        for line in self.lines:
+            parts.append(line)
+            length += len(line)
+            if 0 <= size <= length:
+                break
+        data = ''.join(parts)
+        if size < 0:
+            size = len(data)
+        self.pending = data[size:]
+        return data[:size]
+
+    def __iter__(self):
+        return iter(lambda: self.read(1 << 16), '')
 
-        cleaned = ''.join(clean_lines).replace('\u202c', '').replace('\ufeff', '')
-        cleaned = re.sub(r'"+\s*,\s*"+', ',', cleaned)
-        cleaned = re.sub(r'\t+', ',', cleaned)
+def detect_date_format(values, formats=FB_DATE_FORMATS, sample_size=200):
+    # First format that parses every value of a sample (None when none does);
+    # formats the first value rules out are skipped without a vectorized parse
+    sample = values.dropna().head(sample_size)
+    if sample.empty:
+        return None
+    for fmt in formats:
+        try:
+            datetime.strptime(str(sample.iloc[0]), fmt)
+        except ValueError:
+            continue
+        if pd.to_datetime(sample, format=fmt, errors='coerce').notna().all():
+            return fmt
+    return None
 
-        if not cleaned.strip():
-            return pd.DataFrame()
+def parse_fb_dates(values):
+    """
+    Vectorized parse_fb_date: the format is detected once from a sample and the
+    column parsed with it; values it does not fit go through parse_fb_date.
+    """
+    values = pd.Series(values)
+    fmt = detect_date_format(values)
+    if fmt is None:
+        return values.map(parse_fb_date)
+    parsed = pd.to_datetime(values, format=fmt, errors='coerce')
+    rest = parsed.isna() & values.notna()
+    if rest.any():
+        parsed = parsed.astype(object)
+        parsed[rest] = values[rest].map(parse_fb_date)
+        parsed = parsed.infer_objects()
+    return parsed
 
-        df = pd.read_csv(StringIO(cleaned), engine='python', on_bad_lines='skip')
+def clean_csv_file(file_path, parse_dates=False):
+    """
+    Facebook export as a DataFrame: sanitized line by line while the C parser
+    reads it, lower_snake_case columns, 'date' renamed from its variants and,
+    with parse_dates, parsed with one detected format.
+    """
+    try:
+        with open(file_path, 'r', encoding='utf-8-sig', errors='ignore') as f:
+            try:
+                df = pd.read_csv(LineStream(sanitize_fb_lines(f)), on_bad_lines='skip')
+            except pd.errors.EmptyDataError:
+                return pd.DataFrame()
 
         df.columns = [col.strip().lower().replace(' ', '_').replace('"', '') for col in df.columns] 
         # Ensure 'date' column exists even if written as DateTime or similar
@@ -69,11 +134,34 @@ def clean_csv_file(file_path):
             if possible_date in df.columns:
                 df.rename(columns={possible_date: 'date'}, inplace=True)
                 break
+        if parse_dates and 'date' in df.columns:
+            df['date'] = parse_fb_dates(df['date'])
         return df
     except Exception as e:
         print(f"Error cleaning CSV file {file_path}: {e}")
         return pd.DataFrame()
 
+def read_csv_sections(file_path):
+    """
+    Snapshot export (Audience.csv, Top content formats.csv) as {section title: rows}:
+    each section is a title line followed by rows up to the next blank line.
+    Cells are stripped, zero-width spaces included, and trailing empty cells dropped.
+    """
+    sections, title = {}, None
+    with open(file_path, 'r', encoding='utf-8-sig', errors='replace', newline='') as f:
+        for row in csv.reader(f):
+            cells = [cell.replace('\u200b', '').strip() for cell in row]
+            while cells and not cells[-1]:
+                cells.pop()
+            if not cells:
+                title = None
+            elif title is None:
+                title = cells[0]
+                sections[title] = []
+            else:
+                sections[title].append(cells)
+    return sections
+
 def clean_metric_column(series):
     return (
         series.astype(str)
@@ -0,0 +1,65 @@
+import json
+import os
+
+import pandas as pd
+
+DEFAULT_STATE_PATH = os.path.join('output', '.state', 'reviews_watermark.json')
+
+
+def load_watermarks(path=DEFAULT_STATE_PATH):
+    """Per-platform state: {platform: {'latest_date': ISO timestamp, 'seen': {review_id: row_fingerprint}}}"""
+    if not path or not os.path.exists(path):
+        return {}
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError) as e:
+        print(f"Ignoring unreadable watermark file {path}: {e}")
+        return {}
+
+
+def save_watermarks(state, path=DEFAULT_STATE_PATH):
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(state, f)
+    os.replace(tmp_path, path)
+
+
+def row_fingerprints(df):
+    # Hash of every raw column read, so an edited review is picked up as changed
+    return pd.util.hash_pandas_object(df, index=False).astype(str)
+
+
+def select_delta(ids, dates, fingerprints, platform_state):
+    """
+    Boolean mask of rows that are newer than the watermark date, never seen,
+    or whose raw content changed since the last run.
+    """
+    seen = platform_state.get('seen', {})
+    latest = pd.to_datetime(platform_state.get('latest_date'), errors='coerce')
+    keys = ids.astype(str)
+    previous = keys.map(seen)
+    mask = previous.isna() | (previous != fingerprints)
+    if pd.notna(latest):
+        mask |= dates > latest
+    return mask
+
+
+def forget_missing(platform_state, ids):
+    # Reviews deleted from the export: a later re-upload must be processed again
+    present = set(ids)
+    seen = platform_state.get('seen', {})
+    for key in [key for key in seen if key not in present]:
+        del seen[key]
+    return platform_state
+
+
+def update_watermark(platform_state, ids, dates, fingerprints):
+    seen = platform_state.setdefault('seen', {})
+    seen.update(zip(ids.astype(str), fingerprints))
+    latest = pd.to_datetime(platform_state.get('latest_date'), errors='coerce')
+    candidates = [d for d in (latest, dates.max()) if pd.notna(d)]
+    if candidates:
+        platform_state['latest_date'] = max(candidates).isoformat()
+    return platform_state
@@ -1,16 +1,21 @@
+import hashlib
 import os
 import pandas as pd
-from pymongo import MongoClient
 from dotenv import load_dotenv
+from pymongo import DeleteOne, ReplaceOne
+from etl.mongo import get_client
+from etl.mongo_indexes import ensure_indexes
+from etl.properties import PROPERTY_COLUMN, property_filter
+from etl.storage import export_csv, table_schema
 
 load_dotenv()
 
 MONGO_URI = os.getenv("MONGO_URI")
 DB_NAME = os.getenv("DB_NAME", "PFE")
 OUTPUT_FOLDER = os.getenv("OUTPUT_FOLDER", "output")
-
-client = MongoClient(MONGO_URI)
-db = client[DB_NAME]
+# 'upsert' (default): stream chunks and only write changed rows; 'replace': wipe and reinsert
+LOAD_MODE = os.getenv("LOAD_MODE", "upsert")
+CHUNK_SIZE = 5000
 
 # Collection prefix: output.
 OUTPUT_COLLECTION_PREFIX = "output."
@@ -25,26 +30,154 @@ files_to_load = [
     ("Follows_cleaned.csv", ["Date"])
 ]
 
-def load_csv_to_output_collection(file_name, date_columns):
+# Natural key of each file for upserts, led by the property partition
+NATURAL_KEYS = {
+    "Scrapped_reviews_cleaned.csv": [PROPERTY_COLUMN, "platform", "id"],
+    "Subratings_reviews.csv": [PROPERTY_COLUMN, "review_id", "subrating_name"],
+    "Facebook_metrics_table.csv": [PROPERTY_COLUMN, "date"],
+    "Facebook_Audience_details.csv": [PROPERTY_COLUMN, "date", "gender", "age_range", "country"],
+    "Facebook_content_type_table.csv": [PROPERTY_COLUMN, "date", "content_type"],
+    "Follows_cleaned.csv": [PROPERTY_COLUMN, "Date"],
+}
+ROW_HASH_FIELD = "_row_hash"
+
+def read_partitions(file_path, properties=None, text=(), **kwargs):
+    """
+    Reads the CSV with property ids, the table's text ids and the `text`
+    columns as strings ("001" is not 1): chunks then agree on their types
+    whatever values each holds. With properties, only their rows.
+    """
+    text_columns = [PROPERTY_COLUMN, *table_schema(file_path).get('text', []), *text]
+    reader = pd.read_csv(file_path, dtype={col: str for col in text_columns}, **kwargs)
+    if not properties:
+        return reader
+    select = lambda df: df[df[PROPERTY_COLUMN].isin(properties)].copy() if PROPERTY_COLUMN in df.columns else df.iloc[:0]
+    if 'chunksize' in kwargs:
+        return (select(chunk) for chunk in reader)
+    return select(reader)
+
+def load_csv_to_output_collection(db, file_name, date_columns, properties=None):
     file_path = os.path.join(OUTPUT_FOLDER, file_name)
     collection_name = OUTPUT_COLLECTION_PREFIX + os.path.splitext(file_name)[0]
 
-    df = pd.read_csv(file_path)
+    df = read_partitions(file_path, properties)
 
     # Convert date columns if any
     for col in date_columns:
         if col in df.columns:
             df[col] = pd.to_datetime(df[col], errors='coerce')
 
-    # Insert into Mongo
-    db[collection_name].delete_many({})
-    db[collection_name].insert_many(df.to_dict("records"))
+    # Insert into Mongo: only the given properties' documents are replaced
+    db[collection_name].delete_many(property_filter(properties))
+    if not df.empty:
+        db[collection_name].insert_many(df.to_dict("records"))
+    ensure_indexes(db[collection_name])
     print(f" Loaded {len(df)} records into collection '{collection_name}'")
-    
-def load_all_outputs_to_mongo():
+
+# ─── Upsert mode ──────────────────────────────────────────────────
+def normalized(value):
+    # A column read as int64 in one chunk is float64 in another holding a gap: 5 and 5.0 hash alike
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    return value
+
+def row_hash(record):
+    return hashlib.md5(repr([(field, normalized(value)) for field, value in record.items()]).encode()).hexdigest()
+
+def prepare_chunk(chunk, date_columns):
+    """Parses dates and returns Mongo-ready records, each with the hash of its values."""
+    for col in date_columns:
+        if col in chunk.columns:
+            chunk[col] = pd.to_datetime(chunk[col], errors='coerce')
+    # NaN/NaT are not valid BSON values: store them as null
+    records = chunk.astype(object).where(chunk.notna(), None).to_dict("records")
+    for record in records:
+        record[ROW_HASH_FIELD] = row_hash(record)
+    return records
+
+def natural_key(doc, key_fields):
+    return tuple(doc.get(f) for f in key_fields)
+
+def drop_stale_unique_indexes(collection, key_fields):
+    # Unique indexes of an earlier natural key (e.g. before property_id led it) would reject valid rows
+    for index_name, info in collection.index_information().items():
+        if info.get('unique') and [field for field, _ in info['key']] != key_fields:
+            collection.drop_index(index_name)
+            print(f" Dropped unique index {index_name} of '{collection.name}': natural key is now {key_fields}")
+
+def upsert_csv_to_output_collection(db, file_name, date_columns, chunk_size=CHUNK_SIZE, properties=None):
+    """
+    Streams the CSV in chunks into unordered bulk ReplaceOne(upsert=True)
+    batches keyed on the file's natural key. Rows whose hash matches the stored
+    one are not written, rows gone from the file are deleted, and the collection
+    stays readable throughout. With properties, only those partitions are read,
+    written and deleted from. Raises ValueError on a chunk repeating a natural key
+    of the file. Returns the inserted/updated/unchanged/deleted counts.
+    """
+    file_path = os.path.join(OUTPUT_FOLDER, file_name)
+    collection_name = OUTPUT_COLLECTION_PREFIX + os.path.splitext(file_name)[0]
+    collection = db[collection_name]
+    key_fields = NATURAL_KEYS[file_name]
+
+    # Rows from a replace-mode or unpartitioned load carry no hash or property: clear them once
+    legacy = collection.delete_many({"$or": [{ROW_HASH_FIELD: {"$exists": False}},
+                                             {PROPERTY_COLUMN: {"$exists": False}}]}).deleted_count
+    if legacy:
+        print(f" Removed {legacy} rows of a previous full load from '{collection_name}'")
+    drop_stale_unique_indexes(collection, key_fields)
+    collection.create_index([(f, 1) for f in key_fields], unique=True)
+    ensure_indexes(collection)
+
+    projection = {f: 1 for f in key_fields + [ROW_HASH_FIELD]}
+    existing = {natural_key(doc, key_fields): doc[ROW_HASH_FIELD]
+                for doc in collection.find(property_filter(properties), projection)}
+    counts = {"inserted": 0, "updated": 0, "unchanged": 0, "deleted": 0}
+    seen = set()
+
+    # Key fields are read as text: a key parsed as a number in one chunk would miss its stored document
+    text_keys = [f for f in key_fields if f not in date_columns]
+    for chunk in read_partitions(file_path, properties, text=text_keys, chunksize=chunk_size):
+        ops = []
+        repeated = []
+        for record in prepare_chunk(chunk, date_columns):
+            key = natural_key(record, key_fields)
+            if key in seen:
+                repeated.append(key)
+            seen.add(key)
+            if existing.get(key) == record[ROW_HASH_FIELD]:
+                counts["unchanged"] += 1
+                continue
+            ops.append(ReplaceOne({f: record[f] for f in key_fields}, record, upsert=True))
+        # Rows sharing a key would overwrite each other in file order and be rewritten on every load
+        if repeated:
+            raise ValueError(f"{file_name}: {len(repeated)} rows repeat a natural key {key_fields}, "
+                             f"e.g. {repeated[:3]}")
+        if ops:
+            result = collection.bulk_write(ops, ordered=False)
+            counts["inserted"] += result.upserted_count
+            counts["updated"] += result.modified_count
+
+    # existing only holds the refreshed partitions: other properties' rows are never stale
+    stale = [key for key in existing if key not in seen]
+    for i in range(0, len(stale), chunk_size):
+        ops = [DeleteOne(dict(zip(key_fields, key))) for key in stale[i:i + chunk_size]]
+        counts["deleted"] += collection.bulk_write(ops, ordered=False).deleted_count
+
+    print(f" Upserted '{collection_name}': {counts['inserted']} inserted, {counts['updated']} updated, "
+          f"{counts['unchanged']} unchanged, {counts['deleted']} deleted")
+    return counts
+
+def load_all_outputs_to_mongo(mode=LOAD_MODE, db=None, properties=None):
+    if db is None:
+        db = get_client(MONGO_URI)[DB_NAME]
+    # The loaders read the CSV exports: write any the stages skipped (EXPORT_CSV unset) or older than their Parquet copy
+    export_csv([os.path.join(OUTPUT_FOLDER, file_name) for file_name, _ in files_to_load])
     for file_name, date_cols in files_to_load:
         try:
-            load_csv_to_output_collection(file_name, date_cols)
+            if mode == "upsert":
+                upsert_csv_to_output_collection(db, file_name, date_cols, properties=properties)
+            else:
+                load_csv_to_output_collection(db, file_name, date_cols, properties=properties)
         except Exception as e:
             print(f"Failed to load {file_name}: {e}")
 
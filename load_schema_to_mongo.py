@@ -1,7 +1,11 @@
+import argparse
 import pandas as pd
 import os
-from pymongo import MongoClient
 from dotenv import load_dotenv
+from etl.mongo import get_client
+from etl.mongo_indexes import assert_queries_use_indexes, ensure_indexes, superseded
+from etl.properties import PROPERTY_COLUMN
+from etl.storage import export_csv, stored_tables
 
 load_dotenv()
 
@@ -10,32 +14,91 @@ DB_NAME = os.getenv("DB_NAME", "PFE")
 OUTPUT = "output"
 CHARTS_DIR = os.path.join(OUTPUT, "charts")
 
-client = MongoClient(MONGO_URI)
-db = client[DB_NAME]
+# Each table is loaded into <name>__staging and swapped over the live collection;
+# the live collection it replaces is kept as <name>__previous for rollback.
+STAGING_SUFFIX = "__staging"
+PREVIOUS_SUFFIX = "__previous"
+INDEX_OPTIONS = ['unique', 'sparse', 'expireAfterSeconds', 'partialFilterExpression']
+
+# --- Blue/green collection swap ---
+def start_staging(db, name):
+    # Left-overs of an interrupted load are dropped; created up front so empty tables swap in too
+    staging_name = name + STAGING_SUFFIX
+    db.drop_collection(staging_name)
+    db.create_collection(staging_name)
+    return db[staging_name]
+
+def copy_indexes(source, target, name=None):
+    # With name, indexes the manifest of name has replaced are not carried over
+    for index_name, info in source.index_information().items():
+        if index_name == '_id_' or name and superseded(name, info['key']):
+            continue
+        options = {k: info[k] for k in INDEX_OPTIONS if k in info}
+        target.create_index(list(info['key']), name=index_name, **options)
+
+def swap_in(db, name):
+    """
+    Builds the manifest indexes (and any other index of the live collection but
+    those the manifest has replaced) on the staging collection, snapshots the live collection to <name>__previous,
+    then renames staging over live in one atomic renameCollection(dropTarget=True):
+    readers never see it empty.
+
+    The snapshot is a server-side copy of the live collection. Renaming live to
+    <name>__previous first would avoid it, but the collection would then be
+    missing between the two renames and dashboards querying it meanwhile would
+    read no documents, which is what the staged load exists to prevent.
+    """
+    staging = db[name + STAGING_SUFFIX]
+    ensure_indexes(staging, name)
+    if name in db.list_collection_names():
+        copy_indexes(db[name], staging, name)
+        # A copy, not a rename: live stays readable until staging replaces it
+        db[name].aggregate([{'$out': name + PREVIOUS_SUFFIX}])
+        copy_indexes(db[name], db[name + PREVIOUS_SUFFIX])
+    staging.rename(name, dropTarget=True)
+
+def rollback(db, name):
+    previous = name + PREVIOUS_SUFFIX
+    if previous not in db.list_collection_names():
+        print(f"No previous generation of {name} to roll back to")
+        return False
+    db[previous].rename(name, dropTarget=True)
+    print(f"✔ Rolled back {name} to its previous generation")
+    return True
+
+def rollback_candidates(db):
+    # Tables that have a previous generation to restore
+    return sorted(n[:-len(PREVIOUS_SUFFIX)] for n in db.list_collection_names() if n.endswith(PREVIOUS_SUFFIX))
 
 # --- Load all chart tables into a single 'Charts' collection ---
-charts_collection = db['Charts']
-charts_collection.drop()
-if os.path.exists(CHARTS_DIR):
-    for file in os.listdir(CHARTS_DIR):
-        if file.endswith('.csv'):
-            chart_id = file.replace('chart_', '').replace('.csv', '')
-            path = os.path.join(CHARTS_DIR, file)
-            try:
-                df = pd.read_csv(path)
-                if not df.empty:
-                    records = df.to_dict("records")
-                    for rec in records:
-                        rec['chart_id'] = chart_id
-                    charts_collection.insert_many(records)
-                print(f"Loaded chart {chart_id} into Charts collection")
-            except Exception as e:
-                print(f"Failed to load chart {chart_id}: {e}")
-else:
-    print(f"Charts directory not found: {CHARTS_DIR}")
-
-
-# --- Load all fact and dimension tables (star schema) into their own collections ---
+def load_charts(db):
+    if os.path.exists(CHARTS_DIR):
+        charts_collection = start_staging(db, 'Charts')
+        for file in os.listdir(CHARTS_DIR):
+            if file.endswith('.csv'):
+                chart_id = file.replace('chart_', '').replace('.csv', '')
+                path = os.path.join(CHARTS_DIR, file)
+                try:
+                    df = pd.read_csv(path)
+                    if not df.empty:
+                        records = df.to_dict("records")
+                        for rec in records:
+                            rec['chart_id'] = chart_id
+                        charts_collection.insert_many(records)
+                    print(f"Loaded chart {chart_id} into Charts collection")
+                except Exception as e:
+                    print(f"Failed to load chart {chart_id}: {e}")
+        swap_in(db, 'Charts')
+    else:
+        print(f"Charts directory not found: {CHARTS_DIR}")
+
+
+# --- Load all fact and dimension tables (star schema) and the rollup cube into their own collections ---
+# Rollup_Cube: the day/month/year cube every dashboard year and filter can be read from
+WAREHOUSE_PREFIXES = ('Dim_', 'Fact_', 'Rollup_Cube')
+# Tables no longer produced (Fact_Facebook: split into the daily, content and audience facts).
+# Their collections and previous generations are dropped and stale CSVs are not loaded.
+RETIRED_TABLES = ['Fact_Facebook']
 import math
 def chunked_insert(collection, df, chunk_size=10000):
     total = len(df)
@@ -44,32 +107,104 @@ def chunked_insert(collection, df, chunk_size=10000):
         if not chunk.empty:
             collection.insert_many(chunk.to_dict("records"))
 
+def refresh_partitions(db, name, df, properties):
+    """
+    Replaces the given properties' documents through the blue/green swap: the
+    other properties' documents are copied server-side into staging, the
+    properties' rows are inserted next to them and staging is swapped in, so
+    readers never see the properties missing and the live collection is kept
+    as <name>__previous.
+    """
+    staging = start_staging(db, name)
+    if name in db.list_collection_names():
+        # Documents of an unpartitioned load have no property: they are replaced as well
+        others = {PROPERTY_COLUMN: {'$exists': True, '$nin': list(properties)}}
+        db[name].aggregate([{'$match': others}, {'$out': staging.name}])
+    kept = staging.count_documents({})
+    rows = df[df[PROPERTY_COLUMN].isin(properties)] if PROPERTY_COLUMN in df.columns else df.iloc[:0]
+    chunked_insert(staging, rows)
+    swap_in(db, name)
+    print(f"Refreshed {name} for {', '.join(properties)}: {len(rows)} loaded, {kept} of other properties kept")
 
-star_schema_files = [f for f in os.listdir(OUTPUT) if (f.startswith('Dim_') or f.startswith('Fact_')) and f.endswith('.csv')]
-for file in star_schema_files:
-    collection_name = file.replace('.csv', '')
-    path = os.path.join(OUTPUT, file)
-    try:
-        if not os.path.exists(path):
-            print(f"File {file} does not exist, skipping.")
-            continue
-        df = pd.read_csv(path)
-        print(f"Processing {file}: {len(df)} rows, columns: {list(df.columns)}")
-        print(df.head())
-        db[collection_name].drop()
-        if df.empty:
-            print(f"{file} is empty (no data rows). Collection {collection_name} will be empty.")
-        elif file == 'Fact_Reviews.csv':
-            # Check if only dummy row (all None)
-            if len(df) == 1 and df.isnull().all(axis=None):
-                print(f"WARNING: {file} only contains a single dummy row with all None values. No real data to load.")
+def drop_retired(db):
+    existing = set(db.list_collection_names())
+    for name in RETIRED_TABLES:
+        for collection_name in (name, name + STAGING_SUFFIX, name + PREVIOUS_SUFFIX):
+            if collection_name in existing:
+                db.drop_collection(collection_name)
+                print(f"✔ Dropped retired collection {collection_name}")
+
+def warehouse_table(file):
+    name, ext = os.path.splitext(file)
+    return ext == '.csv' and file.startswith(WAREHOUSE_PREFIXES) and name not in RETIRED_TABLES
+
+def load_star_schema(db, properties=None):
+    drop_retired(db)
+    export_csv([path for path in stored_tables(OUTPUT) if warehouse_table(os.path.basename(path))])
+    star_schema_files = [f for f in os.listdir(OUTPUT) if warehouse_table(f)]
+    for file in star_schema_files:
+        collection_name = file.replace('.csv', '')
+        path = os.path.join(OUTPUT, file)
+        try:
+            if not os.path.exists(path):
+                print(f"File {file} does not exist, skipping.")
+                continue
+            # In one pass: the cube's sparse dimension columns would otherwise get per-chunk types
+            df = pd.read_csv(path, dtype={PROPERTY_COLUMN: str}, low_memory=False)
+            print(f"Processing {file}: {len(df)} rows, columns: {list(df.columns)}")
+            print(df.head())
+            if properties:
+                refresh_partitions(db, collection_name, df, properties)
+                continue
+            staging = start_staging(db, collection_name)
+            if df.empty:
+                print(f"{file} is empty (no data rows). Collection {collection_name} will be empty.")
+            elif file == 'Fact_Reviews.csv':
+                # Check if only dummy row (all None)
+                if len(df) == 1 and df.isnull().all(axis=None):
+                    print(f"WARNING: {file} only contains a single dummy row with all None values. No real data to load.")
+                else:
+                    chunked_insert(staging, df)
+                    print(f"Loaded {file} into collection {collection_name}")
             else:
-                chunked_insert(db[collection_name], df)
+                chunked_insert(staging, df)
                 print(f"Loaded {file} into collection {collection_name}")
-        else:
-            chunked_insert(db[collection_name], df)
-            print(f"Loaded {file} into collection {collection_name}")
-    except Exception as e:
-        print(f"Failed to load {file}: {e}")
+            swap_in(db, collection_name)
+        except Exception as e:
+            # The live collection is untouched; only the staging copy is discarded
+            db.drop_collection(collection_name + STAGING_SUFFIX)
+            print(f"Failed to load {file}: {e}")
+
+def load_schema(db, properties=None):
+    """
+    Loads the charts, the star schema and the rollup cube into db, then checks
+    the dashboard query plans. With properties, only their star schema
+    documents are refreshed.
+    """
+    # Charts are rebuilt for every property on each run, so they are always swapped in whole
+    load_charts(db)
+    load_star_schema(db, properties)
+    try:
+        assert_queries_use_indexes(db)
+    except AssertionError as e:
+        print(f"WARNING: {e}")
+    print("All available CSV files in output/ and output/charts/ loaded into MongoDB database PFE, including all star schema tables.")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Load chart and star schema tables into MongoDB.")
+    parser.add_argument("--rollback", nargs="*", metavar="COLLECTION",
+                        help="restore the previous generation of these collections (all if none given) instead of loading")
+    parser.add_argument("--property", nargs="+", metavar="PROPERTY_ID", dest="properties",
+                        help="reload only these properties' documents of the star schema (charts are always reloaded whole)")
+    args = parser.parse_args(argv)
+
+    client = get_client(MONGO_URI)
+    db = client[DB_NAME]
+    if args.rollback is not None:
+        for name in args.rollback or rollback_candidates(db):
+            rollback(db, name)
+        return
+    load_schema(db, args.properties)
 
-print("All available CSV files in output/ and output/charts/ loaded into MongoDB database PFE, including all star schema tables.")
+if __name__ == "__main__":
+    main()
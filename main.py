@@ -1,4 +1,7 @@
+import argparse
+import functools
 import os
+import sys
 from etl import (
     etl_reviews,
     etl_subratings,
@@ -6,73 +9,190 @@ from etl import (
     etl_facebook_audience,
     etl_facebook_content,
     etl_follows_cleaning,
-
+    etl_generate_schema,
+    etl_rollup,
+    etl_charts,
 )
-from load_clean_outputs_to_mongo import load_all_outputs_to_mongo  
+from etl.dag import Task, run_dag
+from etl.mongo import get_client
+from etl.properties import combine_partitions, discover_properties, partition_dir
+from etl.stage_cache import StageManifest
+from load_clean_outputs_to_mongo import load_all_outputs_to_mongo
+import load_schema_to_mongo
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+CHART_CONFIG = [os.path.join(ROOT, name) for name in ["reviews_dashboard_metadata.csv", "facebook_dashboard_metadata.csv"]]
+
+REVIEW_OUTPUTS = ["output/Scrapped_reviews_cleaned.csv", "output/Subratings_reviews.csv"]
+FACEBOOK_OUTPUTS = [
+    "output/Follows_cleaned.csv",
+    "output/Facebook_metrics_table.csv",
+    "output/Facebook_Audience_details.csv",
+    "output/Facebook_content_type_table.csv",
+]
+SCHEMA_OUTPUTS = [f"output/{name}.csv" for name in [
+    "Dim_Date", "Dim_Content_Type", "Dim_Audience", "Dim_Reviews", "Dim_Reviewer",
+    "Dim_Subrating", "Dim_Platform", "Dim_StayType",
+    "Fact_Facebook_Daily", "Fact_Facebook_Content", "Fact_Facebook_Audience", "Fact_Reviews",
+]]
+CUBE_OUTPUTS = ["output/Rollup_Cube.csv"]
 
-print(" Starting full ETL pipeline...\n")
+# property_id -> raw folder (data/raw/properties/<id>, or data/raw for a single property)
+PROPERTIES = discover_properties()
+
+# Steps 1-6 run once per property: raw is the property's raw folder, out its output partition
 
 # ─── Step 1: Reviews ──────────────────────────────────────────────
-try:
-    print("Processing reviews...")
-    etl_reviews.process("data/raw/reviews", "output/Scrapped_reviews_cleaned.csv")
-except Exception as e:
-    print(f"Error in reviews ETL: {e}")
+def run_reviews(raw, out):
+    etl_reviews.process(f"{raw}/reviews", f"{out}/Scrapped_reviews_cleaned.csv", incremental=True,
+                        state_path=f"{out}/.state/reviews_watermark.json")
 
 # ─── Step 2: Subratings ───────────────────────────────────────────
-try:
-    print("Processing subratings...")
-    etl_subratings.process("data/raw/reviews", "output/Subratings_reviews.csv")
-except Exception as e:
-    print(f"Error in subratings ETL: {e}")
+def run_subratings(raw, out):
+    etl_subratings.process(f"{raw}/reviews", f"{out}/Subratings_reviews.csv")
 
 # ─── Step 3: Clean Facebook follows ───────────────────────────────
-try:
-    print("Cleaning Follows.csv...")
-    etl_follows_cleaning.process("data/raw/facebook/Follows.csv", "output/Follows_cleaned.csv")
-except Exception as e:
-    print(f"Error in Follows cleaning ETL: {e}")
+def run_follows_cleaning(raw, out):
+    etl_follows_cleaning.process(f"{raw}/facebook/Follows.csv", f"{out}/Follows_cleaned.csv")
 
 # ─── Step 4: Facebook metrics ─────────────────────────────────────
-try:
-    print("Processing Facebook metrics...")
-    etl_facebook_metrics.process("data/raw/facebook", "output/Facebook_metrics_table.csv", follows_path="output/Follows_cleaned.csv")
-except Exception as e:
-    print(f" Error in Facebook metrics ETL: {e}")
+def run_facebook_metrics(raw, out):
+    etl_facebook_metrics.process(f"{raw}/facebook", f"{out}/Facebook_metrics_table.csv")
 
 # ─── Step 5: Facebook audience ────────────────────────────────────
-try:
-    print("Processing Facebook audience...")
+def run_facebook_audience(raw, out):
     etl_facebook_audience.process(
-        audience_path="data/raw/facebook/Audience.csv",
-        output_path="output/Facebook_Audience_details.csv",
-        follows_path="output/Follows_cleaned.csv" 
+        audience_path=f"{raw}/facebook/Audience.csv",
+        output_path=f"{out}/Facebook_Audience_details.csv",
+        follows_path=f"{out}/Follows_cleaned.csv"
     )
-except Exception as e:
-    print(f"Error in Facebook audience ETL: {e}")
 
 # ─── Step 6: Facebook content type ────────────────────────────────
-try:
-    print("Processing Facebook content type...")
-    etl_facebook_content.process("output/Follows_cleaned.csv", "output/Facebook_content_type_table.csv")
-except Exception as e:
-    print(f"Error in Facebook content ETL: {e}")
-
-
-# ─── Step 7: Generate Chart Tables ────────────────────────────────
-try:
-    print("Generating dashboard chart tables...")
-    import subprocess
-    subprocess.run(["python", "etl/etl_charts.py"], check=True)
-except Exception as e:
-    print(f"Error generating chart tables: {e}")
-
-# ─── Step 8: Load All Outputs, Charts, and Fact/Dim Tables to MongoDB ──
-try:
-    print("Loading all outputs, charts, and warehouse tables to MongoDB...")
-    import subprocess
-    subprocess.run(["python", "load_schema_to_mongo.py"], check=True)
-except Exception as e:
-    print(f"Error loading all data to MongoDB: {e}")
-
-print("\nETL pipeline execution completed.")
+def run_facebook_content(raw, out):
+    etl_facebook_content.process(
+        f"{out}/Follows_cleaned.csv", f"{out}/Facebook_content_type_table.csv",
+        formats_path=f"{raw}/facebook/Top content formats.csv",
+        metrics_path=f"{out}/Facebook_metrics_table.csv"
+    )
+
+# ─── Step 7: Combine the property partitions into output/ ─────────
+def run_partitions(properties=None):
+    for path in REVIEW_OUTPUTS + FACEBOOK_OUTPUTS:
+        combine_partitions(path, properties or list(PROPERTIES))
+
+# ─── Step 8: Generate Star Schema (Dim/Fact tables) ───────────────
+def run_schema():
+    etl_generate_schema.generate_all()
+
+# ─── Step 9: Build the day/month/year rollup cube ─────────────────
+def run_rollup():
+    etl_rollup.process()
+
+# ─── Step 10: Generate Chart Tables from the cube ─────────────────
+def run_charts():
+    etl_charts.run_all()
+
+# ─── Step 11: Load All Outputs, Charts, and Fact/Dim Tables to MongoDB ──
+def run_load_mongo(properties=None):
+    # Only the given properties' documents are rewritten (all of them by default)
+    db = get_client(load_schema_to_mongo.MONGO_URI)[load_schema_to_mongo.DB_NAME]
+    load_all_outputs_to_mongo(db=db, properties=properties)
+    load_schema_to_mongo.load_schema(db, properties)
+
+# (step, message, function, error, inputs, outputs, params), paths relative to the
+# property's raw folder ({raw}) and output partition ({out})
+PROPERTY_STEPS = [
+    ("reviews", "Processing reviews...", run_reviews, "Error in reviews ETL",
+     ["{raw}/reviews"], ["{out}/Scrapped_reviews_cleaned.csv"],
+     {"translation_backend": os.getenv("TRANSLATION_BACKEND", "google")}),
+    ("subratings", "Processing subratings...", run_subratings, "Error in subratings ETL",
+     ["{raw}/reviews"], ["{out}/Subratings_reviews.csv"], None),
+    ("follows_cleaning", "Cleaning Follows.csv...", run_follows_cleaning, "Error in Follows cleaning ETL",
+     ["{raw}/facebook/Follows.csv"], ["{out}/Follows_cleaned.csv"], None),
+    ("facebook_metrics", "Processing Facebook metrics...", run_facebook_metrics, "Error in Facebook metrics ETL",
+     ["{raw}/facebook"], ["{out}/Facebook_metrics_table.csv"], None),
+    ("facebook_audience", "Processing Facebook audience...", run_facebook_audience, "Error in Facebook audience ETL",
+     ["{raw}/facebook/Audience.csv", "{out}/Follows_cleaned.csv"], ["{out}/Facebook_Audience_details.csv"], None),
+    ("facebook_content", "Processing Facebook content type...", run_facebook_content, "Error in Facebook content ETL",
+     ["{raw}/facebook/Top content formats.csv", "{out}/Follows_cleaned.csv", "{out}/Facebook_metrics_table.csv"],
+     ["{out}/Facebook_content_type_table.csv"], None),
+]
+STEP_NAMES = [step for step, *_ in PROPERTY_STEPS] + ["partitions", "schema", "rollup", "charts", "load_mongo"]
+
+def task_name(step, property_id):
+    return f"{step}[{property_id}]"
+
+def step_of(task):
+    # "reviews[hotel_a]" -> "reviews"
+    return task.name.split("[", 1)[0]
+
+def property_tasks(property_id, raw):
+    out = partition_dir(property_id)
+    paths = lambda templates: [t.format(raw=raw, out=out) for t in templates]
+    return [
+        Task(task_name(step, property_id), f"[{property_id}] {message}", functools.partial(func, raw, out), error,
+             inputs=paths(inputs), outputs=paths(outputs), params=params)
+        for step, message, func, error, inputs, outputs, params in PROPERTY_STEPS
+    ]
+
+def build_steps(properties=None):
+    """
+    Pipeline tasks for the given property ids (default: all discovered). The
+    per-property branches run concurrently; dependencies follow from the files
+    each task reads and writes.
+    """
+    selected = {pid: raw for pid, raw in PROPERTIES.items() if not properties or pid in properties}
+    tasks = [task for pid, raw in selected.items() for task in property_tasks(pid, raw)]
+    partitions = [path for task in tasks for path in task.outputs]
+    return tasks + [
+        # Partitions of properties not selected are combined as they are on disk
+        Task("partitions", "Combining property partitions...", run_partitions, "Error combining property partitions",
+             inputs=partitions, outputs=REVIEW_OUTPUTS + FACEBOOK_OUTPUTS, params={"properties": sorted(PROPERTIES)}),
+        Task("schema", "Generating star schema tables...", run_schema, "Error generating star schema",
+             inputs=REVIEW_OUTPUTS + FACEBOOK_OUTPUTS, outputs=SCHEMA_OUTPUTS),
+        Task("rollup", "Building the rollup cube...", run_rollup, "Error building the rollup cube",
+             inputs=REVIEW_OUTPUTS + FACEBOOK_OUTPUTS, outputs=CUBE_OUTPUTS),
+        Task("charts", "Generating dashboard chart tables...", run_charts, "Error generating chart tables",
+             inputs=CUBE_OUTPUTS + CHART_CONFIG, outputs=["output/charts"],
+             params={"dashboard_year": os.getenv("DASHBOARD_YEAR")}),
+        Task("load_mongo", "Loading all outputs, charts, and warehouse tables to MongoDB...",
+             functools.partial(run_load_mongo, sorted(properties) if properties else None), "Error loading all data to MongoDB",
+             inputs=REVIEW_OUTPUTS + FACEBOOK_OUTPUTS + ["output/charts"] + SCHEMA_OUTPUTS + CUBE_OUTPUTS, outputs=[],
+             params={"mongo_uri": os.getenv("MONGO_URI"), "db_name": os.getenv("DB_NAME", "PFE"),
+                     "load_mode": os.getenv("LOAD_MODE", "upsert"), "properties": sorted(properties or [])}),
+    ]
+
+STEPS = build_steps()
+
+def run_step(name):
+    # A step name runs that step for every property; "reviews[hotel_a]" runs a single task
+    tasks = [task for task in STEPS if name in (task.name, step_of(task))]
+    if not tasks:
+        raise KeyError(f"Unknown pipeline step: {name}")
+    for task in tasks:
+        print(task.message)
+        task.func()
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run the hotel dashboard ETL pipeline.")
+    parser.add_argument("--workers", type=int, default=None, help="parallel worker processes (default: CPU count)")
+    parser.add_argument("--force", action="store_true", help="run every step even if its inputs are unchanged")
+    parser.add_argument("--only", nargs="+", choices=STEP_NAMES, metavar="STEP",
+                        help="run only these steps (always, ignoring the stage cache)")
+    parser.add_argument("--property", nargs="+", choices=sorted(PROPERTIES), metavar="PROPERTY_ID", dest="properties",
+                        help="refresh only these properties' partitions (and only their MongoDB documents)")
+    args = parser.parse_args(argv)
+
+    steps = [step for step in build_steps(args.properties) if not args.only or step_of(step) in args.only]
+    print(f" Starting full ETL pipeline for {len(args.properties or PROPERTIES)} propert(y/ies)...\n")
+    results = run_dag(steps, max_workers=args.workers, manifest=StageManifest(), force=args.force or bool(args.only))
+    print("\nPipeline summary:")
+    for step in steps:
+        status, seconds = results[step.name]
+        print(f"  {step.name:<32} {status:<8} {seconds:>8.2f}s")
+    failed = [name for name, (status, _) in results.items() if status not in ("ok", "cached")]
+    print("\nETL pipeline execution completed." if not failed else f"\nETL pipeline finished with {len(failed)} incomplete step(s).")
+    return 1 if failed else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
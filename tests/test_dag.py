@@ -0,0 +1,46 @@
+import functools
+import os
+
+from etl.dag import Task, execution_order, run_dag
+
+
+# Task functions run in worker processes: module-level so they pickle
+def copy_file(source, target):
+    with open(source) as f, open(target, 'w') as out:
+        out.write(f.read())
+
+
+def write_file(target):
+    with open(target, 'w') as f:
+        f.write('done')
+
+
+def fail():
+    raise RuntimeError('boom')
+
+
+def task(name, func, inputs=(), outputs=()):
+    return Task(name, f"Running {name}...", func, f"Error in {name}", list(inputs), list(outputs))
+
+
+def statuses(results):
+    return {name: status for name, (status, _) in results.items()}
+
+
+def test_order_follows_inputs_and_outputs():
+    tasks = [task('charts', fail, ['cube.csv'], ['charts']), task('rollup', fail, ['clean.csv'], ['cube.csv']),
+             task('clean', fail, ['raw.csv'], ['clean.csv']), task('metrics', fail, ['raw_fb'], ['metrics.csv'])]
+    assert execution_order(tasks) == ['clean', 'metrics', 'rollup', 'charts']
+
+
+def test_failure_skips_only_downstream_tasks(tmp_path):
+    failed, downstream, further, independent = (str(tmp_path / f'{n}.csv') for n in ('a', 'b', 'c', 'd'))
+    tasks = [
+        task('a', fail, outputs=[failed]),
+        task('b', functools.partial(copy_file, failed, downstream), [failed], [downstream]),
+        task('c', functools.partial(copy_file, downstream, further), [downstream], [further]),
+        task('d', functools.partial(write_file, independent), outputs=[independent]),
+    ]
+    results = run_dag(tasks, max_workers=2)
+    assert statuses(results) == {'a': 'failed', 'b': 'skipped', 'c': 'skipped', 'd': 'ok'}
+    assert os.path.exists(independent)
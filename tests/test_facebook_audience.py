@@ -0,0 +1,46 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from etl.etl_facebook_audience import (AGE_GENDER_WEIGHTS, AGE_RANGES, COUNTRIES, GENDERS, allocate, audience_weights,
+                                       default_weights)
+
+AUDIENCE = os.path.join(os.path.dirname(__file__), '..', 'data', 'raw', 'facebook', 'Audience.csv')
+
+
+def legacy_followers(total_follows):
+    # Former per-row loop: max(1, round(follows * weight / total weight)) per gender x age x country
+    total_weight = sum(AGE_GENDER_WEIGHTS.values()) * len(COUNTRIES)
+    return [max(1, round(total_follows * AGE_GENDER_WEIGHTS[(gender, age)] / total_weight))
+            for gender in GENDERS for age in AGE_RANGES for _ in COUNTRIES]
+
+
+def test_default_allocation_matches_the_per_row_loop():
+    follows = np.array([1, 7, 240, 3000])
+    dates = ['01/01/2025', '01/02/2025', '01/03/2025', '01/04/2025']
+    audience = allocate(dates, follows, *default_weights())
+
+    segments = len(GENDERS) * len(AGE_RANGES) * len(COUNTRIES)
+    assert len(audience) == len(dates) * segments
+    expected = [count for total in follows for count in legacy_followers(int(total))]
+    assert audience['followers'].tolist() == expected
+    totals = audience.groupby('date', observed=True)['followers'].sum()
+    assert totals.tolist() == [sum(legacy_followers(int(total))) for total in follows]
+
+
+def test_daily_totals_follow_the_follows():
+    genders, ages, countries, weights = audience_weights(AUDIENCE)
+    assert countries[:2] == ['Tunisie', 'Algérie']
+    follows = np.array([10000, 250000])
+    audience = allocate(['01/01/2025', '01/02/2025'], follows, genders, ages, countries, weights)
+
+    # Each segment rounds by at most 1/2, plus the 1-follower floor of the smallest segments
+    totals = audience.groupby('date', observed=True)['followers'].sum().to_numpy()
+    assert np.abs(totals - follows).max() <= weights.size
+    # Segment shares follow the Audience.csv weights
+    day = audience[audience['date'] == '01/02/2025']
+    women = day.loc[day['gender'] == 'Female', 'followers'].sum() / day['followers'].sum()
+    assert women == pytest.approx(weights[genders.index('Female')].sum() / weights.sum(), abs=1e-3)
+    assert isinstance(audience['country'].dtype, pd.CategoricalDtype)
@@ -0,0 +1,74 @@
+import numpy as np
+import pandas as pd
+
+from etl import etl_facebook_content
+from etl.etl_facebook_content import content_mix, daily_values
+from etl.storage import read_table, write_table
+
+FORMATS = '''Published content,,,
+Photos,Links,Reels,
+130,3,7,
+,,,
+Content interactions,,,
+Stories,Photos,Links,
+15147,5734,222,
+,,,
+Facebook reach,,,
+Photos,Multi media,Others,
+9820,5,0,
+'''
+
+
+def test_daily_values_keep_type_totals():
+    day_weights = np.array([1, 45, 3, 1, 80, 2, 1], dtype=float)
+    totals = np.array([130, 3, 0, 1, 15147])
+    values = daily_values(day_weights, totals)
+    assert values.shape == (7, 5)
+    assert values.sum(axis=0).tolist() == totals.tolist()
+    assert values.min() >= 0
+    # The leftover units go to the heaviest days
+    assert values[:, 1].tolist() == [0, 1, 0, 0, 2, 0, 0]
+
+
+def test_process_keeps_top_content_formats_totals(tmp_path):
+    formats_path = tmp_path / 'Top content formats.csv'
+    formats_path.write_text(FORMATS)
+    follows_path = tmp_path / 'Follows_cleaned.csv'
+    pd.DataFrame({'Date': pd.date_range('2025-01-01', periods=40), 'Follows': np.arange(40) % 7}).to_csv(
+        follows_path, index=False)
+    output_path = tmp_path / 'Facebook_content_type_table.csv'
+    etl_facebook_content.process(str(follows_path), str(output_path), formats_path=str(formats_path))
+
+    table = read_table(str(output_path), categories=False)
+    sums = table.groupby('content_type')[etl_facebook_content.METRICS].sum()
+    content_types, totals = content_mix(str(formats_path))
+    for metric in etl_facebook_content.METRICS:
+        assert sums.loc[content_types, metric].tolist() == totals[metric].tolist()
+    # Types a section does not list get no invented counts
+    assert sums.loc['Others', 'published'] == 0
+    assert sums.loc['Multi media', 'interactions'] == 0
+
+
+def test_daily_totals_are_split_by_the_content_mix(tmp_path):
+    formats_path = tmp_path / 'Top content formats.csv'
+    formats_path.write_text(FORMATS)
+    follows_path = tmp_path / 'Follows_cleaned.csv'
+    dates = pd.date_range('2025-01-01', periods=3)
+    pd.DataFrame({'Date': dates, 'Follows': [0, 2, 1]}).to_csv(follows_path, index=False)
+    metrics_path = tmp_path / 'Facebook_metrics_table.csv'
+    write_table(pd.DataFrame({'date': dates.strftime('%m/%d/%Y'), 'interactions': pd.array([100, 0, None], dtype='Int64'),
+                              'reach': pd.array([7, 3, 1], dtype='Int64')}), str(metrics_path))
+    output_path = tmp_path / 'Facebook_content_type_table.csv'
+    etl_facebook_content.process(str(follows_path), str(output_path), formats_path=str(formats_path),
+                                 metrics_path=str(metrics_path))
+
+    table = read_table(str(output_path), categories=False).set_index('content_type')
+    first_day = table[pd.to_datetime(table['date']) == dates[0]]
+    # 100 interactions: Stories 15147, Photos 5734 and Links 222 of 21103
+    assert first_day.loc[['Stories', 'Photos', 'Links'], 'interactions'].tolist() == [72, 27, 1]
+    assert first_day.loc[['Photos', 'Multi media', 'Others'], 'reach'].tolist() == [7, 0, 0]
+    daily = table.groupby('date')[['interactions', 'reach']].sum(min_count=1)
+    assert daily['interactions'].isna().tolist() == [False, False, True]
+    assert daily['reach'].tolist() == [7, 3, 1]
+    # Published posts have no daily count: still a split of the period total
+    assert table.groupby(level=0)['published'].sum().loc[['Photos', 'Links', 'Reels']].tolist() == [130, 3, 7]
@@ -0,0 +1,35 @@
+import pandas as pd
+
+from etl.etl_facebook_metrics import KPI_COLUMNS, assemble_metrics
+
+
+def kpi_frame(kpi, dates, values):
+    return pd.DataFrame({kpi: values}, index=pd.DatetimeIndex(dates))
+
+
+def test_gaps_stay_empty():
+    reach = kpi_frame('reach', ['2025-01-01', '2025-01-02', '2025-01-03'], [10, 0, 7])
+    views = kpi_frame('views', ['2025-01-01', '2025-01-03'], [4, 5])
+    table = assemble_metrics([reach, views], None, None)
+
+    assert table['date'].tolist() == ['01/01/2025', '01/02/2025', '01/03/2025']
+    assert list(table.columns) == ['date'] + KPI_COLUMNS
+    # A real zero stays 0, a day missing from the views export is NA
+    assert table['reach'].tolist() == [10, 0, 7]
+    assert table['views'].isna().tolist() == [False, True, False]
+    # No export of a KPI: the whole column is NA, not 1
+    assert table['visits'].isna().all()
+    assert str(table['reach'].dtype) == 'Int64'
+
+
+def test_exports_of_one_kpi_are_summed():
+    first = kpi_frame('reach', ['2025-01-01', '2025-01-02'], [10, 2])
+    second = kpi_frame('reach', ['2025-01-02', '2025-01-03'], [3, 4])
+    table = assemble_metrics([first, second], None, None)
+    assert table['reach'].tolist() == [10, 5, 4]
+
+
+def test_period_clip():
+    reach = kpi_frame('reach', pd.date_range('2025-01-01', periods=10), range(10))
+    table = assemble_metrics([reach], '2025-01-03', '2025-01-05')
+    assert table['reach'].tolist() == [2, 3, 4]
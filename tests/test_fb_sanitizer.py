@@ -0,0 +1,79 @@
+import re
+from io import StringIO
+
+import pandas as pd
+import pytest
+
+from etl.utils import LineStream, clean_csv_file, detect_date_format, parse_fb_date, parse_fb_dates, sanitize_fb_lines
+
+# Facebook export quirks: BOM, sep= and title lines, smart quotes, tabs, pop-direction marks, blank lines
+EXPORT = (
+    '\ufeffsep=,\n'
+    'Facebook Page reach\n'
+    'Date,Primary\n'
+    '2025-01-01T00:00:00,1\u202c200\n'
+    '\n'
+    '“2025-01-02T00:00:00”,35\n'
+    '2025-01-03T00:00:00\t\t41\n'
+    '"2025-01-04T00:00:00" , "7"\n'
+)
+
+
+def legacy_clean(path):
+    # Former clean_csv_file: whole-file regex passes, then the python parser
+    with open(path, 'r', encoding='utf-8-sig', errors='ignore') as f:
+        lines = f.readlines()
+    clean_lines = [re.sub(r'[“”]', '"', line) for line in lines
+                   if not line.lower().startswith(('sep=', '��sep=', 'facebook')) and line.strip()]
+    cleaned = ''.join(clean_lines).replace('\u202c', '').replace('\ufeff', '')
+    cleaned = re.sub(r'"+\s*,\s*"+', ',', cleaned)
+    cleaned = re.sub(r'\t+', ',', cleaned)
+    df = pd.read_csv(StringIO(cleaned), engine='python', on_bad_lines='skip')
+    df.columns = [col.strip().lower().replace(' ', '_').replace('"', '') for col in df.columns]
+    return df
+
+
+@pytest.fixture
+def export(tmp_path):
+    path = tmp_path / 'reach.csv'
+    path.write_text(EXPORT, encoding='utf-8')
+    return str(path)
+
+
+def test_sanitized_export_matches_the_regex_cleanup(export):
+    df = clean_csv_file(export)
+    pd.testing.assert_frame_equal(df, legacy_clean(export))
+    # A fully quoted line collapses into one field, as it did before
+    assert df['date'].tolist() == [f'2025-01-0{day}T00:00:00' for day in range(1, 4)] + ['2025-01-04T00:00:00,7']
+    assert df['primary'].tolist()[:3] == [1200, 35, 41]
+
+
+def test_sanitize_fb_lines():
+    # As read through utf-8-sig: the leading BOM is already decoded away
+    lines = list(sanitize_fb_lines(StringIO(EXPORT[1:])))
+    assert lines == ['Date,Primary\n', '2025-01-01T00:00:00,1200\n', '"2025-01-02T00:00:00",35\n',
+                     '2025-01-03T00:00:00,41\n', '"2025-01-04T00:00:00,7"\n']
+
+
+@pytest.mark.parametrize('size', [1, 7, 1 << 16])
+def test_line_stream_reads_every_character_once(size):
+    lines = ['a,b\n', '1,2\n', '3,4\n']
+    stream = LineStream(lines)
+    parts = iter(lambda: stream.read(size), '')
+    assert ''.join(parts) == ''.join(lines)
+    assert pd.read_csv(LineStream(lines))['b'].tolist() == [2, 4]
+
+
+def test_detect_date_format():
+    assert detect_date_format(pd.Series(['2025-01-13T00:00:00', None])) == '%Y-%m-%dT%H:%M:%S'
+    assert detect_date_format(pd.Series(['01/13/2025', '02/01/2025'])) == '%m/%d/%Y'
+    # 13/01 rules out month-first: day-first fits the whole sample
+    assert detect_date_format(pd.Series(['02/01/2025', '13/01/2025'])) == '%d/%m/%Y'
+    assert detect_date_format(pd.Series(['2025-01-13', 'Jan 14, 2025'])) is None
+    assert detect_date_format(pd.Series([None], dtype=object)) is None
+
+
+def test_parse_fb_dates_matches_per_value_parse():
+    values = pd.Series(['2025-01-13', '2025-01-14', '01/15/2025', None])
+    expected = values.map(parse_fb_date)
+    pd.testing.assert_series_equal(parse_fb_dates(values), pd.to_datetime(expected), check_dtype=False)
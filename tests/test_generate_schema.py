@@ -0,0 +1,67 @@
+import pandas as pd
+import pytest
+
+from etl import etl_generate_schema as schema
+from etl.storage import table_exists, write_table
+
+GRAINS = {
+    'Fact_Facebook_Daily': ['property_id', 'date_id'],
+    'Fact_Facebook_Content': ['property_id', 'date_id', 'content_type_id'],
+    'Fact_Facebook_Audience': ['property_id', 'date_id', 'audience_id'],
+}
+
+
+@pytest.fixture
+def output(tmp_path, monkeypatch):
+    monkeypatch.setattr(schema, 'OUTPUT', str(tmp_path))
+    return tmp_path
+
+
+def write(output, name, rows):
+    write_table(pd.DataFrame(rows), str(output / name))
+
+
+def write_facebook(output, metrics_dates=('2025-01-01', '2025-01-02')):
+    # Two properties sharing dates, content types and audience segments
+    write(output, 'Facebook_metrics_table.csv', {
+        'property_id': ['a'] * len(metrics_dates) + ['b'],
+        'date': [*metrics_dates, '2025-01-01'],
+        'reach': range(len(metrics_dates) + 1), 'views': 1, 'interactions': 2, 'link_clicks': 0, 'visits': 3, 'follows': 1,
+    })
+    write(output, 'Facebook_content_type_table.csv', {
+        'property_id': ['a', 'a', 'a', 'b'], 'date': ['2025-01-01', '2025-01-01', '2025-01-02', '2025-01-01'],
+        'content_type': ['Photo', 'Video', 'Photo', 'Photo'], 'published': 1, 'interactions': 2, 'reach': 3,
+    })
+    write(output, 'Facebook_Audience_details.csv', {
+        'property_id': ['a', 'a', 'b', 'b'], 'date': ['2025-01-01', '2025-01-01', '2025-01-01', '2025-01-02'],
+        'gender': ['F', 'M', 'F', 'F'], 'age_range': ['25-34'] * 4, 'country': ['TN', 'TN', 'FR', 'FR'],
+        'followers': [10, 12, 4, 5],
+    })
+
+
+def generate(output):
+    return schema.generate_fact_facebook(schema.generate_dim_date(), schema.generate_dim_content_type(),
+                                         schema.generate_dim_audience())
+
+
+def test_facebook_facts_have_one_row_per_grain_key(output):
+    write_facebook(output)
+    daily, content, audience = generate(output)
+    sources = {'Fact_Facebook_Daily': 3, 'Fact_Facebook_Content': 4, 'Fact_Facebook_Audience': 4}
+    for (name, key), fact in zip(GRAINS.items(), (daily, content, audience)):
+        assert len(fact) == sources[name]
+        assert not fact.duplicated(subset=key).any()
+        assert fact[key].notna().all(axis=None)
+        assert table_exists(str(output / f'{name}.csv'))
+
+
+def test_duplicate_grain_key_raises(output):
+    write_facebook(output, metrics_dates=('2025-01-01', '2025-01-01'))
+    with pytest.raises(ValueError, match=r"Fact_Facebook_Daily: 1 duplicate rows for grain \['property_id', 'date_id'\]"):
+        generate(output)
+
+
+def test_fanned_out_join_raises():
+    source = pd.DataFrame({'date_id': [1, 2]})
+    with pytest.raises(ValueError, match='3 rows for 2 source rows'):
+        schema.check_grain(pd.DataFrame({'date_id': [1, 2, 2]}), source, 'Fact_Facebook_Daily')
@@ -0,0 +1,99 @@
+import pandas as pd
+import pytest
+
+from etl import etl_reviews
+from etl.storage import read_table
+from etl.watermark import forget_missing, select_delta, update_watermark
+
+COLUMNS = ['id', 'text', 'rating', 'publishedDate', 'location']
+
+
+@pytest.fixture
+def workspace(tmp_path, monkeypatch):
+    # Caches and state under output/ of the test's own folder, offline translation
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setenv('TRANSLATION_BACKEND', 'offline')
+    (tmp_path / 'raw').mkdir()
+    return tmp_path
+
+
+def write_export(workspace, platform, rows):
+    pd.DataFrame(rows, columns=COLUMNS).to_csv(workspace / 'raw' / f'{platform}.csv', index=False)
+
+
+def run(workspace, name, incremental):
+    # One output folder per run name, as the partitions have
+    output_path = str(workspace / 'output' / name / 'Scrapped_reviews_cleaned.csv')
+    etl_reviews.process(str(workspace / 'raw'), output_path, incremental=incremental,
+                        state_path=str(workspace / 'output' / name / '.state' / 'reviews_watermark.json'))
+    return read_table(output_path, categories=False)
+
+
+TRIPADVISOR = [
+    (101, 'Great stay', 5, '2025-01-03', 'France'),
+    (102, 'Noisy room', 2, '2025-01-05', 'Tunisia'),
+    (103, 'Lovely staff', 4, '2025-01-08', 'Italy'),
+]
+GOOGLE = [
+    ('g-1', 'Nice pool', 4, '2025-01-02', None),
+    ('g-2', 'Bad food', 1, '2025-01-04', None),
+]
+BOOKING = [
+    ('b-1', 'Clean', 9, '2025-01-06', 'Spain'),
+]
+
+
+def test_second_incremental_run_equals_full_rebuild(workspace):
+    write_export(workspace, 'tripadvisor', TRIPADVISOR)
+    write_export(workspace, 'google', GOOGLE)
+    write_export(workspace, 'booking', BOOKING)
+    first = run(workspace, 'incremental', incremental=True)
+    assert len(first) == 6
+
+    # 102 edited, 103 deleted, 104 added mid-file with an old date, g-3 added, the booking export gone
+    write_export(workspace, 'tripadvisor', [
+        TRIPADVISOR[0],
+        (104, 'Quiet and calm', 5, '2024-12-30', 'Germany'),
+        (102, 'Noisy room, changed after a week', 3, '2025-01-05', 'Tunisia'),
+    ])
+    write_export(workspace, 'google', GOOGLE + [('g-3', 'Loved it', 5, '2025-01-09', None)])
+    (workspace / 'raw' / 'booking.csv').unlink()
+
+    second = run(workspace, 'incremental', incremental=True)
+    rebuilt = run(workspace, 'full', incremental=False)
+    # Same rows and values; existing rows come back as Arrow strings of another width
+    pd.testing.assert_frame_equal(second, rebuilt, check_dtype=False)
+    assert second['id'].tolist() == ['101', '104', '102', 'g-1', 'g-2', 'g-3']
+    assert second.loc[second['id'] == '102', 'review_text'].item() == 'Noisy room, changed after a week'
+
+
+def test_unchanged_exports_select_nothing(workspace, capsys):
+    write_export(workspace, 'tripadvisor', TRIPADVISOR)
+    first = run(workspace, 'reviews', incremental=True)
+    capsys.readouterr()
+    second = run(workspace, 'reviews', incremental=True)
+    assert 'tripadvisor: 0 new or changed of 3 rows' in capsys.readouterr().out
+    pd.testing.assert_frame_equal(first, second)
+
+
+def test_select_delta():
+    state = {}
+    ids = pd.Series(['1', '2', '3'])
+    dates = pd.to_datetime(pd.Series(['2025-01-01', '2025-01-02', '2025-01-03']))
+    fingerprints = pd.Series(['a', 'b', 'c'])
+    assert select_delta(ids, dates, fingerprints, state).all()
+    update_watermark(state, ids, dates, fingerprints)
+    assert state['latest_date'] == '2025-01-03T00:00:00'
+
+    # Unchanged rows are skipped; a changed fingerprint and a new id are selected
+    changed = pd.Series(['a', 'B', 'c'])
+    assert select_delta(ids, dates, changed, state).tolist() == [False, True, False]
+    new = pd.Series(['4'])
+    assert select_delta(new, pd.to_datetime(pd.Series(['2024-01-01'])), pd.Series(['d']), state).tolist() == [True]
+
+
+def test_forget_missing_reprocesses_reuploads():
+    state = {'seen': {'1': 'a', '2': 'b'}}
+    forget_missing(state, ['1'])
+    assert state['seen'] == {'1': 'a'}
+    assert select_delta(pd.Series(['2']), pd.Series([pd.NaT]), pd.Series(['b']), state).tolist() == [True]
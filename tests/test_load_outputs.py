@@ -0,0 +1,76 @@
+import mongomock
+import pandas as pd
+import pytest
+
+import load_clean_outputs_to_mongo
+from load_clean_outputs_to_mongo import OUTPUT_COLLECTION_PREFIX, upsert_csv_to_output_collection
+
+REVIEWS = 'Scrapped_reviews_cleaned.csv'
+
+
+@pytest.fixture
+def db():
+    return mongomock.MongoClient()['PFE']
+
+
+@pytest.fixture
+def output(tmp_path, monkeypatch):
+    monkeypatch.setattr(load_clean_outputs_to_mongo, 'OUTPUT_FOLDER', str(tmp_path))
+    return tmp_path
+
+
+def write_reviews(output, rows):
+    pd.DataFrame(rows, columns=['property_id', 'platform', 'id', 'date', 'rating']).to_csv(output / REVIEWS, index=False)
+
+
+def load(db, chunk_size):
+    return upsert_csv_to_output_collection(db, REVIEWS, ['date'], chunk_size=chunk_size)
+
+
+def test_upsert_counts_over_two_loads(db, output):
+    # All-numeric Tripadvisor ids in the first chunk, text ids in the next; a rating gap makes one chunk float
+    rows = [
+        ('default', 'tripadvisor', '101', '2025-01-01', 5),
+        ('default', 'tripadvisor', '102', '2025-01-02', 4),
+        ('default', 'booking', 'b-7', '2025-01-03', None),
+        ('default', 'booking', 'b-8', '2025-01-04', 3),
+        ('default', 'google', 'g-1', '2025-01-05', 2),
+    ]
+    write_reviews(output, rows)
+    assert load(db, chunk_size=2) == {'inserted': 5, 'updated': 0, 'unchanged': 0, 'deleted': 0}
+
+    # Same rows under other chunk boundaries: nothing is written
+    assert load(db, chunk_size=3) == {'inserted': 0, 'updated': 0, 'unchanged': 5, 'deleted': 0}
+
+    edited = rows[:1] + [('default', 'tripadvisor', '102', '2025-01-02', 1)] + rows[2:4]
+    edited.append(('default', 'google', 'g-2', '2025-01-06', 5))
+    write_reviews(output, edited)
+    assert load(db, chunk_size=2) == {'inserted': 1, 'updated': 1, 'unchanged': 3, 'deleted': 1}
+
+    collection = db[OUTPUT_COLLECTION_PREFIX + 'Scrapped_reviews_cleaned']
+    assert collection.count_documents({}) == 5
+    assert sorted(doc['id'] for doc in collection.find()) == ['101', '102', 'b-7', 'b-8', 'g-2']
+    assert collection.find_one({'id': '102'})['rating'] == 1
+
+
+def test_row_hash_ignores_int_float_spelling():
+    assert load_clean_outputs_to_mongo.row_hash({'id': '1', 'rating': 5}) == \
+        load_clean_outputs_to_mongo.row_hash({'id': '1', 'rating': 5.0})
+    assert load_clean_outputs_to_mongo.row_hash({'id': '1', 'rating': 5}) != \
+        load_clean_outputs_to_mongo.row_hash({'id': '1', 'rating': 4})
+
+
+def test_repeated_natural_key_fails_the_load(db, output):
+    subratings = pd.DataFrame({
+        'property_id': ['default'] * 3, 'review_id': ['101', '101', '102'], 'reviewer_name': 'A',
+        'Date': ['2025-01-01'] * 3, 'subrating_name': ['Service', 'Service', 'Rooms'], 'subrating_value': [3, 4, 5],
+    })
+    subratings.to_csv(output / 'Subratings_reviews.csv', index=False)
+    with pytest.raises(ValueError, match=r"1 rows repeat a natural key \['property_id', 'review_id', 'subrating_name'\]"):
+        upsert_csv_to_output_collection(db, 'Subratings_reviews.csv', ['Date'])
+    assert db[OUTPUT_COLLECTION_PREFIX + 'Subratings_reviews'].count_documents({}) == 0
+
+    # Across chunks as well: the first chunk is written, the repeat is not
+    with pytest.raises(ValueError):
+        upsert_csv_to_output_collection(db, 'Subratings_reviews.csv', ['Date'], chunk_size=1)
+    assert db[OUTPUT_COLLECTION_PREFIX + 'Subratings_reviews'].find_one({'review_id': '101'})['subrating_value'] == 3
@@ -0,0 +1,145 @@
+import mongomock
+import pandas as pd
+import pytest
+
+import load_schema_to_mongo
+from load_schema_to_mongo import PREVIOUS_SUFFIX, STAGING_SUFFIX, load_schema, load_star_schema, rollback, rollback_candidates
+
+
+@pytest.fixture
+def db():
+    return mongomock.MongoClient()['PFE']
+
+
+@pytest.fixture
+def output(tmp_path, monkeypatch):
+    monkeypatch.setattr(load_schema_to_mongo, 'OUTPUT', str(tmp_path))
+    monkeypatch.setattr(load_schema_to_mongo, 'CHARTS_DIR', str(tmp_path / 'charts'))
+    return tmp_path
+
+
+def write_dim_date(output, dates, property_id='default'):
+    pd.DataFrame({'property_id': property_id, 'date_id': range(1, len(dates) + 1), 'date': dates}).to_csv(
+        output / 'Dim_Date.csv', index=False)
+
+
+def dates_of(collection, **query):
+    return sorted(doc['date'] for doc in collection.find(query))
+
+
+def test_swap_keeps_previous_generation(db, output):
+    write_dim_date(output, ['2025-01-01'])
+    load_star_schema(db)
+    write_dim_date(output, ['2025-01-01', '2025-01-02'])
+    load_star_schema(db)
+
+    assert dates_of(db['Dim_Date']) == ['2025-01-01', '2025-01-02']
+    assert dates_of(db['Dim_Date' + PREVIOUS_SUFFIX]) == ['2025-01-01']
+    assert 'Dim_Date' + STAGING_SUFFIX not in db.list_collection_names()
+    assert rollback_candidates(db) == ['Dim_Date']
+
+
+def test_swap_builds_manifest_indexes(db, output):
+    write_dim_date(output, ['2025-01-01'])
+    load_star_schema(db)
+    indexed = {tuple(info['key']) for info in db['Dim_Date'].index_information().values()}
+    assert {(('property_id', 1), ('date_id', 1)), (('property_id', 1), ('date', 1))} <= indexed
+
+
+def test_swap_drops_indexes_the_manifest_replaced(db, output):
+    # Indexes of the former manifest, before ids were numbered per property
+    write_dim_date(output, ['2025-01-01'])
+    load_star_schema(db)
+    db['Dim_Date'].create_index([('date_id', 1)])
+    db['Dim_Date'].create_index([('property_id', 1)])
+    db['Dim_Date'].create_index([('day', 1)])
+    load_star_schema(db)
+
+    indexed = {tuple(info['key']) for info in db['Dim_Date'].index_information().values()}
+    assert (('date_id', 1),) not in indexed and (('property_id', 1),) not in indexed
+    # Indexes the manifest does not know about are kept
+    assert (('day', 1),) in indexed
+
+
+def test_rollback_restores_previous_generation(db, output):
+    write_dim_date(output, ['2025-01-01'])
+    load_star_schema(db)
+    write_dim_date(output, ['2025-02-01'])
+    load_star_schema(db)
+
+    assert rollback(db, 'Dim_Date')
+    assert dates_of(db['Dim_Date']) == ['2025-01-01']
+    assert rollback_candidates(db) == []
+    assert not rollback(db, 'Dim_Date')
+
+
+def test_failed_load_leaves_live_collection(db, output, monkeypatch):
+    write_dim_date(output, ['2025-01-01'])
+    load_star_schema(db)
+
+    def fail(collection, df, chunk_size=10000):
+        raise RuntimeError('insert failed')
+    monkeypatch.setattr(load_schema_to_mongo, 'chunked_insert', fail)
+    write_dim_date(output, ['2025-03-01'])
+    load_star_schema(db)
+
+    assert dates_of(db['Dim_Date']) == ['2025-01-01']
+    assert 'Dim_Date' + STAGING_SUFFIX not in db.list_collection_names()
+
+
+def test_property_refresh_keeps_other_partitions(db, output):
+    pd.concat([
+        pd.DataFrame({'property_id': 'a', 'date_id': [1], 'date': ['2025-01-01']}),
+        pd.DataFrame({'property_id': 'b', 'date_id': [1], 'date': ['2025-01-01']}),
+    ]).to_csv(output / 'Dim_Date.csv', index=False)
+    load_star_schema(db)
+    pd.concat([
+        pd.DataFrame({'property_id': 'a', 'date_id': [1, 2], 'date': ['2025-01-01', '2025-01-02']}),
+        pd.DataFrame({'property_id': 'b', 'date_id': [1], 'date': ['2025-09-09']}),
+    ]).to_csv(output / 'Dim_Date.csv', index=False)
+    load_star_schema(db, properties=['a'])
+
+    assert dates_of(db['Dim_Date'], property_id='a') == ['2025-01-01', '2025-01-02']
+    assert dates_of(db['Dim_Date'], property_id='b') == ['2025-01-01']
+    # Swapped in like a full load: the previous generation is kept and no staging copy is left
+    assert dates_of(db['Dim_Date' + PREVIOUS_SUFFIX], property_id='a') == ['2025-01-01']
+    assert 'Dim_Date' + STAGING_SUFFIX not in db.list_collection_names()
+
+
+def test_property_refresh_replaces_unpartitioned_documents(db, output):
+    db['Dim_Date'].insert_one({'date_id': 1, 'date': '2024-12-31'})
+    write_dim_date(output, ['2025-01-01'], property_id='a')
+    load_star_schema(db, properties=['a'])
+    assert dates_of(db['Dim_Date']) == ['2025-01-01']
+
+
+def test_failed_property_refresh_leaves_live_collection(db, output, monkeypatch):
+    write_dim_date(output, ['2025-01-01'], property_id='a')
+    load_star_schema(db)
+
+    def fail(collection, df, chunk_size=10000):
+        raise RuntimeError('insert failed')
+    monkeypatch.setattr(load_schema_to_mongo, 'chunked_insert', fail)
+    write_dim_date(output, ['2025-03-01'], property_id='a')
+    load_star_schema(db, properties=['a'])
+
+    assert dates_of(db['Dim_Date']) == ['2025-01-01']
+    assert 'Dim_Date' + STAGING_SUFFIX not in db.list_collection_names()
+
+
+def test_retired_collections_are_dropped(db, output):
+    for name in ('Fact_Facebook', 'Fact_Facebook' + PREVIOUS_SUFFIX):
+        db[name].insert_one({'date_id': 1})
+    (output / 'Fact_Facebook.csv').write_text('property_id,date_id\ndefault,1\n')
+    load_star_schema(db)
+    assert not [name for name in db.list_collection_names() if name.startswith('Fact_Facebook')]
+
+
+def test_load_schema_loads_charts_and_tables(db, output):
+    (output / 'charts').mkdir()
+    pd.DataFrame({'Year': [2025], 'value': [3]}).to_csv(output / 'charts' / 'chart_scr_card_1.csv', index=False)
+    write_dim_date(output, ['2025-01-01'])
+    load_schema(db)
+
+    assert db['Charts'].find_one({'chart_id': 'scr_card_1'})['value'] == 3
+    assert dates_of(db['Dim_Date']) == ['2025-01-01']
@@ -0,0 +1,100 @@
+import mongomock
+import pytest
+
+from etl import mongo_indexes
+from etl.mongo_indexes import INDEX_MANIFEST, assert_queries_use_indexes, check_query_plans, ensure_indexes
+
+COLLSCAN = {'queryPlanner': {'winningPlan': {'stage': 'COLLSCAN'}}}
+IXSCAN = {'queryPlanner': {'winningPlan': {'stage': 'FETCH', 'inputStage': {'stage': 'IXSCAN'}}}}
+
+
+class ExplainedCursor:
+    def __init__(self, plan):
+        self.plan = plan
+
+    def explain(self):
+        return self.plan
+
+
+class ExplainedCollection:
+    # Stands in for a server collection: mongomock cannot explain
+    def __init__(self, plan):
+        self.plan = plan
+
+    def find(self, query):
+        return ExplainedCursor(self.plan)
+
+
+class ExplainedDb(dict):
+    def list_collection_names(self):
+        return list(self)
+
+
+@pytest.fixture
+def db():
+    return mongomock.MongoClient()['PFE']
+
+
+def index_keys(collection):
+    return {tuple(info['key']) for info in collection.index_information().values()}
+
+
+@pytest.mark.parametrize('name', sorted(INDEX_MANIFEST))
+def test_ensure_indexes_provisions_manifest(db, name):
+    ensure_indexes(db[name])
+    assert {tuple(keys) for keys in INDEX_MANIFEST[name]} <= index_keys(db[name])
+
+
+def test_ensure_indexes_is_idempotent(db):
+    ensure_indexes(db['Fact_Reviews'])
+    ensure_indexes(db['Fact_Reviews'])
+    assert len(db['Fact_Reviews'].index_information()) == len(INDEX_MANIFEST['Fact_Reviews']) + 1
+
+
+def test_ensure_indexes_keeps_unique_natural_key(db):
+    # A loader's unique key on the same fields takes the default name (Date_1) the manifest index would get
+    follows = db['output.Follows_cleaned']
+    follows.create_index([('Date', 1)], unique=True)
+    ensure_indexes(follows)
+    assert follows.index_information()['Date_1']['unique']
+    assert {tuple(keys) for keys in INDEX_MANIFEST['output.Follows_cleaned']} <= index_keys(follows)
+
+
+def test_ensure_indexes_for_staging_copy(db):
+    staging = db['Dim_Date__staging']
+    ensure_indexes(staging, 'Dim_Date')
+    assert {tuple(keys) for keys in INDEX_MANIFEST['Dim_Date']} <= index_keys(staging)
+
+
+def test_uses_index_walks_nested_plans():
+    assert mongo_indexes.uses_index(IXSCAN)
+    assert not mongo_indexes.uses_index(COLLSCAN)
+
+
+def test_collection_scan_is_detected():
+    db = ExplainedDb({'Dim_Date': ExplainedCollection(COLLSCAN), 'Fact_Reviews': ExplainedCollection(IXSCAN)})
+    queries = [('Dim_Date', {'date': 1}), ('Fact_Reviews', {'date_id': 1}), ('Charts', {'chart_id': 'x'})]
+    assert check_query_plans(db, queries) == [
+        ('Dim_Date', {'date': 1}, False), ('Fact_Reviews', {'date_id': 1}, True), ('Charts', {'chart_id': 'x'}, None)]
+    with pytest.raises(AssertionError, match='Dim_Date'):
+        assert_queries_use_indexes(db, queries)
+
+
+def test_indexed_queries_pass():
+    db = ExplainedDb({'Fact_Reviews': ExplainedCollection(IXSCAN)})
+    assert_queries_use_indexes(db, [('Fact_Reviews', {'date_id': 1})])
+
+
+def test_unexplainable_server_is_not_checked(db):
+    db['Dim_Date'].insert_one({'date_id': 1})
+    assert check_query_plans(db, [('Dim_Date', {'date_id': 1})]) == [('Dim_Date', {'date_id': 1}, None)]
+
+
+def test_fact_and_dimension_lookups_are_per_property():
+    # Their ids are numbered within each property
+    for name, indexes in INDEX_MANIFEST.items():
+        if name.startswith(('Fact_', 'Dim_')):
+            assert all(keys[0] == ('property_id', 1) for keys in indexes), name
+    for name, query in mongo_indexes.DASHBOARD_QUERIES:
+        if name.startswith(('Fact_', 'Dim_')):
+            assert 'property_id' in query, (name, query)
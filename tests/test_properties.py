@@ -0,0 +1,37 @@
+import pandas as pd
+
+from etl.properties import DEFAULT_PROPERTY, combine_partitions, discover_properties, partition_path, property_filter
+from etl.storage import read_table, table_exists, write_table
+
+
+def test_combine_partitions_adds_the_property_column(tmp_path):
+    path = str(tmp_path / 'Scrapped_reviews_cleaned.csv')
+    write_table(pd.DataFrame({'id': ['001', '002'], 'platform': ['Google', 'Booking'], 'rating': [8, 6]}),
+                partition_path(path, 'hotel_a'))
+    write_table(pd.DataFrame({'id': ['001'], 'platform': ['Google'], 'rating': [9]}), partition_path(path, 'hotel_b'))
+
+    # hotel_c has no partition of this table (e.g. no export): it is left out
+    combined = combine_partitions(path, ['hotel_a', 'hotel_b', 'hotel_c'])
+    assert table_exists(path)
+    stored = read_table(path, categories=False)
+    for df in (combined, stored):
+        assert list(df.columns) == ['property_id', 'id', 'platform', 'rating']
+        assert df['property_id'].tolist() == ['hotel_a', 'hotel_a', 'hotel_b']
+        # The same review id in two properties stays two rows, ids stay text
+        assert df['id'].tolist() == ['001', '002', '001']
+        assert df['rating'].tolist() == [8, 6, 9]
+
+
+def test_no_partition_writes_nothing(tmp_path):
+    path = str(tmp_path / 'Follows_cleaned.csv')
+    assert combine_partitions(path, ['hotel_a']) is None
+    assert not table_exists(path)
+
+
+def test_discover_properties(tmp_path):
+    assert discover_properties(str(tmp_path)) == {DEFAULT_PROPERTY: str(tmp_path)}
+    for name in ('hotel_b', 'hotel_a', '.hidden'):
+        (tmp_path / 'properties' / name).mkdir(parents=True)
+    assert list(discover_properties(str(tmp_path))) == ['hotel_a', 'hotel_b']
+    assert property_filter(['hotel_a']) == {'property_id': {'$in': ['hotel_a']}}
+    assert property_filter(None) == {}
@@ -0,0 +1,60 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from etl import ratings
+from etl.utils import normalize_score
+
+LABELS = ['Positive', 'Neutral', 'Negative', 'positive', 'NEGATIVE', 'Mixed', None, np.nan]
+EDGE_SCORES = [0, 0.05, 0.15, 0.25, 0.35, 0.45, 2.25, 4.35, 9.95, -0.35, 1e-9, 1e15, ' 4 ', '3.5', '1e1',
+               'inf', '-inf', 'abc', '', None, np.nan, True, False]
+SCALES = sorted(set(ratings.PLATFORM_SCALES.values()))
+
+
+def intended_rating(sent):
+    return ratings.SENTIMENT_RATINGS.get(str(sent).lower(), ratings.UNKNOWN_SENTIMENT_RATING)
+
+
+def random_scores(rows, rng):
+    # Two-decimal values sit on and around the half steps that round() has to break
+    values = rng.integers(-1000, 1001, rows) / 100
+    scores = pd.Series(values, dtype=object)
+    as_text = rng.random(rows) < 0.2
+    scores[as_text] = [f'{v:.2f}' for v in values[as_text]]
+    scores[rng.random(rows) < 0.05] = None
+    return pd.concat([scores, pd.Series(EDGE_SCORES, dtype=object)], ignore_index=True)
+
+
+@pytest.fixture
+def rng():
+    return np.random.default_rng(42)
+
+
+@pytest.mark.parametrize('scale', SCALES)
+def test_normalize_scores_matches_scalar_rule(scale, rng):
+    scores = random_scores(20_000, rng)
+    expected = pd.Series([normalize_score(x, scale) for x in scores], dtype=float)
+    pd.testing.assert_series_equal(ratings.normalize_scores(scores, scale), expected)
+
+
+def test_ratings_from_sentiment_ignores_case(rng):
+    labels = pd.Series(rng.choice(np.array(LABELS, dtype=object), 5_000))
+    expected = labels.apply(intended_rating)
+    assert (ratings.ratings_from_sentiment(labels) == expected).all()
+
+
+@pytest.mark.parametrize('source_type', list(ratings.PLATFORM_SCALES) + ['unknown'])
+def test_review_ratings_falls_back_to_sentiment(source_type, rng):
+    rows = 5_000
+    numeric = pd.Series(rng.integers(0, 1001, rows) / 100, dtype=object)
+    numeric[rng.random(rows) < 0.3] = None
+    labels = pd.Series(rng.choice(np.array(LABELS, dtype=object), rows))
+    scale = ratings.platform_scale(source_type)
+    expected = pd.Series([normalize_score(x, scale) for x in numeric], dtype=float)
+    expected = expected.fillna(labels.apply(intended_rating)).astype(int)
+    assert (ratings.review_ratings(numeric, source_type, labels) == expected).all()
+
+
+def test_review_ratings_without_rating_column():
+    labels = pd.Series(['Positive', 'Negative', None])
+    assert ratings.review_ratings(None, 'booking', labels).tolist() == [9, 3, 5]
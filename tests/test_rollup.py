@@ -0,0 +1,109 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from etl import etl_rollup
+from etl.chart_compiler import resolve_specs, run_specs
+from etl.chart_specs import CHART_SPECS
+
+SPECS = {spec['chart_id']: spec for spec in CHART_SPECS}
+
+
+@pytest.fixture
+def reviews():
+    rng = np.random.default_rng(7)
+    rows = 400
+    ratings = rng.integers(1, 11, rows).astype(float)
+    ratings[rng.random(rows) < 0.1] = np.nan
+    return pd.DataFrame({
+        'property_id': rng.choice(['a', 'b'], rows),
+        'date': pd.Timestamp('2023-11-01') + pd.to_timedelta(rng.integers(0, 600, rows), unit='D'),
+        'platform': rng.choice(['Booking', 'Google'], rows),
+        'sentiment': rng.choice(['Positive', 'Negative', 'Neutral'], rows),
+        'country': rng.choice(['France', 'Tunisia', 'Unknown'], rows),
+        'stay_type': rng.choice(['Couple', 'Family'], rows),
+        'normalized_rating': ratings,
+    })
+
+
+@pytest.fixture
+def cube(reviews):
+    return etl_rollup.build_cube({'reviews': reviews})
+
+
+def charts(specs, cube):
+    saved = {}
+    run_specs(specs, cube, lambda df, chart_id, chart_type: saved.__setitem__(chart_id, df))
+    return saved
+
+
+@pytest.mark.parametrize('level', ['month', 'year'])
+def test_coarser_levels_add_up_to_day_cells(cube, reviews, level):
+    cells = etl_rollup.source_cells(cube, 'reviews', level)
+    day = etl_rollup.source_cells(cube, 'reviews', 'day')
+    assert cells['rows'].sum() == day['rows'].sum() == len(reviews)
+    assert cells['normalized_rating_sum'].sum() == pytest.approx(reviews['normalized_rating'].sum())
+    assert cells['normalized_rating_count'].sum() == reviews['normalized_rating'].count()
+
+
+def test_year_mean_is_sum_over_count(cube, reviews):
+    cells = etl_rollup.source_cells(cube, 'reviews', 'year')
+    totals = cells.groupby('Year')[['normalized_rating_sum', 'normalized_rating_count']].sum()
+    expected = reviews.groupby(reviews['date'].dt.year)['normalized_rating'].mean()
+    means = totals['normalized_rating_sum'] / totals['normalized_rating_count']
+    pd.testing.assert_series_equal(means, expected, check_names=False, check_index_type=False)
+
+
+@pytest.mark.parametrize('year', [2023, 2024, 2025])
+def test_cards_follow_the_dashboard_year(cube, reviews, year):
+    specs = resolve_specs([SPECS['scr_card_1'], SPECS['scr_card_2']], {}, year)
+    saved = charts(specs, cube)
+    for property_id in ['a', 'b']:
+        in_year = reviews[(reviews['date'].dt.year == year) & (reviews['property_id'] == property_id)]
+        count = saved['scr_card_1'].set_index('property_id').loc[property_id]
+        assert count['review_count'] == len(in_year)
+        assert count['years'] == year
+        rating = saved['scr_card_2'].set_index('property_id').loc[property_id, 'normalized_rating']
+        assert rating == round(in_year['normalized_rating'].mean(), 2)
+
+
+def test_monthly_chart_from_month_cells(cube, reviews):
+    saved = charts(resolve_specs([SPECS['scr_chart_line_1']], {}), cube)
+    chart = saved['scr_chart_line_1']
+    assert chart.columns[0] == 'property_id'
+    for property_id, rows in reviews.groupby('property_id'):
+        expected = rows.groupby(rows['date'].dt.strftime('%Y-%m')).size()
+        counts = chart[chart['property_id'] == property_id].set_index('month')['review_count']
+        assert counts.to_dict() == expected.to_dict()
+
+
+def test_property_without_rows_gets_a_zero_card(reviews):
+    # Property b has no review in 2025: its card counts 0 rather than showing a's total
+    reviews = reviews[(reviews['property_id'] == 'a') | (reviews['date'].dt.year < 2025)]
+    cube = etl_rollup.build_cube({'reviews': reviews})
+    card = charts(resolve_specs([SPECS['scr_card_1']], {}, 2025), cube)['scr_card_1']
+    assert card['property_id'].tolist() == ['a', 'b']
+    assert card['review_count'].tolist() == [len(reviews[reviews['date'].dt.year == 2025]), 0]
+
+
+def test_cube_round_trips_through_storage(cube, tmp_path):
+    path = str(tmp_path / 'Rollup_Cube.csv')
+    etl_rollup.write_table(cube, path)
+    stored = etl_rollup.read_cube(path)
+    pd.testing.assert_frame_equal(
+        etl_rollup.source_cells(stored, 'reviews', 'month'), etl_rollup.source_cells(cube, 'reviews', 'month'),
+        check_dtype=False)
+
+
+def test_rating_distribution_from_bucketed_dimension(cube, reviews):
+    # The rating measure only holds sums and counts; the cells are keyed by its whole-point bucket
+    cells = etl_rollup.source_cells(cube, 'reviews', 'year')
+    assert 'normalized_rating' not in cells.columns
+    assert set(cells['rating'].dropna()) <= set(range(11))
+
+    saved = charts(resolve_specs([SPECS['scr_chart_bar_5']], {}, 2024), cube)
+    chart = saved['scr_chart_bar_5']
+    for property_id, rows in reviews[reviews['date'].dt.year == 2024].groupby('property_id'):
+        expected = rows['normalized_rating'].value_counts().sort_index()
+        counts = chart[chart['property_id'] == property_id].set_index('rating')['review_count']
+        assert counts.to_dict() == {int(k): v for k, v in expected.items()}
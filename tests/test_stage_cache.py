@@ -0,0 +1,118 @@
+import functools
+import os
+
+import pytest
+
+import main
+from etl.dag import Task, run_dag
+from etl.stage_cache import StageManifest
+
+
+# Task functions run in worker processes: module-level so they pickle
+def copy_file(source, target):
+    with open(source) as f:
+        text = f.read()
+    if text == 'bad':
+        raise ValueError(f"bad input in {source}")
+    with open(target, 'w') as f:
+        f.write(text)
+
+
+def task(name, func, inputs=(), outputs=()):
+    return Task(name, f"Running {name}...", func, f"Error in {name}", list(inputs), list(outputs))
+
+
+def statuses(results):
+    return {name: status for name, (status, _) in results.items()}
+
+
+@pytest.fixture
+def files(tmp_path):
+    raw = tmp_path / 'raw.csv'
+    raw.write_text('a,b\n1,2\n')
+    return {'raw': str(raw), 'clean': str(tmp_path / 'clean.csv'), 'report': str(tmp_path / 'report.csv')}
+
+
+@pytest.fixture
+def manifest(tmp_path):
+    return StageManifest(str(tmp_path / '.state' / 'stages.json'))
+
+
+def pipeline(files):
+    return [
+        task('clean', functools.partial(copy_file, files['raw'], files['clean']), [files['raw']], [files['clean']]),
+        task('report', functools.partial(copy_file, files['clean'], files['report']), [files['clean']], [files['report']]),
+    ]
+
+
+def test_unchanged_inputs_hit_the_stage_cache(files, manifest):
+    assert statuses(run_dag(pipeline(files), manifest=manifest)) == {'clean': 'ok', 'report': 'ok'}
+    assert statuses(run_dag(pipeline(files), manifest=manifest)) == {'clean': 'cached', 'report': 'cached'}
+
+    # Recorded on disk: a new manifest of the same file sees the same stages
+    reloaded = StageManifest(manifest.path)
+    assert statuses(run_dag(pipeline(files), manifest=reloaded)) == {'clean': 'cached', 'report': 'cached'}
+
+
+def test_touched_input_is_rehashed_and_changed_content_reruns(files, manifest):
+    run_dag(pipeline(files), manifest=manifest)
+    stat = os.stat(files['raw'])
+
+    # A new mtime with the same content: rehashed, still fresh
+    os.utime(files['raw'], ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    assert statuses(run_dag(pipeline(files), manifest=manifest)) == {'clean': 'cached', 'report': 'cached'}
+    assert manifest.entries['files'][files['raw']]['mtime_ns'] == stat.st_mtime_ns + 10**9
+
+    with open(files['raw'], 'a') as f:
+        f.write('3,4\n')
+    assert statuses(run_dag(pipeline(files), manifest=manifest)) == {'clean': 'ok', 'report': 'ok'}
+
+
+def test_missing_output_reruns_its_task(files, manifest):
+    run_dag(pipeline(files), manifest=manifest)
+    os.remove(files['report'])
+    assert statuses(run_dag(pipeline(files), manifest=manifest)) == {'clean': 'cached', 'report': 'ok'}
+
+
+def test_force_reruns_fresh_tasks(files, manifest):
+    run_dag(pipeline(files), manifest=manifest)
+    assert statuses(run_dag(pipeline(files), manifest=manifest, force=True)) == {'clean': 'ok', 'report': 'ok'}
+
+
+def test_failed_task_is_forgotten(files, manifest):
+    run_dag(pipeline(files), manifest=manifest)
+    original = open(files['raw']).read()
+    with open(files['raw'], 'w') as f:
+        f.write('bad')
+    assert statuses(run_dag(pipeline(files), manifest=manifest)) == {'clean': 'failed', 'report': 'skipped'}
+    assert 'clean' not in manifest.entries['stages']
+
+    # Back to the inputs of its last success: it still runs, as its output may be partial
+    with open(files['raw'], 'w') as f:
+        f.write(original)
+    assert statuses(run_dag(pipeline(files), manifest=manifest)) == {'clean': 'ok', 'report': 'cached'}
+
+
+def test_only_runs_the_selected_steps_ignoring_the_cache(files, tmp_path, monkeypatch, capsys):
+    # main keeps its manifest under output/.state of the working directory
+    monkeypatch.chdir(tmp_path)
+    steps = [
+        task('schema', functools.partial(copy_file, files['raw'], files['clean']), [files['raw']], [files['clean']]),
+        task('rollup', functools.partial(copy_file, files['clean'], files['report']), [files['clean']], [files['report']]),
+    ]
+    monkeypatch.setattr(main, 'build_steps', lambda properties=None: steps)
+    assert main.main([]) == 0
+    assert main.main([]) == 0
+    summary = capsys.readouterr().out.rsplit('Pipeline summary:', 1)[1].split()
+    assert summary[:2] == ['schema', 'cached'] and summary[3:5] == ['rollup', 'cached']
+
+    # --only: the selected step runs although its inputs are unchanged, the others are left out
+    assert main.main(['--only', 'rollup']) == 0
+    summary = capsys.readouterr().out.rsplit('Pipeline summary:', 1)[1].split()
+    assert summary[:2] == ['rollup', 'ok']
+    assert 'schema' not in summary
+
+    # --force: every step runs
+    assert main.main(['--force']) == 0
+    summary = capsys.readouterr().out.rsplit('Pipeline summary:', 1)[1].split()
+    assert summary[:2] == ['schema', 'ok'] and summary[3:5] == ['rollup', 'ok']
@@ -0,0 +1,108 @@
+import os
+
+import pandas as pd
+import pytest
+
+from etl import storage
+from etl.storage import export_csv, parquet_path, read_table, stored_path, write_table
+
+
+@pytest.fixture
+def reviews():
+    return pd.DataFrame({
+        'id': ['001', '102', 'g-7'],
+        'platform': ['Google', 'Booking', 'Google'],
+        'date': ['2025-01-03', '2025-01-05', None],
+        'normalized_rating': [8, 4, 10],
+        'sentiment_polarity': [0.5, -0.25, 0.0],
+        'review_text': ['Great stay', None, 'Nice pool'],
+    })
+
+
+@pytest.fixture
+def path(tmp_path):
+    # Named after a table with a schema: typed dates, categories and text ids
+    return str(tmp_path / 'Scrapped_reviews_cleaned.csv')
+
+
+def test_round_trip_keeps_types_and_text_ids(reviews, path):
+    write_table(reviews, path, csv=False)
+    assert not os.path.exists(path)
+
+    df = read_table(path)
+    assert df['id'].tolist() == ['001', '102', 'g-7']
+    assert str(df['date'].dtype).startswith('datetime64')
+    assert df['date'].tolist()[:2] == [pd.Timestamp('2025-01-03'), pd.Timestamp('2025-01-05')] and pd.isna(df['date'][2])
+    assert df['platform'].dtype == 'category'
+    assert df['normalized_rating'].dtype == 'int64'
+    assert df['sentiment_polarity'].tolist() == [0.5, -0.25, 0.0]
+    # Text stays in the mapped Arrow buffers
+    assert isinstance(df['review_text'].dtype, pd.ArrowDtype)
+    assert df['review_text'].isna().tolist() == [False, True, False]
+
+    subset = read_table(path, ['date', 'id', 'missing'], categories=False)
+    assert list(subset.columns) == ['id', 'date']
+
+
+def test_export_csv_writes_missing_and_stale_exports_once(reviews, path):
+    write_table(reviews, path, csv=False)
+    assert export_csv([path]) == [path]
+    assert export_csv([path]) == []
+    exported = pd.read_csv(path, dtype={'id': str})
+    assert exported['id'].tolist() == ['001', '102', 'g-7']
+
+    # A later write of the table makes its export stale
+    write_table(reviews.iloc[:2], path, csv=False)
+    assert export_csv([path]) == [path]
+    assert len(pd.read_csv(path)) == 2
+
+
+def test_csv_newer_than_parquet_is_read_instead(reviews, path):
+    write_table(reviews, path, csv=True)
+    assert stored_path(path) == parquet_path(path)
+    assert read_table(path)['normalized_rating'].tolist() == [8, 4, 10]
+
+    # Edited by hand (or restored by git) after the Parquet copy was written
+    edited = pd.read_csv(path, dtype={'id': str}).assign(normalized_rating=[9, 4, 10])
+    edited.to_csv(path, index=False, encoding='utf-8-sig')
+    stat = os.stat(parquet_path(path))
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+
+    assert stored_path(path) == path
+    df = read_table(path)
+    assert df['normalized_rating'].tolist() == [9, 4, 10]
+    assert df['id'].tolist() == ['001', '102', 'g-7']
+    assert str(df['date'].dtype).startswith('datetime64')
+
+
+def test_export_csv_setting(reviews, path, monkeypatch):
+    monkeypatch.setattr(storage, 'EXPORT_CSV', False)
+    write_table(reviews, path)
+    assert not os.path.exists(path)
+    monkeypatch.setattr(storage, 'EXPORT_CSV', True)
+    write_table(reviews, path)
+    assert os.stat(path).st_mtime_ns == os.stat(parquet_path(path)).st_mtime_ns
+
+
+def test_arrow_cache_is_mapped_and_follows_its_stored_copy(reviews, path):
+    write_table(reviews, path, csv=True)
+    cache = storage.arrow_path(path)
+    assert os.path.exists(cache)
+
+    # Read from the mapped file: no Arrow memory is allocated for the table
+    allocated = storage.pa.total_allocated_bytes()
+    table = storage.arrow_table(path)
+    assert storage.pa.total_allocated_bytes() == allocated
+    assert table.column_names == list(reviews.columns)
+
+    # A CSV-only tree (no Parquet, no cache) builds the cache from the CSV
+    os.remove(parquet_path(path))
+    os.remove(cache)
+    assert read_table(path)['id'].tolist() == ['001', '102', 'g-7']
+    assert os.path.exists(cache)
+
+    # A cache older than the stored copy is rebuilt from it
+    write_table(reviews.iloc[:1], path, csv=False)
+    storage.write_arrow(storage.pa.Table.from_pandas(reviews, preserve_index=False), cache)
+    os.utime(cache, ns=(0, 0))
+    assert len(read_table(path)) == 1
@@ -0,0 +1,39 @@
+import pandas as pd
+
+from etl import etl_subratings
+from etl.etl_subratings import find_subrating_pairs
+from etl.storage import read_table
+
+
+def test_name_and_value_columns_are_paired_by_stem():
+    columns = ['id', 'subratings/10/name', 'subratings/2/value', 'subratings/10/value', 'subratings/2/name',
+               'hotelRatingScores/0/score', 'hotelRatingScores/0/name', 'subratings/3/name', 'photos/0/value']
+    assert find_subrating_pairs(columns) == [
+        ('hotelRatingScores/0/name', 'hotelRatingScores/0/score'),
+        ('subratings/2/name', 'subratings/2/value'),
+        ('subratings/10/name', 'subratings/10/value'),
+    ]
+
+
+def test_subratings_are_unpivoted_and_deduplicated(tmp_path):
+    raw = tmp_path / 'raw'
+    raw.mkdir()
+    export = pd.DataFrame({
+        'id': [1, 2],
+        'publishedDate': ['2025-01-03', '2025-01-05'],
+        'subratings/0/name': ['Rooms', 'Rooms'],
+        'subratings/0/value': [4, 5],
+        'subratings/1/name': ['Service', None],
+        'subratings/1/value': [3, 2],
+    })
+    export.to_csv(raw / 'tripadvisor.csv', index=False)
+    # Review 1 again in a second export, with one subrating rescored
+    export.iloc[[0]].assign(**{'subratings/1/value': 4}).to_csv(raw / 'tripadvisor_2.csv', index=False)
+
+    output_path = str(tmp_path / 'Subratings_reviews.csv')
+    etl_subratings.process(str(raw), output_path, chunk_size=1)
+    out = read_table(output_path, categories=False)
+    rows = sorted(zip(out['review_id'].astype(str), out['subrating_name'], out['subrating_value'].astype(int)))
+    # Review 2's Service score has no name; review 1 keeps one score per subrating, the later export's
+    assert rows == [('1', 'Rooms', 4), ('1', 'Service', 4), ('2', 'Rooms', 5)]
+    assert out.loc[out['review_id'].astype(str) == '2', 'Date'].tolist() == [pd.Timestamp('2025-01-05')]
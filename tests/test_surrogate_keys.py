@@ -0,0 +1,33 @@
+import pandas as pd
+
+from etl.surrogate_keys import DimensionLookup
+
+PLATFORMS = pd.DataFrame({'property_id': ['a', 'a', 'b'], 'platform': ['Google', 'Booking', 'Google'],
+                          'platform_id': [1, 2, 3]})
+
+
+def test_unmatched_key_is_reported(capsys):
+    lookup = DimensionLookup(PLATFORMS, ['property_id', 'platform'], 'platform_id', name='Dim_Platform')
+    keys = pd.DataFrame({'property_id': ['a', 'b', 'b', None], 'platform': ['Google', 'Booking', 'Booking', 'Google']})
+    ids = lookup.resolve(keys)
+
+    assert ids.tolist() == [1, pd.NA, pd.NA, pd.NA]
+    assert str(ids.dtype) == 'Int64'
+    out = capsys.readouterr().out
+    assert "WARNING: Dim_Platform: 2 of 4 keys have no dimension row (1 distinct), e.g. [('b', 'Booking')]" in out
+    assert 'Dim_Platform: 1 rows have an empty key' in out
+
+
+def test_duplicated_dimension_key_does_not_fan_out(capsys):
+    # A merge on the duplicated key would return both Google rows of property a for each fact
+    dim = pd.concat([PLATFORMS, PLATFORMS.iloc[[0]].assign(platform_id=9)], ignore_index=True)
+    lookup = DimensionLookup(dim, ['property_id', 'platform'], 'platform_id', name='Dim_Platform')
+    assert '1 duplicate keys' in capsys.readouterr().out
+
+    facts = pd.DataFrame({'property_id': ['a', 'a', 'b', 'a'], 'platform': ['Google', 'Google', 'Google', 'Booking']},
+                         index=[10, 11, 12, 13])
+    ids = lookup.resolve(facts)
+    assert len(ids) == len(facts)
+    assert ids.index.tolist() == [10, 11, 12, 13]
+    # The first row of a duplicated key wins
+    assert ids.tolist() == [1, 1, 3, 2]
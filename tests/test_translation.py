@@ -0,0 +1,78 @@
+import pandas as pd
+import pytest
+
+from etl.translation import OfflineBackend, TranslationCache, cache_key, get_backend, translate_series
+
+
+class CountingBackend(OfflineBackend):
+    # Offline translations, recording every text sent to the backend
+    def __init__(self, failing=()):
+        super().__init__()
+        self.sent = []
+        self.failing = set(failing)
+
+    def translate_batch(self, texts):
+        self.sent.extend(texts)
+        return [None if text in self.failing else text.upper() for text in texts]
+
+
+@pytest.fixture
+def offline(monkeypatch):
+    monkeypatch.setenv('TRANSLATION_BACKEND', 'offline')
+
+
+@pytest.fixture
+def cache_path(tmp_path):
+    return str(tmp_path / 'translations.json')
+
+
+def test_offline_backend_from_env(offline, cache_path):
+    backend = get_backend()
+    assert backend.name == 'offline'
+    series = pd.Series(['Très bien', None, '  ', 'Très bien'])
+    result = translate_series(series, backend=backend, cache=TranslationCache(cache_path))
+    assert result.tolist() == ['Très bien', 'N/A', 'N/A', 'Très bien']
+
+
+def test_misses_are_translated_once_then_hit(offline, cache_path, capsys):
+    series = pd.Series(['bonjour', 'merci', 'bonjour'])
+    backend = CountingBackend()
+    first = translate_series(series, backend=backend, cache=TranslationCache(cache_path))
+    assert first.tolist() == ['BONJOUR', 'MERCI', 'BONJOUR']
+    assert sorted(backend.sent) == ['bonjour', 'merci']
+    assert '0 hits, 2 misses, 0 failed' in capsys.readouterr().out
+
+    # A new run reads the saved cache: nothing is sent again
+    backend = CountingBackend()
+    second = translate_series(series, backend=backend, cache=TranslationCache(cache_path))
+    assert second.tolist() == first.tolist()
+    assert backend.sent == []
+    assert '2 hits, 0 misses, 0 failed' in capsys.readouterr().out
+
+
+def test_only_new_texts_are_sent(offline, cache_path):
+    translate_series(pd.Series(['bonjour']), backend=CountingBackend(), cache=TranslationCache(cache_path))
+    backend = CountingBackend()
+    translate_series(pd.Series(['bonjour', 'au revoir']), backend=backend, cache=TranslationCache(cache_path))
+    assert backend.sent == ['au revoir']
+
+
+def test_failed_translations_keep_text_and_are_not_cached(offline, cache_path):
+    cache = TranslationCache(cache_path)
+    result = translate_series(pd.Series(['bonjour', 'merci']), backend=CountingBackend(failing={'merci'}), cache=cache)
+    assert result.tolist() == ['BONJOUR', 'merci']
+    assert cache.get(cache_key('merci', 'en')) is None
+    assert cache.get(cache_key('bonjour', 'en')) == 'BONJOUR'
+
+
+def test_cache_is_keyed_by_target(offline, cache_path):
+    translate_series(pd.Series(['bonjour']), backend=CountingBackend(), cache=TranslationCache(cache_path))
+    backend = CountingBackend()
+    translate_series(pd.Series(['bonjour']), target='de', backend=backend, cache=TranslationCache(cache_path))
+    assert backend.sent == ['bonjour']
+
+
+def test_unknown_backend(monkeypatch):
+    monkeypatch.setenv('TRANSLATION_BACKEND', 'nope')
+    with pytest.raises(ValueError, match='nope'):
+        get_backend()